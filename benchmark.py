@@ -0,0 +1,2041 @@
+#!/usr/bin/env python3
+"""
+FRIDAY BENCHMARKS
+Measures FRIDAY's hot paths offline, against throwaway databases and
+recorded (or synthetic) audio. Nothing here touches the real friday.db.
+
+Usage:
+    python benchmark.py search [--sizes 10000,100000,1000000]
+    python benchmark.py stress [--threads 16] [--ops 500]
+    python benchmark.py recognition [--fixtures DIR] [--backend fixture|google|sphinx]
+    python benchmark.py dispatch
+    python benchmark.py daemon [--clients 32] [--requests 200] [--socket PATH]
+    python benchmark.py migrate [--sizes 10000,100000,1000000]
+    python benchmark.py reminders [--count 100000]
+    python benchmark.py usage [--count 100000]
+    python benchmark.py logging
+    python benchmark.py preferences
+    python benchmark.py transfer [--count 100000]
+    python benchmark.py storage [--count 5000]
+    python benchmark.py ui [--count 100000] [--disk-latency 20]
+    python benchmark.py events [--threads 4] [--count 2000]
+    python benchmark.py launch          (Linux; stand-in executables)
+    python benchmark.py wake [--fixtures DIR]
+    python benchmark.py regress [--sizes 1000,10000,100000] [--json OUT]
+                                [--baseline FILE] [--save-baseline]
+
+Recognition fixtures are mono WAV files; an optional same-named .txt file
+holds the expected transcript. Without --fixtures, synthetic recordings are
+generated. Wake-word fixtures are named <group>_<n>.wav; groups (or
+transcripts) starting with "friday" are addressed to Friday, and
+wake_word/*.wav holds the enrollment recordings.
+
+The regress suite runs with a fake microphone (WAV fixtures) and a fake TTS
+engine, writes its results as JSON and compares them with a stored baseline;
+it exits non-zero when a case is slower than the baseline by more than
+--tolerance, or when there is no baseline to compare with.
+"""
+
+import os
+import sys
+import time
+import math
+import glob
+import wave
+import struct
+import queue
+import random
+import asyncio
+import argparse
+import itertools
+import heapq
+import gzip
+import json
+import logging
+import logging.handlers
+import platform
+import threading
+import tempfile
+import sqlite3
+import shutil
+import statistics
+import subprocess
+import tracemalloc
+from unittest import mock
+
+from friday import (
+    Database, WavFileSource, ContinuousListener, RecognitionPipeline,
+    FixtureBackend, GoogleBackend, SphinxBackend, RecognizerBackend, VoiceAssistant,
+    WakeWordGate, TemplateSpotter, SphinxSpotter, WAKE_WORD, audioop, IntentRouter, ApplicationLauncher, AppIndex,
+    FridayCore, CommandServer, FRIDAYApp, StorageExecutor, UIEventBus, ProcessSupervisor, FRIDAYPersonality, VoiceEngine, ReminderScheduler,
+    setup_logging, shutdown_logging, import_notes_from, export_notes_to,
+)
+
+
+WORDS = (
+    "stark arc reactor suit mark armor repulsor jarvis friday pepper happy rhodey "
+    "avengers tower malibu workshop prototype thruster nanotech vibranium shield "
+    "meeting budget launch review schedule groceries call email draft report"
+).split()
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "qua", "bri", "dor"]
+
+
+def _vocabulary(size=20000, seed=1):
+    """Common words first, then pseudo-words, with Zipf-like weights"""
+    rng = random.Random(seed)
+    vocab = list(WORDS)
+    seen = set(vocab)
+    while len(vocab) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            vocab.append(word)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocab))))
+    return vocab, cum_weights
+
+
+VOCAB, CUM_WEIGHTS = _vocabulary()
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choices(VOCAB, cum_weights=CUM_WEIGHTS, k=n))
+
+
+def populate_notes(db, count, seed=42, batch=10000):
+    """Bulk-load `count` synthetic notes in large transactions"""
+    rng = random.Random(seed)
+    done = 0
+    while done < count:
+        rows = [(_sentence(rng, 4), _sentence(rng, 40)) for _ in range(min(batch, count - done))]
+        with db.conn as conn:
+            conn.executemany("INSERT INTO notes (title, content) VALUES (?, ?)", rows)
+        done += len(rows)
+
+
+def _time_calls(fn, args_list):
+    """Run fn over args_list; return per-call latencies in milliseconds"""
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"median {statistics.median(samples):9.2f} ms | p95 {p95:9.2f} ms"
+
+
+def bench_search(sizes, queries=20):
+    """Compare the FTS5 index against the LIKE scan at each table size"""
+    print("=" * 70)
+    print("search_notes: FTS5 vs LIKE")
+    print("=" * 70)
+    rng = random.Random(7)
+    # Mid-frequency terms: selective enough to be a realistic lookup
+    terms = [(rng.choice(VOCAB[500:5000]),) for _ in range(queries)]
+    prefixes = [(t[0][:4],) for t in terms]
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, "bench.db"))
+            start = time.perf_counter()
+            populate_notes(db, size)
+            load_s = time.perf_counter() - start
+            print(f"\n{size:,} notes (loaded in {load_s:.1f}s, FTS5: {db.has_fts})")
+
+            if db.has_fts:
+                print(f"  fts5 term    {_summary(_time_calls(db.search_notes, terms))}")
+                print(f"  fts5 prefix  {_summary(_time_calls(db.search_notes, prefixes))}")
+            print(f"  like term    {_summary(_time_calls(db._search_notes_like, terms))}")
+            print(f"  like prefix  {_summary(_time_calls(db._search_notes_like, prefixes))}")
+            db.close()
+
+
+def stress_database(threads=16, ops=500):
+    """Hammer one Database from many threads, then verify nothing was lost.
+
+    Each worker mixes note writes, searches, history writes and preference
+    round-trips. Any exception or a wrong final row count is a failure.
+    """
+    print("=" * 70)
+    print(f"Database stress: {threads} threads x {ops} ops")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "stress.db"), write_policy="block")
+        errors = []
+        kept = [0] * threads
+        sent = [0] * threads
+        barrier = threading.Barrier(threads)
+
+        def worker(n):
+            rng = random.Random(n)
+            barrier.wait()
+            try:
+                for i in range(ops):
+                    roll = rng.random()
+                    if roll < 0.3:
+                        note_id = db.add_note(f"worker {n} note {i}", _sentence(rng, 20))
+                        if rng.random() < 0.2:
+                            db.update_note(note_id, f"worker {n} edited {i}", _sentence(rng, 20))
+                        if rng.random() < 0.1:
+                            db.delete_note(note_id)
+                        else:
+                            kept[n] += 1
+                    elif roll < 0.6:
+                        db.search_notes(rng.choice(VOCAB[:200]))
+                    elif roll < 0.9:
+                        db.add_command_history(f"worker {n} command {i}")
+                        sent[n] += 1
+                    else:
+                        key = f"pref_{n}"
+                        db.set_preference(key, i)
+                        value = db.get_preference(key)
+                        if value != str(i):
+                            errors.append(f"worker {n}: read {value!r} after writing {i}")
+            except Exception as e:
+                errors.append(f"worker {n}: {e!r}")
+
+        pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        db.flush()
+        elapsed = time.perf_counter() - start
+
+        notes = db.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        history = db.conn.execute("SELECT COUNT(*) FROM command_history").fetchone()[0]
+        if notes != sum(kept):
+            errors.append(f"expected {sum(kept)} notes, found {notes}")
+        if history != sum(sent):
+            errors.append(f"expected {sum(sent)} history rows, found {history}")
+        if db.has_fts:
+            indexed = db.conn.execute("SELECT COUNT(*) FROM notes_fts").fetchone()[0]
+            if indexed != notes:
+                errors.append(f"FTS index has {indexed} rows, notes has {notes}")
+        db.close()
+
+    total = threads * ops
+    print(f"  {total:,} ops in {elapsed:.2f}s ({total / elapsed:,.0f} ops/s)")
+    print(f"  notes: {notes:,} | history rows: {history:,}")
+    for error in errors[:20]:
+        print(f"  FAIL {error}")
+    print("  PASS" if not errors else f"  {len(errors)} failures")
+    return not errors
+
+
+def write_synthetic_wav(path, bursts, rate=16000, seed=3):
+    """Write a mono 16-bit WAV of noise with tone bursts of the given lengths"""
+    rng = random.Random(seed)
+    samples = []
+    for seconds in bursts:
+        samples += [int(rng.gauss(0, 60)) for _ in range(int(0.9 * rate))]
+        samples += [int(4000 * math.sin(2 * math.pi * 300 * i / rate) + rng.gauss(0, 60))
+                    for i in range(int(seconds * rate))]
+    samples += [int(rng.gauss(0, 60)) for _ in range(int(1.0 * rate))]
+    with wave.open(path, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+
+def load_utterances(paths):
+    """Segment every fixture with ContinuousListener; returns [(audio, transcript)]"""
+    utterances = []
+    for path in paths:
+        segments = []
+        listener = ContinuousListener(WavFileSource(path), segments.append)
+        listener.start()
+        listener.wait()
+        transcript_path = os.path.splitext(path)[0] + ".txt"
+        transcript = None
+        if os.path.exists(transcript_path):
+            with open(transcript_path) as f:
+                transcript = f.read().strip()
+        for i, audio in enumerate(segments):
+            utterances.append((audio, transcript or f"{os.path.basename(path)}#{i}"))
+    return utterances
+
+
+def bench_recognition(fixtures=None, backend="fixture", latency=0.25, rounds=5):
+    """Throughput and latency of the capture -> recognition pipeline"""
+    print("=" * 70)
+    print(f"Recognition pipeline ({backend} backend)")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        if fixtures:
+            paths = sorted(glob.glob(os.path.join(fixtures, "*.wav")))
+        else:
+            paths = []
+            for n in range(4):
+                path = os.path.join(tmp, f"synthetic_{n}.wav")
+                write_synthetic_wav(path, [0.6 + 0.2 * k for k in range(3)], seed=n)
+                paths.append(path)
+        start = time.perf_counter()
+        utterances = load_utterances(paths)
+        audio_seconds = sum(len(a.frame_data) / (a.sample_rate * a.sample_width) for a, _ in utterances)
+        print(f"  {len(paths)} fixtures -> {len(utterances)} utterances "
+              f"({audio_seconds:.1f}s audio, segmented in {time.perf_counter() - start:.2f}s)")
+        if not utterances:
+            return
+
+    if backend == "google":
+        make_backend = lambda: GoogleBackend()
+    elif backend == "sphinx":
+        make_backend = lambda: SphinxBackend()
+    else:
+        transcripts = {FixtureBackend.fingerprint(a): text for a, text in utterances}
+        make_backend = lambda: FixtureBackend(transcripts, latency=latency)
+        print(f"  simulated backend latency: {latency * 1000:.0f} ms")
+
+    expected = [text for _, text in utterances] * rounds
+    for workers in (1, 2, 4):
+        results = []
+        pipeline = RecognitionPipeline([make_backend()], results.append,
+                                       workers=workers, maxsize=len(expected))
+        pipeline.start()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for audio, _ in utterances:
+                pipeline.submit(audio)
+        pipeline.drain()
+        elapsed = time.perf_counter() - start
+        stats = pipeline.stats()
+        pipeline.stop()
+        in_order = results == expected if backend == "fixture" else "n/a"
+        accuracy = sum(r == e for r, e in zip(results, expected)) / len(expected)
+        print(f"  workers={workers}: {len(expected) / elapsed:6.1f} utt/s | "
+              f"burst latency p50 {stats['latency_p50_ms']} ms p95 {stats['latency_p95_ms']} ms | "
+              f"in order: {in_order} | exact match {accuracy:.0%}")
+
+
+# Formants (F1, F2) of the synthetic vowels and the consonant kinds used by
+# the wake-word fixtures: (kind, seconds, relative level)
+VOWELS = {"a": (750, 1200), "i": (300, 2300), "e": (450, 1900), "o": (500, 900), "u": (320, 800), "ae": (660, 1700)}
+CONSONANTS = {"f": ("hiss", 0.09, 0.35), "s": ("hiss", 0.12, 0.6), "d": ("burst", 0.03, 1.0),
+              "t": ("burst", 0.04, 1.2), "m": ("hum", 0.07, 0.5), "r": ("hum", 0.06, 0.8), "": None}
+# A word is [(consonant, vowels gliding within the syllable, vowel seconds)]
+FRIDAY_WORD = [("f", ["a", "i"], 0.20), ("d", ["e", "i"], 0.22)]
+NEAR_MISSES = {
+    "fry": [("f", ["a", "i"], 0.25)],
+    "freddy": [("f", ["e"], 0.15), ("d", ["i"], 0.15)],
+    "tuesday": [("t", ["u"], 0.18), ("s", ["e"], 0.05), ("d", ["e", "i"], 0.22)],
+    "my day": [("m", ["a", "i"], 0.20), ("d", ["e", "i"], 0.22)],
+}
+
+
+class _Voice:
+    """Crude formant synthesizer for wake-word fixtures (16 kHz, 16-bit)"""
+
+    RATE = 16000
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        noise = random.Random(1)
+        self._noise = struct.pack(f"<{self.RATE * 16}h", *(int(noise.gauss(0, 1000)) for _ in range(self.RATE * 16)))
+
+    def noise(self, seconds, level):
+        n = round(seconds * self.RATE)
+        start = self.rng.randrange(0, len(self._noise) // 2 - n) * 2
+        return audioop.mul(self._noise[start:start + 2 * n], 2, level / 1000)
+
+    def _period(self, f0, f1, f2, level):
+        """One pitch period of a vowel: harmonics of f0 shaped by two formants"""
+        harmonics = [(k * f0, 1 / (1 + ((k * f0 - f1) / 120) ** 2) + 0.6 / (1 + ((k * f0 - f2) / 160) ** 2))
+                     for k in range(1, int(3800 / f0))]
+        period = [sum(a * math.sin(2 * math.pi * f * i / self.RATE) for f, a in harmonics)
+                  for i in range(int(self.RATE / f0))]
+        peak = max(abs(v) for v in period) or 1.0
+        return struct.pack(f"<{len(period)}h", *(int(level * v / peak) for v in period))
+
+    def _repeat(self, period, seconds):
+        size = 2 * int(seconds * self.RATE)
+        return (period * (size // len(period) + 1))[:size]
+
+    def word(self, syllables, stretch, f0, level):
+        out = b""
+        for consonant, vowels, seconds in syllables:
+            if CONSONANTS.get(consonant):
+                kind, length, gain = CONSONANTS[consonant]
+                if kind == "hiss":  # differenced noise: mostly high frequencies
+                    hiss = self.noise(length * stretch + 0.001, level * gain)
+                    out += audioop.add(hiss[2:], audioop.mul(hiss[:-2], 2, -1), 2)
+                elif kind == "burst":
+                    out += self.noise(length * stretch, level * gain * 0.8)
+                else:
+                    out += self._repeat(self._period(120, 250, 1000, level * gain), length * stretch)
+            for vowel in vowels:
+                f1, f2 = VOWELS[vowel]
+                out += self._repeat(self._period(f0 * self.rng.uniform(0.95, 1.05), f1 * self.rng.uniform(0.93, 1.07),
+                                                 f2 * self.rng.uniform(0.93, 1.07), level),
+                                    seconds * stretch / len(vowels))
+        return out
+
+    def babble_word(self):
+        while True:
+            syllables = []
+            for _ in range(self.rng.choice([1, 1, 2, 2, 3])):
+                vowels = [self.rng.choice(list(VOWELS)) for _ in range(self.rng.choice([1, 2]))]
+                syllables.append((self.rng.choice(list(CONSONANTS)), vowels, self.rng.uniform(0.1, 0.25)))
+            if syllables != FRIDAY_WORD:
+                return syllables
+
+    def utterance(self, words, snr_db):
+        """Words from one random speaker with background noise at `snr_db`"""
+        rng = self.rng
+        stretch, f0 = rng.uniform(0.85, 1.15), rng.uniform(100, 200)
+        level = 8000 * 10 ** (rng.uniform(-6, 3) / 20)
+        audio = self.noise(rng.uniform(0.9, 1.1), 1)
+        for word in words:
+            audio += self.word(word, stretch, f0, level) + self.noise(rng.uniform(0.03, 0.12), 1)
+        audio += self.noise(1.0, 1)
+        return audioop.add(audio, self.noise(len(audio) / 2 / self.RATE, level / 10 ** (snr_db / 20)), 2)
+
+    def write(self, path, data):
+        with wave.open(path, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(self.RATE)
+            out.writeframes(data)
+
+
+def write_wake_fixtures(directory, seed=29):
+    """Synthetic wake-word fixtures: <group>_<n>.wav, templates in wake_word/"""
+    voice = _Voice(seed)
+    rng = voice.rng
+    os.makedirs(os.path.join(directory, "wake_word"), exist_ok=True)
+    for n in range(5):
+        voice.write(os.path.join(directory, "wake_word", f"take_{n}.wav"), voice.utterance([FRIDAY_WORD], 35))
+    for snr in (20, 25, 30):
+        for n in range(20):
+            rest = [voice.babble_word() for _ in range(0 if n % 3 == 0 else rng.randint(1, 3))]
+            voice.write(os.path.join(directory, f"friday-snr{snr}_{n}.wav"), voice.utterance([FRIDAY_WORD] + rest, snr))
+    for n in range(40):
+        words = [list(NEAR_MISSES.values())[n % len(NEAR_MISSES)]] + [voice.babble_word() for _ in range(rng.randint(0, 3))]
+        voice.write(os.path.join(directory, f"near-miss_{n}.wav"), voice.utterance(words, rng.uniform(10, 30)))
+    for n in range(100):
+        words = [voice.babble_word() for _ in range(rng.randint(1, 5))]
+        voice.write(os.path.join(directory, f"chatter_{n}.wav"), voice.utterance(words, rng.uniform(10, 30)))
+    for n in range(10):  # door slams and clicks: 20-60 ms bursts
+        data = voice.noise(1.0, 30) + voice.noise(rng.uniform(0.02, 0.06), 6000) + voice.noise(1.2, 30)
+        voice.write(os.path.join(directory, f"click_{n}.wav"), data)
+
+
+def load_wake_fixtures(directory):
+    """[(group, is_wake, [utterances])] for every <group>_<n>.wav in `directory`.
+
+    A fixture is addressed to Friday when its group or its transcript (an
+    optional same-named .txt file) starts with "friday".
+    """
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        group = name.rsplit("_", 1)[0]
+        transcript = ""
+        if os.path.exists(os.path.join(directory, name + ".txt")):
+            with open(os.path.join(directory, name + ".txt")) as f:
+                transcript = f.read().strip().lower()
+        segments = []
+        listener = ContinuousListener(WavFileSource(path), segments.append)
+        listener.start()
+        listener.wait()
+        fixtures.append((group, group.lower().startswith(WAKE_WORD) or transcript.startswith(WAKE_WORD), segments))
+    return fixtures
+
+
+class _CountingBackend(RecognizerBackend):
+    """Recognizer stand-in that counts the audio it is asked to recognize.
+
+    With encode=True it also does the local work of the Google backend
+    before its request: FLAC-encoding the utterance (an external process).
+    """
+
+    name = "counting"
+
+    def __init__(self, encode=False):
+        super().__init__()
+        self.encode = encode
+        self.calls = 0
+        self.seconds = 0.0
+
+    def recognize(self, audio):
+        if self.encode:
+            audio.get_flac_data()
+        self.calls += 1
+        self.seconds += len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        return "heard"
+
+
+def _gate_decisions(gate, fixtures):
+    """Per-fixture (group, is_wake, woken, cpu seconds) through a fresh gate"""
+    decisions = []
+    for group, is_wake, segments in fixtures:
+        woken = gate.woken
+        start = gate.cpu_seconds
+        for audio in segments:
+            gate.filter(audio)
+        decisions.append((group, is_wake, gate.woken > woken, gate.cpu_seconds - start))
+    return decisions
+
+
+def bench_wake(fixtures=None):
+    """Wake-word gate: false accepts/rejects and CPU on WAV fixtures"""
+    print("=" * 70)
+    print("Wake-word gate")
+    print("=" * 70)
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = fixtures or tmp
+        if not fixtures:
+            start = time.perf_counter()
+            write_wake_fixtures(tmp)
+            print(f"  synthetic fixtures written in {time.perf_counter() - start:.1f}s "
+                  f"(formant-synthesized speech, not recordings)")
+        templates = sorted(glob.glob(os.path.join(directory, "wake_word", "*.wav")))
+        if not templates:
+            print(f"  no enrollment recordings in {os.path.join(directory, 'wake_word')}")
+            return False
+        loaded = load_wake_fixtures(directory)
+        unheard = [group for group, _, segments in loaded if not segments]
+        if unheard:
+            print(f"  {len(unheard)} fixtures produced no utterance at the capture stage "
+                  f"({', '.join(sorted(set(unheard)))}); they are left out")
+        loaded = [fixture for fixture in loaded if fixture[2]]
+        wake = sum(is_wake for _, is_wake, _ in loaded)
+        audio_seconds = sum(len(a.frame_data) / (a.sample_rate * a.sample_width) for _, _, s in loaded for a in s)
+        print(f"  {len(templates)} enrollment takes | {wake} fixtures addressed to Friday, "
+              f"{len(loaded) - wake} background | {audio_seconds:.0f}s of segmented audio")
+
+        spotters = [(f"template x{sensitivity}", TemplateSpotter.from_wavs(templates, sensitivity=sensitivity))
+                    for sensitivity in (0.8, 1.0, 1.25)]
+        if SphinxSpotter.available():
+            spotters.append(("sphinx", SphinxSpotter()))
+        print(f"  {'spotter':16s} {'FR':>6s} {'FA':>6s}   per group (woken/fixtures)")
+        results = {}
+        for label, spotter in spotters:
+            decisions = _gate_decisions(WakeWordGate(spotter, window=0), loaded)
+            results[label] = decisions
+            rejected = sum(is_wake and not woken for _, is_wake, woken, _ in decisions)
+            accepted = sum(woken and not is_wake for _, is_wake, woken, _ in decisions)
+            groups = {}
+            for group, _, woken, _ in decisions:
+                hits, total = groups.get(group, (0, 0))
+                groups[group] = (hits + woken, total + 1)
+            print(f"  {label:16s} {rejected / max(wake, 1):6.1%} {accepted / max(len(loaded) - wake, 1):6.1%}   "
+                  + " ".join(f"{group} {hits}/{total}" for group, (hits, total) in groups.items()))
+        default = results["template x1.0"]
+        checks.append(("default template spotter rejects under 10% of wake fixtures",
+                       sum(is_wake and not woken for _, is_wake, woken, _ in default) < 0.1 * max(wake, 1)))
+        checks.append(("default template spotter accepts under 5% of background fixtures",
+                       sum(woken and not is_wake for _, is_wake, woken, _ in default) < 0.05 * max(len(loaded) - wake, 1)))
+
+        # CPU: what the gate spends per utterance against what each
+        # utterance costs on its way to Google (FLAC encoding, before the
+        # network round-trip)
+        spotter = TemplateSpotter.from_wavs(templates)
+        gate = WakeWordGate(spotter, window=0)
+        segments = [audio for _, _, s in loaded for audio in s]
+        _gate_decisions(gate, loaded)
+        flac_ms = []
+        for audio in segments[:40]:
+            start = time.perf_counter()
+            audio.get_flac_data()
+            flac_ms.append(1000 * (time.perf_counter() - start))
+        print(f"  gate CPU: {1000 * gate.cpu_seconds / len(segments):.1f} ms per utterance, "
+              f"{gate.stats()['cpu_ms_per_audio_s']:.1f} ms per audio second "
+              f"({gate.silent} of {len(segments)} utterances dropped by the voice-activity check)")
+        print(f"  without the gate each utterance costs {statistics.median(flac_ms):.1f} ms "
+              f"of FLAC encoding (an external process) plus a network round-trip")
+        if SphinxSpotter.available():
+            sphinx = WakeWordGate(SphinxSpotter(), window=0)
+            _gate_decisions(sphinx, loaded)
+            print(f"  sphinx gate CPU: {1000 * sphinx.cpu_seconds / len(segments):.1f} ms per utterance")
+        checks.append(("clicks are dropped before the keyword spotter",
+                       all(not woken for group, _, woken, _ in default if group == "click") and gate.silent > 0))
+
+        # A bare "Friday" opens the window: the next utterance passes whole
+        bare = None
+        for _, is_wake, s in loaded:
+            probe = WakeWordGate(spotter, window=6.0)
+            if is_wake and len(s) == 1 and probe.filter(s[0]) is None and probe.woken:
+                bare = s[0]
+                break
+        command = next((s[0] for _, is_wake, s in loaded if not is_wake and s and not spotter.spot(s[0])[0]), None)
+        woken = []
+        gate = WakeWordGate(spotter, window=6.0, on_wake=lambda: woken.append(True))
+        if bare is not None and command is not None:
+            checks.append(("bare wake word opens the window without recognizing anything",
+                           gate.filter(bare) is None and woken == [True]))
+            checks.append(("the next utterance passes whole", gate.filter(command) is command))
+            checks.append(("and the window closes after it", gate.filter(command) is None))
+        else:
+            print("  no bare wake-word fixture to check the follow-up window with")
+
+        # "Friday <command>" is passed on with the wake word cut off
+        cuts = []
+        for group, is_wake, s in loaded:
+            if is_wake and s:
+                passed = WakeWordGate(spotter, window=0).filter(s[0])
+                if passed is not None:
+                    cuts.append((len(s[0].frame_data) - len(passed.frame_data)) / (2 * s[0].sample_rate))
+        if cuts:
+            print(f"  audio cut before recognition: median {statistics.median(cuts):.2f}s "
+                  f"(segment pre-roll + the wake word)")
+            checks.append(("the wake word is cut off what reaches the recognizer", 0.3 < statistics.median(cuts) < 1.5))
+
+        # Noisy-room session through VoiceAssistant: what reaches the backend
+        voice_fx = _Voice(31)
+        session = os.path.join(tmp, "session.wav")
+        data = b""
+        for n in range(30):
+            words = [voice_fx.babble_word() for _ in range(voice_fx.rng.randint(1, 4))]
+            if n % 10 == 4:
+                words = [FRIDAY_WORD] + words
+            data += voice_fx.utterance(words, 20)
+        voice_fx.write(session, data)
+        # Local CPU includes the FLAC encoder processes each recognizer call
+        # starts; the network round-trips the gate saves are not counted
+        calls = {}
+        for label, gated in (("ungated", None), ("gated", WakeWordGate(spotter))):
+            backend = _CountingBackend(encode=True)
+            # The file is read faster than real time: queue every utterance
+            voice = VoiceAssistant(source=WavFileSource(session), continuous=True, backends=[backend],
+                                   wake_gate=gated, queue_size=64)
+            before = os.times()
+            voice.start_listening(lambda text: None)
+            voice._capture.wait()
+            voice.pipeline.drain(10)
+            voice.stop_listening()
+            after = os.times()
+            cpu = sum(after[:4]) - sum(before[:4])  # user + system, ours and our children's
+            calls[label] = backend.calls
+            print(f"  30-utterance noisy-room session, {label:7s}: {backend.calls:2d} recognizer calls, "
+                  f"{backend.seconds:5.1f}s of audio sent, {1000 * cpu:6.0f} ms CPU incl. FLAC encoding")
+        checks.append(("only the 3 utterances addressed to Friday reach the recognizer", calls["gated"] == 3))
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(ok for _, ok in checks)
+
+
+# (utterance, expected intent, expected app) for the intent router
+INTENT_CORPUS = [
+    ("open chrome", "launch_app", "chrome"),
+    ("open chrome please", "launch_app", "chrome"),
+    ("Hey Friday, open Google Chrome now!", "launch_app", "chrome"),
+    ("launch excel", "launch_app", "excel"),
+    ("open microsoft word", "launch_app", "word"),
+    ("open ms word", "launch_app", "word"),
+    ("start power point", "launch_app", "powerpoint"),
+    ("run the calculator", "launch_app", "calculator"),
+    ("open calc", "launch_app", "calculator"),
+    ("open calculater", "launch_app", "calculator"),
+    ("open my email", "launch_app", "outlook"),
+    ("open outlook for me", "launch_app", "outlook"),
+    ("open the terminal", "launch_app", "terminal"),
+    ("open command prompt", "launch_app", "terminal"),
+    ("open firefox", "launch_app", "firefox"),
+    ("open fire fox", "launch_app", "firefox"),
+    ("open notepad", "launch_app", "notepad"),
+    ("open text editor", "launch_app", "notepad"),
+    ("could you open the browser", "launch_app", "chrome"),
+    ("add note", "add_note", None),
+    ("add a note", "add_note", None),
+    ("new note", "add_note", None),
+    ("take a note about the suit", "add_note", None),
+    ("create a new note", "add_note", None),
+    ("remind me to call pepper in 10 minutes", "add_reminder", None),
+    ("Friday, remind me to check the suit in an hour", "add_reminder", None),
+    ("stop listening", "stop_listening", None),
+    ("start listening", "start_listening", None),
+    ("stop", "quit", None),
+    ("exit", "quit", None),
+    ("quit", "quit", None),
+    ("goodbye friday", "quit", None),
+    ("shut down", "quit", None),
+    ("reopen the file", None, None),
+    ("open note", None, None),
+    ("open notes", None, None),
+    ("please stop the music", None, None),
+    ("don't stop me now", None, None),
+    ("the store is open late", None, None),
+    ("what's the weather", None, None),
+    ("tell me a joke", None, None),
+    ("exit strategy for the meeting", None, None),
+]
+
+
+def bench_dispatch(rounds=200):
+    """Intent router accuracy on INTENT_CORPUS and cost as intents grow"""
+    print("=" * 70)
+    print("Intent dispatch")
+    print("=" * 70)
+    router = IntentRouter.default()
+    launcher = ApplicationLauncher()
+    failures = []
+    for text, expected, expected_app in INTENT_CORPUS:
+        intent, slots = router.match(text)
+        name = intent.name if intent else None
+        app = launcher.resolve(slots["app"]) if "app" in slots else None
+        if name != expected or app != expected_app:
+            failures.append(f"{text!r}: got {name}/{app}, expected {expected}/{expected_app}")
+    correct = len(INTENT_CORPUS) - len(failures)
+    print(f"  accuracy: {correct}/{len(INTENT_CORPUS)} ({correct / len(INTENT_CORPUS):.0%})")
+    for failure in failures:
+        print(f"  FAIL {failure}")
+
+    texts = [text for text, _, _ in INTENT_CORPUS]
+    for extra in (0, 100, 1000, 10000):
+        router = IntentRouter.default()
+        for n in range(extra):
+            router.register(f"custom_{n}", [rf"^verb{n} (?P<thing>.+)$"], keywords=(f"verb{n}",))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in texts:
+                router.match(text)
+        per_call = (time.perf_counter() - start) / (rounds * len(texts)) * 1e6
+        print(f"  {len(router.intents):6d} intents: {per_call:7.2f} us/dispatch")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "apps.db"))
+        index = AppIndex(db)
+        start = time.perf_counter()
+        index.refresh(force=True)
+        scan_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        AppIndex(db).load()
+        load_ms = (time.perf_counter() - start) * 1000
+        names = list(index.entries)[:200] or ["firefox"]
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for name in names:
+                index.lookup(name)
+        lookup_us = (time.perf_counter() - start) / (rounds * len(names)) * 1e6
+        db.close()
+    print(f"  app index: {len(index.entries)} apps | scan {scan_ms:.1f} ms | "
+          f"cached load {load_ms:.1f} ms | lookup {lookup_us:.2f} us")
+    return not failures
+
+
+DAEMON_MIX = (
+    lambda rng: ("ping", {}),
+    lambda rng: ("command", {"text": "what's the weather like"}),
+    lambda rng: ("command", {"text": "start listening"}),
+    # Mid-frequency terms, as in bench_search
+    lambda rng: ("notes.search", {"query": rng.choice(VOCAB[200:300])}),
+    lambda rng: ("notes.list", {"limit": 20}),
+    lambda rng: ("notes.add", {"title": "load test", "content": _sentence(rng, 40)}),
+)
+
+
+async def _daemon_client(path, requests, pipeline, rng, latencies, errors):
+    """One connection keeping up to `pipeline` requests in flight"""
+    reader, writer = await asyncio.open_unix_connection(path, limit=1 << 22)
+    sent_at = {}
+    window = asyncio.Semaphore(pipeline)
+
+    async def send():
+        for i in range(requests):
+            await window.acquire()
+            method, params = rng.choice(DAEMON_MIX)(rng)
+            sent_at[i] = time.perf_counter()
+            writer.write(json.dumps({"id": i, "method": method, "params": params}).encode() + b"\n")
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    expected = 0
+    for _ in range(requests):
+        reply = json.loads(await reader.readline())
+        latencies.append((time.perf_counter() - sent_at.pop(reply["id"])) * 1000)
+        if "error" in reply or reply["id"] != expected:
+            errors.append(reply)
+        expected += 1
+        window.release()
+    await sender
+    writer.close()
+
+
+async def _load_test(path, clients, requests, pipeline):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _daemon_client(path, requests, pipeline, random.Random(seed), latencies, errors)
+        for seed in range(clients)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def bench_daemon(clients=32, requests=200, pipeline=8, path=None, notes=10000):
+    """Load-test the headless command API with concurrent pipelining clients.
+
+    Without `path`, a daemon is started in-process on a temporary socket and
+    database; the mix never includes app launches.
+    """
+    print("=" * 70)
+    print(f"daemon: {clients} clients x {requests} requests, pipeline depth {pipeline}")
+    print("=" * 70)
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        core = server = loop = None
+        if path is None:
+            path = os.path.join(tmp, "friday.sock")
+            core = FridayCore(os.path.join(tmp, "daemon.db"))
+            populate_notes(core.db, notes)
+            server = CommandServer(core, path)
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(server.start())
+            threading.Thread(target=loop.run_forever, daemon=True).start()
+        try:
+            for depth in sorted({1, pipeline}):
+                elapsed, latencies, errors = asyncio.run(_load_test(path, clients, requests, depth))
+                latencies.sort()
+                total = clients * requests
+                p50 = latencies[len(latencies) // 2]
+                p99 = latencies[min(total - 1, int(total * 0.99))]
+                print(f"  depth {depth:3d} | {total / elapsed:9.0f} req/s | p50 {p50:7.2f} ms | "
+                      f"p99 {p99:7.2f} ms | errors {len(errors)}")
+                ok = ok and not errors
+        finally:
+            if server:
+                asyncio.run_coroutine_threadsafe(server.close(), loop).result(10)
+                loop.call_soon_threadsafe(loop.stop)
+                core.close()
+    print(f"  {'PASS' if ok else 'FAIL'}: replies in request order, no errors")
+    return ok
+
+
+def create_legacy_db(path, notes, history, seed=5):
+    """A database with the pre-versioning schema shipped in friday.db"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE preferences (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE reminders (id INTEGER PRIMARY KEY, text TEXT, time DATETIME, completed BOOLEAN DEFAULT 0);
+        CREATE TABLE applications (id INTEGER PRIMARY KEY, name TEXT, path TEXT);
+        CREATE TABLE history (id INTEGER PRIMARY KEY, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                              input TEXT, response TEXT);
+        CREATE TABLE notes (id INTEGER PRIMARY KEY, title TEXT, content TEXT,
+                            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE command_history (id INTEGER PRIMARY KEY AUTOINCREMENT, command TEXT,
+                                      timestamp TEXT DEFAULT CURRENT_TIMESTAMP, success BOOLEAN DEFAULT 1);
+    ''')
+    for done in range(0, notes, 10000):
+        rows = [(_sentence(rng, 4), _sentence(rng, 40), f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} 12:{i % 60:02d}:00")
+                for i in range(done, min(notes, done + 10000))]
+        conn.executemany("INSERT INTO notes (title, content, updated_at) VALUES (?, ?, ?)", rows)
+    for done in range(0, history, 10000):
+        rows = [(f"open app {i}", "Right away, Sir.") for i in range(done, min(history, done + 10000))]
+        conn.executemany("INSERT INTO history (input, response) VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def _page_ms(db, rounds=20):
+    return statistics.median(_time_calls(db.list_notes, [(100,)] * rounds))
+
+
+def bench_migrate(sizes):
+    """Upgrade legacy databases to the current schema version"""
+    print("=" * 70)
+    print(f"Schema migrations (to v{Database.SCHEMA_VERSION})")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"legacy_{size}.db")
+            create_legacy_db(path, size, size // 2)
+            legacy = sqlite3.connect(path)
+            before = statistics.median(_time_calls(lambda: legacy.execute(
+                "SELECT id, title, created_at, updated_at FROM notes ORDER BY updated_at DESC, id DESC LIMIT 100"
+            ).fetchall(), [()] * 20))
+            legacy.close()
+            mb = os.path.getsize(path) / 2 ** 20
+            start = time.perf_counter()
+            db = Database(path)
+            total = time.perf_counter() - start
+            print(f"  {size:>9,} notes, {size // 2:,} history rows ({mb:.0f} MB): upgrade {total:.2f}s")
+            for version, name, seconds in db.migrations_applied:
+                print(f"    v{version} {name:28s} {seconds * 1000:9.1f} ms")
+            migrated = sum(seconds for _, _, seconds in db.migrations_applied)
+            print(f"    {'fts index build':31s} {(total - migrated) * 1000:9.1f} ms")
+            print(f"    first notes page: {before:.2f} ms before, {_page_ms(db):.2f} ms after")
+            db.close()
+            start = time.perf_counter()
+            Database(path).close()
+            print(f"    reopen at v{Database.SCHEMA_VERSION}: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+class SlowHandler(logging.Handler):
+    """A handler on a disk that takes `delay` seconds per write"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.handled = 0
+
+    def emit(self, record):
+        self.format(record)
+        time.sleep(self.delay)
+        self.handled += 1
+
+
+def bench_logging(records=2000, delay=0.002):
+    """Caller-side cost of logging, rotation with compression, JSON lines"""
+    print("=" * 70)
+    print("Logging pipeline")
+    print("=" * 70)
+    checks = []
+    log = logging.getLogger("friday.bench")
+    log.propagate = False
+    slow = SlowHandler(delay)
+    log.addHandler(slow)
+    direct = _time_calls(log.info, [("voice command %d", i) for i in range(records // 10)])
+    log.removeHandler(slow)
+    print(f"  direct handler, {delay * 1000:.0f} ms disk: {_summary(direct)}")
+
+    log_queue = queue.SimpleQueue()
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    slow = SlowHandler(delay)
+    listener = logging.handlers.QueueListener(log_queue, slow)
+    listener.start()
+    queued = _time_calls(log.info, [("voice command %d", i) for i in range(records)])
+    listener.stop()
+    log.handlers.clear()
+    print(f"  queue handler,  {delay * 1000:.0f} ms disk: {_summary(queued)}")
+    checks.append(("queued records all written", slow.handled == records))
+    checks.append(("caller no longer waits on the disk", statistics.median(queued) < delay * 1000 / 10))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "friday.log")
+        setup_logging(path, json_lines=True, max_bytes=64 * 1024, backups=3, console=False)
+        start = time.perf_counter()
+        for i in range(20000):
+            logging.getLogger("friday").info(f"FRIDAY: status update {i} " + "x" * 40)
+        shutdown_logging()
+        elapsed = time.perf_counter() - start
+        rotated = sorted(f for f in os.listdir(tmp) if f != "friday.log")
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in rotated)
+        print(f"  20000 records with rotation: {elapsed:.2f}s, kept {rotated} ({size / 1024:.0f} KiB compressed)")
+        checks.append(("retention keeps 3 compressed backups", rotated == [f"friday.log.{i}.gz" for i in (1, 2, 3)]))
+        with gzip.open(os.path.join(tmp, "friday.log.1.gz"), "rt") as f:
+            lines = f.read().splitlines()
+        with open(path) as f:
+            lines += f.read().splitlines()
+        try:
+            parsed = [json.loads(line) for line in lines]
+            checks.append(("JSON lines parse", parsed[-1]["message"].startswith("FRIDAY: status update 19999")))
+        except ValueError:
+            checks.append(("JSON lines parse", False))
+    setup_logging(None)
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(ok for _, ok in checks)
+
+
+def bench_usage(count=100000, days=365, seed=13):
+    """Usage rollups against GROUP BY over a year of command history"""
+    print("=" * 70)
+    print(f"Usage rollups: {count:,} history rows over {days} days")
+    print("=" * 70)
+    rng = random.Random(seed)
+    apps = list(ApplicationLauncher.APPS)
+    phrases = [f"open {app}" for app in apps] + [text for text, _, _ in INTENT_CORPUS]
+    weights = [1 / (rank + 1) for rank in range(len(phrases))]
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "usage.db"))
+        now = time.time()
+        rows = [(command, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(now - rng.uniform(0, days * 86400))),
+                 rng.random() > 0.1)
+                for command in rng.choices(phrases, weights, k=count)]
+        rows.sort(key=lambda row: row[1])
+        insert = "INSERT INTO command_history (command, timestamp, success) VALUES (?, ?, ?)"
+        start = time.perf_counter()
+        with db.conn as conn:
+            conn.executemany(insert, rows)
+        with_trigger = time.perf_counter() - start
+        plain = Database(os.path.join(tmp, "plain.db"))
+        plain.conn.execute("DROP TRIGGER command_history_rollup")
+        start = time.perf_counter()
+        with plain.conn as conn:
+            conn.executemany(insert, rows)
+        without_trigger = time.perf_counter() - start
+        plain.close()
+        print(f"  insert: {count / with_trigger:,.0f} rows/s with rollup trigger, "
+              f"{count / without_trigger:,.0f} rows/s without")
+
+        group_by = lambda: db.conn.execute('''
+            SELECT lower(trim(command)), COUNT(*), SUM(success != 0) FROM command_history
+            WHERE date(timestamp) >= date('now', '-365 days')
+            GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT 20''').fetchall()
+        for label, fn in (
+            ("GROUP BY over history (year)", group_by),
+            ("rollup top 20 (year)", lambda: db.command_usage(days=365)),
+            ("rollup top 20 (30 days)", lambda: db.command_usage(days=30)),
+            ("rollup top 20 (all time)", lambda: db.command_usage()),
+            ("rollup one command by day", lambda: db.command_usage_by_day("open chrome", 365)),
+            ("quick launch counts", lambda: db.app_launch_counts(apps)),
+        ):
+            print(f"  {label:30s} {_summary(_time_calls(fn, [()] * 20))}")
+        expected = [(command, total) for command, total, _ in group_by()]
+        actual = [(command, total) for command, total, _ in db.command_usage(days=365)]
+        checks.append(("rollup matches GROUP BY", expected == actual))
+        totals = db.conn.execute("SELECT SUM(count) FROM command_usage").fetchone()[0]
+        checks.append(("all-time totals cover every row", totals == count))
+        db.close()
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(ok for _, ok in checks)
+
+
+class _Interrupt(Exception):
+    pass
+
+
+def _interrupt_after(commits):
+    """Progress callback that aborts an import or export after `commits` reports"""
+    calls = itertools.count(1)
+
+    def progress(count, fraction):
+        if next(calls) >= commits:
+            raise _Interrupt()
+    return progress
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def bench_transfer(count=100000, markdown=10000, per_note=2000):
+    """Streaming notes export/import, resumed transfers and per-note commits"""
+    print("=" * 70)
+    print(f"Notes import/export: {count:,} notes as JSON Lines, {markdown:,} as Markdown")
+    print("=" * 70)
+    checks = []
+
+    def timed(label, fn, notes, size):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        print(f"  {label:28s} {notes / elapsed:10,.0f} notes/s {size() / elapsed / 2 ** 20:8.1f} MB/s")
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Database(os.path.join(tmp, "source.db"))
+        populate_notes(source, count)
+        jsonl = os.path.join(tmp, "notes.jsonl")
+        mddir = os.path.join(tmp, "notes")
+        timed("export JSON Lines", lambda: export_notes_to(source, jsonl), count,
+              lambda: os.path.getsize(jsonl))
+        with open(jsonl, "rb") as f:
+            checks.append(("export wrote every note", sum(1 for _ in f) == count))
+        tracemalloc.start()
+        export_notes_to(source, os.path.join(tmp, "traced.jsonl"))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  export peak Python memory: {peak / 2 ** 20:.1f} MB "
+              f"for {os.path.getsize(jsonl) / 2 ** 20:.0f} MB of notes")
+        checks.append(("export memory stays bounded by the batch", peak < 8 * 2 ** 20))
+
+        target = Database(os.path.join(tmp, "target.db"))
+        imported = timed("import JSON Lines", lambda: import_notes_from(target, jsonl), count,
+                         lambda: os.path.getsize(jsonl))
+        checks.append(("import read every note", imported == count))
+        same = lambda: (source.conn.execute("SELECT SUM(length(content)), MAX(created_at) FROM notes").fetchone()
+                        == target.conn.execute("SELECT SUM(length(content)), MAX(created_at) FROM notes").fetchone())
+        checks.append(("imported content and timestamps match", same()))
+        target.close()
+
+        small = Database(os.path.join(tmp, "small.db"))
+        populate_notes(small, markdown, seed=7)
+        timed("export Markdown", lambda: export_notes_to(small, mddir), markdown, lambda: _dir_size(mddir))
+        md_target = Database(os.path.join(tmp, "md.db"))
+        timed("import Markdown", lambda: import_notes_from(md_target, mddir), markdown, lambda: _dir_size(mddir))
+        original = list(small.iter_notes())
+        checks.append(("Markdown round trip is exact", list(md_target.iter_notes()) == original))
+        md_target.close()
+        small.close()
+
+        notes = [(title, content) for _, title, content, _, _ in itertools.islice(source.iter_notes(), per_note)]
+        per_note_db = Database(os.path.join(tmp, "per_note.db"))
+        start = time.perf_counter()
+        for title, content in notes:
+            per_note_db.add_note(title, content)
+        elapsed = time.perf_counter() - start
+        per_note_db.close()
+        print(f"  {'add_note per note':28s} {per_note / elapsed:10,.0f} notes/s")
+
+        resumed = Database(os.path.join(tmp, "resumed.db"))
+        try:
+            import_notes_from(resumed, jsonl, _interrupt_after(3), chunk=max(1, count // 10))
+        except _Interrupt:
+            pass
+        partial = resumed.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        total = import_notes_from(resumed, jsonl)
+        rows = resumed.conn.execute("SELECT COUNT(*), COUNT(DISTINCT content) FROM notes").fetchone()
+        print(f"  interrupted import: {partial:,} notes committed, resumed to {total:,}")
+        checks.append(("interrupted import resumes without duplicates",
+                       rows[0] == count and total == count and resumed.import_checkpoint(os.path.realpath(jsonl)) is None))
+        resumed.close()
+
+        try:
+            export_notes_to(source, jsonl, _interrupt_after(count // 2000), batch=1000)
+        except _Interrupt:
+            pass
+        with open(jsonl + ".part", "rb+") as f:
+            f.truncate(f.seek(0, os.SEEK_END) - 10)  # torn mid-line, as if the exporter died
+        written = export_notes_to(source, jsonl, resume=True)
+        with open(jsonl, "rb") as f:
+            ids = [json.loads(line)["id"] for line in f]
+        print(f"  interrupted export: resumed with {written:,} more notes")
+        checks.append(("interrupted export resumes after the last complete note",
+                       ids == sorted(set(ids)) and len(ids) == count))
+        source.close()
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(ok for _, ok in checks)
+
+
+def _pages_in_use(db):
+    conn = db.conn
+    pages = conn.execute("PRAGMA page_count").fetchone()[0] - conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return pages * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def _materialized(fn):
+    """(median ms, bytes of row data returned, peak traced MB) of a query"""
+    rows = fn()
+    size = sum(len(value) for row in rows for value in row if isinstance(value, (str, bytes)))
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(_time_calls(fn, [()] * 10)), size, peak / 2 ** 20
+
+
+def bench_storage(count=5000, words=2000, seed=17):
+    """Metadata-only listings and compressed note bodies on a corpus of large notes"""
+    print("=" * 70)
+    print(f"Note storage: {count:,} notes of ~{words:,} words")
+    print("=" * 70)
+    checks = []
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_path = os.path.join(tmp, "plain.db")
+        db = Database(plain_path)
+        for start in range(0, count, 500):
+            rows = [(_sentence(rng, 4), _sentence(rng, words)) for _ in range(min(500, count - start))]
+            with db.conn as conn:  # raw inserts: bodies stored as before compression
+                conn.executemany("INSERT INTO notes (title, content) VALUES (?, ?)", rows)
+        bodies = dict(db.conn.execute("SELECT id, content FROM notes"))
+        db.close()
+        compressed_path = os.path.join(tmp, "compressed.db")
+        shutil.copy(plain_path, compressed_path)
+        legacy = sqlite3.connect(compressed_path)  # reopening reruns the compression migration
+        legacy.execute(f"PRAGMA user_version = {Database.SCHEMA_VERSION - 1}")
+        legacy.close()
+
+        plain = Database(plain_path)
+        start = time.perf_counter()
+        db = Database(compressed_path)
+        print(f"  migration: {time.perf_counter() - start:.2f} s to compress existing bodies")
+        before, after = _pages_in_use(plain), _pages_in_use(db)
+        stored = lambda d: d.conn.execute("SELECT SUM(length(CAST(content AS BLOB))) FROM notes").fetchone()[0]
+        print(f"  bodies stored: {stored(plain) / 2 ** 20:8.1f} MB -> {stored(db) / 2 ** 20:8.1f} MB")
+        print(f"  pages in use:  {before / 2 ** 20:8.1f} MB -> {after / 2 ** 20:8.1f} MB "
+              f"(file shrinks after VACUUM)")
+
+        term = VOCAB[40]
+        old_search = lambda: plain.conn.execute('''
+            SELECT notes.id, notes.title, notes.content, notes.created_at
+            FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid
+            WHERE notes_fts MATCH ? ORDER BY bm25(notes_fts, 5.0, 1.0), notes.updated_at DESC
+        ''', (f'"{term}"',)).fetchall()
+        cases = (
+            ("search with bodies (before)", old_search),
+            ("search metadata only", lambda: db.search_notes(term)),
+            ("list_notes page of 100", lambda: db.list_notes(100)),
+        )
+        hits = len(db.search_notes(term))
+        print(f"  search term {term!r} matches {hits:,} notes")
+        for label, fn in cases:
+            ms, size, peak = _materialized(fn)
+            print(f"  {label:30s} {ms:8.2f} ms {size / 2 ** 20:8.2f} MB returned   peak {peak:7.2f} MB")
+        ids = rng.sample(sorted(bodies), 200)
+        print(f"  get_note plain       {_summary(_time_calls(plain.get_note, [(i,) for i in ids]))}")
+        print(f"  get_note compressed  {_summary(_time_calls(db.get_note, [(i,) for i in ids]))}")
+
+        checks.append(("bodies round-trip through get_note", all(db.get_note(i)[2] == bodies[i] for i in ids)))
+        checks.append(("large bodies are stored compressed", db.conn.execute(
+            "SELECT COUNT(*) FROM notes WHERE typeof(content) = 'blob'").fetchone()[0] == count))
+        checks.append(("search results match", sorted(db.search_notes(term)) == sorted(plain.search_notes(term))))
+        note_id = ids[0]
+        db.update_note(note_id, "replaced", _sentence(rng, words) + " zzyzxunique")
+        checks.append(("updated compressed body is searchable", [r[0] for r in db.search_notes("zzyzxunique")] == [note_id]))
+        checks.append(("LIKE fallback reads compressed bodies",
+                       [r[0] for r in db._search_notes_like("zzyzxunique")] == [note_id]))
+        db.delete_note(note_id)
+        checks.append(("deleted body leaves the index", db.search_notes("zzyzxunique") == []))
+        small = db.add_note("short", "a short body")
+        checks.append(("short bodies stay text", db.conn.execute(
+            "SELECT typeof(content) FROM notes WHERE id = ?", (small,)).fetchone()[0] == "text"))
+        plain.close()
+        db.close()
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(ok for _, ok in checks)
+
+
+def bench_preferences(steps=1000, delay=0.2):
+    """Preference reads from the cache and a slider drag's worth of writes"""
+    print("=" * 70)
+    print(f"Preferences: cached reads, {steps} coalesced writes, live voice settings")
+    print("=" * 70)
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "prefs.db"))
+        db.preferences.delay = delay
+        for i in range(50):
+            db.set_preference(f"key_{i}", i)
+        db.flush()
+        db.writer.flush()
+        select = lambda: db.conn.execute("SELECT value FROM preferences WHERE key = ?", ("key_7",)).fetchone()
+        for label, fn in (
+            ("SELECT per read", select),
+            ("cached get_preference", lambda: db.get_preference("key_7")),
+        ):
+            start = time.perf_counter()
+            for _ in range(20000):
+                fn()
+            print(f"  {label:30s} {(time.perf_counter() - start) / 20000 * 1e6:7.2f} us per read")
+
+        tts = NullTTS()
+        voice = VoiceEngine(engine=tts, preferences=db.preferences)
+        voice.ready.wait(5)
+        seen = []
+        db.preferences.subscribe(lambda key, value: seen.append(value), "voice_rate")
+        written = db.preferences.written
+        start = time.perf_counter()
+        for step in range(steps):
+            db.set_preference("voice_rate", 100 + step % 200)
+            db.set_preference("voice_volume", round(step % 100 / 100, 2))
+        elapsed = time.perf_counter() - start
+        print(f"  set_preference: {elapsed / (2 * steps) * 1e6:.1f} us per call")
+        time.sleep(delay * 2)
+        db.preferences.flush()
+        rows = db.preferences.written - written
+        print(f"  {2 * steps} changes were committed as {rows} rows")
+        final = (str(100 + (steps - 1) % 200), str(round((steps - 1) % 100 / 100, 2)))
+        stored = tuple(db.conn.execute("SELECT value FROM preferences WHERE key = ?", (key,)).fetchone()[0]
+                       for key in ("voice_rate", "voice_volume"))
+        checks.append(("writes coalesced", rows <= 2 * math.ceil(elapsed / delay + 1)))
+        checks.append(("last value persisted", stored == final))
+        checks.append(("subscriber notified per change", len(seen) == steps))
+        voice.speak("rate check")
+        checks.append(("voice engine follows preferences",
+                       (str(tts.properties["rate"]), str(tts.properties["volume"])) == final))
+        voice.close()
+        db.close()
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(ok for _, ok in checks)
+
+
+class FakeClock:
+    """Injectable epoch clock that only moves when told to"""
+
+    def __init__(self, now=1_800_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds, scheduler):
+        self.now += seconds
+        scheduler.wake()
+
+
+def _settle(scheduler, announced, timeout=30.0):
+    """Wait until the scheduler has announced `announced` reminders"""
+    deadline = time.monotonic() + timeout
+    while scheduler.announced < announced and time.monotonic() < deadline:
+        time.sleep(0.005)
+    time.sleep(0.02)  # let anything extra show up
+    return scheduler.announced
+
+
+def bench_reminders(count=100000, days=10):
+    """Reminder scheduler correctness and cost with a fake clock"""
+    print("=" * 70)
+    print(f"Reminder scheduler: {count:,} reminders over {days} days")
+    print("=" * 70)
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "reminders.db"))
+        clock = FakeClock()
+        heard = []
+        scheduler = ReminderScheduler(db, heard.append, clock=clock)
+        rng = random.Random(9)
+        offsets = sorted(rng.uniform(1, days * 86400) for _ in range(count))
+        start = time.perf_counter()
+        scheduler.add_many([(f"task {i}", clock.now + offset) for i, offset in enumerate(offsets)])
+        print(f"  bulk insert: {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        scheduler.start()
+        while not scheduler.loads:
+            time.sleep(0.001)
+        print(f"  first window load: {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"{scheduler.pending()} reminders in memory")
+
+        cpu = time.process_time()
+        time.sleep(1.0)
+        idle_cpu = (time.process_time() - cpu) * 1000
+        print(f"  idle CPU over 1s with {count:,} pending: {idle_cpu:.1f} ms")
+        checks.append(("idle CPU under 20 ms/s", idle_cpu < 20))
+
+        # Walk the clock through the first day, 10 minutes at a time
+        expected = sum(1 for offset in offsets if offset <= 86400)
+        start = time.perf_counter()
+        for _ in range(144):
+            clock.advance(600, scheduler)
+            _settle(scheduler, sum(1 for offset in offsets if offset <= clock.now - 1_800_000_000.0), 5)
+        elapsed = time.perf_counter() - start
+        print(f"  day 1: {scheduler.announced:,} announced ({expected:,} due), "
+              f"{scheduler.loads} window loads, {elapsed:.2f}s")
+        in_order = heard == [f"task {i}" for i in range(expected)]
+        checks.append(("first day announced once each, in due order", in_order))
+
+        # A reminder added inside the loaded window fires without a reload
+        loads = scheduler.loads
+        scheduler.add("inside window", clock.now + 30)
+        clock.advance(31, scheduler)
+        _settle(scheduler, expected + 1 + sum(1 for o in offsets if 86400 < o <= 86431))
+        checks.append(("added reminder fires", "inside window" in heard))
+        checks.append(("no reload for an in-window add", scheduler.loads - loads <= 1))
+
+        # A reminder past the window fires once the window reaches it
+        scheduler.add("beyond window", clock.now + 7200)
+        for _ in range(13):
+            clock.advance(600, scheduler)
+            _settle(scheduler, sum(1 for o in offsets if o <= clock.now - 1_800_000_000.0) + 2, 5)
+        checks.append(("beyond-window reminder fires", "beyond window" in heard))
+
+        # Everything overdue at once (e.g. after a long shutdown)
+        start = time.perf_counter()
+        clock.advance(days * 86400, scheduler)
+        total = _settle(scheduler, count + 2, 60)
+        print(f"  overdue burst: {total:,} announced in {time.perf_counter() - start:.2f}s")
+        checks.append(("every reminder announced exactly once", total == count + 2 and len(set(heard)) == len(heard)))
+        scheduler.stop()
+        left = db.conn.execute("SELECT COUNT(*) FROM reminders WHERE completed = 0").fetchone()[0]
+        checks.append(("all marked completed", left == 0))
+        db.close()
+
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(ok for _, ok in checks)
+
+
+class NullTTS:
+    """pyttsx3 stand-in: accepts everything, speaks nothing"""
+
+    def __init__(self):
+        self.spoken = 0
+        self.properties = {"voice": "null", "rate": 150, "volume": 1.0}
+
+    def say(self, text):
+        self.spoken += 1
+
+    def runAndWait(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def save_to_file(self, text, path):
+        pass
+
+    def getProperty(self, name):
+        return self.properties.get(name)
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+
+class FakeTree:
+    """The slice of ttk.Treeview the notes list uses"""
+
+    def __init__(self):
+        self.rows = {}
+        self.selected = ()
+
+    def get_children(self):
+        return tuple(self.rows)
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.rows.pop(iid, None)
+
+    def exists(self, iid):
+        return iid in self.rows
+
+    def insert(self, parent, index, iid, values):
+        self.rows[iid] = values
+
+    def item(self, iid, option=None, values=None):
+        if values is not None:
+            self.rows[iid] = values
+        return self.rows[iid] if option == "values" else {"values": self.rows[iid]}
+
+    def move(self, iid, parent, index):
+        pass
+
+    def selection(self):
+        return self.selected
+
+
+class FakeRoot:
+    """Runs Tk callbacks inline"""
+
+    def after(self, ms, fn=None, *args):
+        if fn:
+            fn(*args)
+
+    def after_idle(self, fn, *args):
+        fn(*args)
+
+
+class FakeVar:
+    def set(self, value):
+        self.value = value
+
+
+def headless_app(db, core=None, voice_engine=None):
+    """A FRIDAYApp with its widgets replaced by fakes, for driving UI methods"""
+    app = FRIDAYApp.__new__(FRIDAYApp)
+    app.db, app.core = db, core
+    if core:
+        app.router, app.app_launcher = core.router, core.app_launcher
+    app.root = FakeRoot()
+    app.status_var = FakeVar()
+    app.notes_list = FakeTree()
+    app.voice_engine = voice_engine
+    app.events = UIEventBus(app.root)
+    app._register_events()
+    app.storage = StorageExecutor(post=lambda deliver: app.events.post("storage", deliver))
+    app._notes_page_pending = False
+    return app
+
+
+def _record(results, name, samples):
+    samples = sorted(samples)
+    results[name] = {
+        "calls": len(samples),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+    }
+    print(f"  {name:40s} median {results[name]['median_ms']:10.4f} ms | p95 {results[name]['p95_ms']:10.4f} ms")
+
+
+class TickRoot:
+    """A single-threaded main loop with Tk's after() contract.
+
+    after() may be called from any thread; callbacks run on the thread
+    inside run(), which records how long each one holds the loop.
+    """
+
+    def __init__(self):
+        self.stalls = []  # ms per callback
+        self._incoming = queue.Queue()
+        self._timers = []
+        self._seq = itertools.count()
+
+    def after(self, ms, fn=None, *args):
+        if fn:
+            self._incoming.put((time.perf_counter() + ms / 1000, next(self._seq), fn, args))
+
+    def after_idle(self, fn, *args):
+        self.after(0, fn, *args)
+
+    def run(self, done, poll=0.005):
+        while not done():
+            timeout = max(0.0, self._timers[0][0] - time.perf_counter()) if self._timers else poll
+            try:
+                heapq.heappush(self._timers, self._incoming.get(timeout=min(timeout, poll)))
+                while True:
+                    heapq.heappush(self._timers, self._incoming.get_nowait())
+            except queue.Empty:
+                pass
+            while self._timers and self._timers[0][0] <= time.perf_counter():
+                _, _, fn, args = heapq.heappop(self._timers)
+                start = time.perf_counter()
+                fn(*args)
+                self.stalls.append((time.perf_counter() - start) * 1000)
+
+
+class InlineStorage:
+    """StorageExecutor's interface with the old behaviour: work runs on the caller"""
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None):
+        try:
+            result = fn(*args)
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(e)
+            return
+        if on_done:
+            on_done(result)
+
+    def join(self, timeout=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class SlowDisk:
+    """Database proxy adding a fixed latency to every notes call"""
+
+    CALLS = {"list_notes", "get_note", "add_note", "update_note", "delete_note"}
+
+    def __init__(self, db, latency):
+        self.db = db
+        self.latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self.db, name)
+        if name not in self.CALLS or not self.latency:
+            return attr
+
+        def slow(*args, **kwargs):
+            time.sleep(self.latency)
+            return attr(*args, **kwargs)
+        return slow
+
+
+def _reload_notes(app):
+    """Clear the notes list and request its first page again"""
+    app.notes_list.delete(*app.notes_list.get_children())
+    app._notes_after = None
+    app._notes_exhausted = False
+    app._load_notes_page()
+
+
+def _ui_session(db, executor, rng, actions=30, gap=0.02):
+    """Drive the notes UI through a TickRoot; returns per-callback stalls (ms) and wall time"""
+    app = headless_app(db, voice_engine=VoiceEngine(engine=NullTTS()))
+    root = app.root = TickRoot()
+    app.events = UIEventBus(root)
+    app._register_events()
+    app.events.start()
+    if executor:
+        app.storage = StorageExecutor(post=lambda deliver: app.events.post("storage", deliver))
+    else:
+        app.storage = InlineStorage()
+    steps = [lambda: _reload_notes(app)]
+    steps += [lambda: app._notes_page_pending or app._load_notes_page()] * actions
+    steps += [app.add_note] * actions
+    steps += [lambda: app.notes_list.rows and (setattr(app.notes_list, "selected", (rng.choice(list(app.notes_list.rows)),)),
+                                               app.edit_note())] * actions
+    steps += [lambda: app.notes_list.rows and (setattr(app.notes_list, "selected", (rng.choice(list(app.notes_list.rows)),)),
+                                               app.delete_note())] * actions
+    finished = threading.Event()
+    steps.append(lambda: app.storage.submit(lambda: None, on_done=lambda _: finished.set()))
+    for i, step in enumerate(steps):
+        root.after(i * gap * 1000, step)
+    start = time.perf_counter()
+    with mock.patch("friday.simpledialog.askstring", lambda *a, **k: _sentence(rng, 20)), \
+            mock.patch("friday.messagebox.askyesno", lambda *a, **k: True):
+        root.run(finished.is_set)
+    elapsed = time.perf_counter() - start
+    app.events.stop()
+    app.storage.close()
+    app.voice_engine.close()
+    return root.stalls, elapsed
+
+
+def _write_stand_in(directory, name, body):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(f"#!/bin/sh\n{body}\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+def _zombies(pids):
+    """How many of `pids` are zombie processes"""
+    count = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                count += f.read().rsplit(")", 1)[1].split()[0] == "Z"
+        except OSError:
+            pass
+    return count
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def bench_launch(spawns=50):
+    """App launching on Linux with stand-in executables on $PATH"""
+    print("=" * 70)
+    print("Process supervisor: stand-in apps on $PATH")
+    print("=" * 70)
+    if platform.system() != "Linux":
+        print("  skipped: the stand-in executables and /proc checks need Linux")
+        return True
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_dir = os.path.join(tmp, "bin")
+        os.mkdir(bin_dir)
+        for app in ("excel", "word", "powerpoint", "calculator"):
+            # Stays up until told to quit through a flag file
+            _write_stand_in(bin_dir, ApplicationLauncher.APPS[app]["Linux"],
+                            f'while [ ! -e "{tmp}/quit-{app}" ]; do sleep 0.02; done')
+        short = _write_stand_in(bin_dir, "short-lived", "exit 0")
+        path = os.environ["PATH"]
+        os.environ["PATH"] = bin_dir + os.pathsep + path
+        core = FridayCore(os.path.join(tmp, "launch.db"))
+        try:
+            start = time.perf_counter()
+            first = core.handle_command("open excel and word")
+            compound_ms = (time.perf_counter() - start) * 1000
+            supervisor = core.app_launcher.supervisor
+            excel, word = supervisor.running("excel"), supervisor.running("word")
+            print(f"  'open excel and word': {compound_ms:.1f} ms -> {first['message']!r}")
+            checks.append(("compound request launches both apps",
+                           first["ok"] and excel is not None and word is not None and excel.pid != word.pid))
+            with open(f"/proc/{excel.pid}/cmdline", "rb") as f:
+                argv = f.read().split(b"\0")
+            with open(f"/proc/{excel.pid}/stat") as f:
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+            # argv is the stand-in's shebang line plus its path, not sh -c "localc"
+            checks.append(("spawned directly, without sh -c", argv[1] != b"-c"
+                           and os.path.basename(argv[1].decode()) == "localc" and parent == os.getpid()))
+            again = core.handle_command("open excel")
+            print(f"  'open excel' again: {again['message']!r}")
+            checks.append(("repeat request reuses the running process",
+                           again.get("running") and supervisor.running("excel") is excel
+                           and supervisor.spawned == 2))
+
+            open(os.path.join(tmp, "quit-excel"), "w").close()
+            start = time.perf_counter()
+            reaped = _wait_for(lambda: supervisor.reaped >= 1)
+            print(f"  exited app reaped after {(time.perf_counter() - start) * 1000:.1f} ms "
+                  f"(includes the stand-in noticing its quit flag)")
+            checks.append(("exited app is reaped, not left a zombie", reaped and _zombies([excel.pid]) == 0))
+            os.remove(os.path.join(tmp, "quit-excel"))
+            relaunch = core.handle_command("open excel")
+            checks.append(("app is launched again after it exits",
+                           not relaunch.get("running") and supervisor.running("excel") not in (None, excel)))
+
+            many = core.handle_command("open powerpoint and calculator and teleporter")
+            print(f"  partial compound: {many['message']!r}")
+            checks.append(("unknown apps in a compound are reported",
+                           many["apps"] == ["powerpoint", "calculator"] and many["missing"] == ["teleporter"]))
+
+            # Fire-and-forget Popen, as before, against the supervisor
+            leaked = [subprocess.Popen([short]) for _ in range(spawns)]
+            time.sleep(0.3)
+            old_zombies = _zombies(p.pid for p in leaked)
+            for proc in leaked:
+                proc.wait()
+            reaper = ProcessSupervisor()
+            kept = [reaper.spawn(f"short-{i}", [short]) for i in range(spawns)]
+            _wait_for(lambda: reaper.reaped == spawns)
+            print(f"  {spawns} short-lived launches: {old_zombies} zombies unsupervised, "
+                  f"{_zombies(p.pid for p in kept)} supervised ({reaper.reaped} reaped)")
+            checks.append(("supervised children leave no zombies", _zombies(p.pid for p in kept) == 0))
+            reaper.close()
+
+            for label, launch in (("Popen(shell=True)", lambda: subprocess.Popen(short, shell=True).wait()),
+                                  ("Popen(argv)", lambda: subprocess.Popen([short]).wait())):
+                print(f"  spawn+exit {label:18s} {_summary(_time_calls(launch, [()] * spawns))}")
+            launcher = core.app_launcher
+            launcher._command = lambda name: [short]
+            names = [f"app-{i}" for i in range(8)]
+            for label, delay in (("stand-in spawn", 0.0), ("spawn + 50 ms blocking call", 0.05)):
+                spawn = ProcessSupervisor.spawn
+                launcher.supervisor = ProcessSupervisor()
+                launcher.supervisor.spawn = lambda name, argv, sup=launcher.supervisor: (
+                    time.sleep(delay), spawn(sup, name, argv))[1]  # e.g. ShellExecute on Windows
+                start = time.perf_counter()
+                for name in names:
+                    launcher.launch(name)
+                one_by_one = (time.perf_counter() - start) * 1000
+                launcher.supervisor.close()
+                launcher.supervisor = ProcessSupervisor()
+                launcher.supervisor.spawn = lambda name, argv, sup=launcher.supervisor: (
+                    time.sleep(delay), spawn(sup, name, argv))[1]
+                start = time.perf_counter()
+                launcher.launch_many(names)
+                print(f"  8 launches, {label:28s} {one_by_one:6.1f} ms one by one, "
+                      f"{(time.perf_counter() - start) * 1000:6.1f} ms concurrently")
+                launcher.supervisor.close()
+        finally:
+            for app in ("excel", "word", "powerpoint", "calculator"):
+                open(os.path.join(tmp, f"quit-{app}"), "w").close()
+            os.environ["PATH"] = path
+            core.close()
+            time.sleep(0.1)
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(ok for _, ok in checks)
+
+
+def _event_burst(bus, threads, replies, burst=50):
+    """Post replies (and their status text) from `threads` threads through a TickRoot.
+
+    With a UIEventBus they go through it; without, each one is its own
+    root.after(0, ...) as before the bus. Returns the measurements.
+    """
+    root = TickRoot()
+    applied, latency, renders = [], [], []
+    status = []
+    lock = threading.Lock()
+
+    def reply(sender, seq, posted_at):
+        latency.append((time.perf_counter() - posted_at) * 1000)
+        applied.append((sender, seq))
+
+    def set_status(text):
+        renders.append(text)
+        status[:] = [text]
+
+    if bus:
+        events = UIEventBus(root)
+        events.on("reply", reply)
+        events.on("status", set_status, coalesce=True)
+        events.start()
+
+        def post(sender, seq):
+            with lock:  # keep reply and status order identical across senders
+                events.post("reply", sender, seq, time.perf_counter())
+                events.post("status", f"{sender}:{seq}")
+    else:
+        def post(sender, seq):
+            now = time.perf_counter()
+            with lock:
+                root.after(0, lambda: (reply(sender, seq, now), set_status(f"{sender}:{seq}")))
+
+    def sender(n):
+        for seq in range(replies):
+            post(n, seq)
+            if seq % burst == burst - 1:
+                time.sleep(0.005)
+
+    workers = [threading.Thread(target=sender, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    total = threads * replies
+    root.run(lambda: len(applied) >= total and status == [f"{applied[-1][0]}:{applied[-1][1]}"])
+    elapsed = time.perf_counter() - start
+    for worker in workers:
+        worker.join()
+    latency.sort()
+    in_order = all([seq for s, seq in applied if s == n] == list(range(replies)) for n in range(threads))
+    return {
+        "callbacks": len(root.stalls), "busy_ms": sum(root.stalls), "renders": len(renders),
+        "p50": statistics.median(latency), "p95": latency[int(len(latency) * 0.95)], "max": latency[-1],
+        "elapsed": elapsed, "in_order": in_order, "stats": events.stats() if bus else None,
+    }
+
+
+def bench_events(threads=4, replies=2000):
+    """Cross-thread UI updates: one root.after each against the UI event bus"""
+    print("=" * 70)
+    print(f"UI event bus: {threads} threads x {replies:,} replies with status updates")
+    print("=" * 70)
+    checks = []
+    runs = {}
+    for label, bus in (("root.after per update", False), ("event bus", True)):
+        run = runs[bus] = _event_burst(bus, threads, replies)
+        print(f"  {label:22s} {run['callbacks']:7,} Tk callbacks {run['busy_ms']:8.1f} ms busy "
+              f"{run['renders']:7,} status renders | apply p50 {run['p50']:6.2f} ms "
+              f"p95 {run['p95']:6.2f} ms max {run['max']:6.2f} ms")
+    stats = runs[True]["stats"]
+    print(f"  bus: max queue depth {stats['max_depth']}, {stats['coalesced']:,} status updates coalesced")
+    checks.append(("replies applied in order per thread", runs[True]["in_order"]))
+    checks.append(("status renders coalesced", runs[True]["renders"] < threads * replies / 10))
+    checks.append(("fewer Tk callbacks than updates", runs[True]["callbacks"] < runs[False]["callbacks"] / 10))
+    checks.append(("apply latency within two drain intervals", runs[True]["p95"] < 2 * 16 + 5))
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(ok for _, ok in checks)
+
+
+def bench_ui(count=100000, latency=0.02, seed=23):
+    """Main-loop stalls while the notes UI works against a large database"""
+    print("=" * 70)
+    print(f"UI responsiveness: notes actions against {count:,} notes")
+    print("=" * 70)
+    checks = []
+    chatter = logging.getLogger("friday")
+    level = chatter.level
+    chatter.setLevel(logging.ERROR)  # every action logs its spoken reply
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "ui.db"), write_policy="block")
+        populate_notes(db, count)
+        results = {}
+        for disk, extra in (("local disk", 0.0), (f"disk +{latency * 1000:.0f} ms", latency)):
+            for mode, executor in (("on Tk thread", False), ("storage executor", True)):
+                stalls, elapsed = _ui_session(SlowDisk(db, extra), executor, random.Random(seed))
+                stalls.sort()
+                blocked = sum(stall for stall in stalls if stall > 16)
+                results[disk, executor] = stalls[-1]
+                print(f"  {disk:14s} {mode:17s} callback p50 {statistics.median(stalls):6.2f} ms"
+                      f" p99 {stalls[int(len(stalls) * 0.99)]:7.2f} ms max {stalls[-1]:7.2f} ms"
+                      f" | time in >16 ms stalls {blocked:6.0f} ms of {elapsed * 1000:5.0f} ms")
+        db.close()
+    chatter.setLevel(level)
+    delivered = []
+    executor = StorageExecutor(post=lambda deliver: deliver())
+    for page in range(5):  # e.g. reloading the list while a slow page query runs
+        executor.submit(lambda page=page: time.sleep(0.05) or page, on_done=delivered.append, key="page")
+    executor.join()
+    executor.close()
+    print(f"  5 superseding requests: {executor.cancelled} cancelled, {executor.stale} stale, delivered {delivered}")
+    checks.append(("superseded requests are never delivered", delivered == [4]))
+    slow = f"disk +{latency * 1000:.0f} ms"
+    checks.append(("executor keeps the worst stall under a frame on a slow disk", results[slow, True] < 16))
+    checks.append(("executor stalls less than inline storage", results[slow, True] < results[slow, False]))
+    for name, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}: {name}")
+    return all(ok for _, ok in checks)
+
+
+def _regress_storage(results, size, tmp, rng):
+    db = Database(os.path.join(tmp, f"regress_{size}.db"), write_policy="block")
+    populate_notes(db, size)
+    db.set_preference("voice_rate", "150")
+    app = headless_app(db)
+
+    _record(results, f"db.get_preference[{size}]",
+            _time_calls(db.get_preference, [("voice_rate",)] * 2000))
+    terms = [(rng.choice(VOCAB[200:300]),) for _ in range(50)]
+    _record(results, f"db.search_notes[{size}]", _time_calls(db.search_notes, terms))
+    _record(results, f"db.add_note[{size}]",
+            _time_calls(db.add_note, [("regress", _sentence(rng, 40)) for _ in range(200)]))
+    history = [(f"what's the weather {i}", True) for i in range(2000)]
+    _record(results, f"db.add_command_history[{size}]", _time_calls(db.add_command_history, history))
+    start = time.perf_counter()
+    db.flush()
+    _record(results, f"db.add_command_history.flush[{size}]", [(time.perf_counter() - start) * 1000])
+
+    first, pages = [], []
+    for _ in range(20):
+        start = time.perf_counter()
+        _reload_notes(app)
+        app.storage.join()
+        app.events.drain()
+        first.append((time.perf_counter() - start) * 1000)
+        for _ in range(9):
+            start = time.perf_counter()
+            app._load_notes_page()
+            app.storage.join()
+            app.events.drain()
+            pages.append((time.perf_counter() - start) * 1000)
+    _record(results, f"notes_list.first_page[{size}]", first)
+    _record(results, f"notes_list.next_page[{size}]", pages)
+    app.storage.close()
+    db.close()
+
+
+def _regress_dispatch(results, tmp, rng):
+    core = FridayCore(os.path.join(tmp, "regress_dispatch.db"))
+    core.app_launcher.launch = lambda name: True  # never start real programs
+    engine = NullTTS()
+    voice = VoiceEngine(engine=engine)
+    voice.ready.wait(5)
+    app = headless_app(core.db, core, voice)
+
+    commands = [(text,) for text, _, _ in INTENT_CORPUS] * 25
+    rng.shuffle(commands)
+
+    def command(text):
+        app.on_voice_command(text)
+        app.events.drain()  # what the Tk thread does on its next tick
+    _record(results, "on_voice_command", _time_calls(command, commands))
+    core.tracer.enabled = True
+
+    def traced_command(text):
+        with core.tracer.begin().activate():
+            command(text)
+    _record(results, "on_voice_command.traced", _time_calls(traced_command, commands))
+    core.tracer.enabled = False
+    categories = [(c,) for c in ("greeting", "success", "error", "note", "farewell", "witty")] * 2000
+    _record(results, "personality.get_random", _time_calls(FRIDAYPersonality.get_random, categories))
+    apps = [(name,) for name in ApplicationLauncher.APPS] * 1000
+    _record(results, "personality.app_launch_message", _time_calls(FRIDAYPersonality.app_launch_message, apps))
+
+    # Fake microphone: synthetic recording -> segmentation -> fixture recognizer -> dispatch
+    path = os.path.join(tmp, "regress_mic.wav")
+    write_synthetic_wav(path, [0.6, 0.8, 1.0, 1.2])
+    start = time.perf_counter()
+    utterances = load_utterances([path])
+    _record(results, "fake_mic.segment_recording", [(time.perf_counter() - start) * 1000])
+    spoken = ["open calculator", "add a note", "what's the weather", "stop listening"]
+    pipeline = RecognitionPipeline(
+        [FixtureBackend({FixtureBackend.fingerprint(a): spoken[i % len(spoken)]
+                         for i, (a, _) in enumerate(utterances)}, latency=0)],
+        lambda text: None)
+    samples = []
+    for _ in range(200):
+        for audio, _ in utterances:
+            start = time.perf_counter()
+            ok, text = pipeline.recognize(audio)
+            if ok:
+                command(text)
+            samples.append((time.perf_counter() - start) * 1000)
+    _record(results, "fake_mic.recognize_and_dispatch", samples)
+    voice.close()
+    core.close()
+    return engine.spoken
+
+
+def compare_results(results, baseline, tolerance=1.5, floor_ms=0.05):
+    """Cases whose median got slower than baseline * tolerance.
+
+    Differences under floor_ms are ignored: they are timer noise for the
+    microsecond-scale cases.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        before = baseline.get(name)
+        if not before:
+            continue
+        old, new = before["median_ms"], result["median_ms"]
+        if new > old * tolerance and new - old > floor_ms:
+            regressions.append((name, old, new))
+    return regressions
+
+
+def bench_regress(sizes, output=None, baseline_path="benchmark_baseline.json",
+                  save_baseline=False, tolerance=1.5, seed=11):
+    """Regression suite over the storage, dispatch and UI-model hot paths"""
+    print("=" * 70)
+    print(f"Regression suite (table sizes {', '.join(map(str, sizes))})")
+    print("=" * 70)
+    logging.getLogger("friday").setLevel(logging.WARNING)  # keep log I/O out of the numbers
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            _regress_storage(results, size, tmp, rng)
+        spoken = _regress_dispatch(results, tmp, rng)
+    print(f"  fake TTS received {spoken} utterances")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"  results written to {output}")
+    if save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"  baseline saved to {baseline_path}")
+        return True
+    if not os.path.exists(baseline_path):
+        # Timings only compare on one machine, so no baseline is committed
+        print(f"  SKIP: no baseline at {baseline_path}; run with --save-baseline to create one")
+        return True
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    if not results.keys() & baseline.keys():
+        print(f"  FAIL: {baseline_path} has none of these cases (different --sizes?)")
+        return False
+    regressions = compare_results(results, baseline, tolerance)
+    for name, old, new in regressions:
+        print(f"  REGRESSION {name}: {old:.4f} ms -> {new:.4f} ms ({new / old:.2f}x)")
+    print(f"  {'FAIL' if regressions else 'PASS'}: {len(regressions)} regressions "
+          f"against {baseline_path} (tolerance {tolerance:.2f}x)")
+    return not regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FRIDAY benchmarks")
+    parser.add_argument("suite", nargs="?", default="search", choices=["search", "stress", "recognition", "dispatch", "daemon", "migrate", "reminders", "usage", "logging", "preferences", "transfer", "storage", "ui", "events", "launch", "wake", "regress"])
+    parser.add_argument("--sizes",
+                        help="comma-separated table sizes (search, migrate: 10000,100000,1000000; "
+                             "regress: 1000,10000,100000)")
+    parser.add_argument("--threads", type=int, help="stress (16) and events (4) suites")
+    parser.add_argument("--ops", type=int, default=500, help="operations per thread")
+    parser.add_argument("--fixtures", help="directory of recorded WAV fixtures (recognition, wake)")
+    parser.add_argument("--backend", default="fixture", choices=["fixture", "google", "sphinx"])
+    parser.add_argument("--latency", type=float, default=0.25,
+                        help="simulated latency of the fixture backend (seconds)")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent daemon clients")
+    parser.add_argument("--requests", type=int, default=200, help="requests per daemon client")
+    parser.add_argument("--pipeline", type=int, default=8, help="in-flight requests per daemon client")
+    parser.add_argument("--socket", help="load-test a running daemon instead of an in-process one")
+    parser.add_argument("--count", type=int,
+                        help="rows for the reminders, usage, transfer (100000) and storage (5000) suites")
+    parser.add_argument("--disk-latency", type=float, default=20,
+                        help="ui: simulated storage latency per call (ms)")
+    parser.add_argument("--json", help="write regress results to this file")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="regress baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the regress baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="regress: allowed slowdown factor before a case fails")
+    args = parser.parse_args()
+    setup_logging(None)
+    default_sizes = "1000,10000,100000" if args.suite == "regress" else "10000,100000,1000000"
+    sizes = [int(s) for s in (args.sizes or default_sizes).split(",") if s]
+
+    if args.suite == "search":
+        bench_search(sizes)
+    elif args.suite == "stress":
+        return 0 if stress_database(args.threads or 16, args.ops) else 1
+    elif args.suite == "recognition":
+        bench_recognition(args.fixtures, args.backend, args.latency)
+    elif args.suite == "dispatch":
+        return 0 if bench_dispatch() else 1
+    elif args.suite == "daemon":
+        return 0 if bench_daemon(args.clients, args.requests, args.pipeline, args.socket) else 1
+    elif args.suite == "migrate":
+        bench_migrate(sizes)
+    elif args.suite == "reminders":
+        return 0 if bench_reminders(args.count or 100000) else 1
+    elif args.suite == "usage":
+        return 0 if bench_usage(args.count or 100000) else 1
+    elif args.suite == "logging":
+        return 0 if bench_logging() else 1
+    elif args.suite == "preferences":
+        return 0 if bench_preferences() else 1
+    elif args.suite == "transfer":
+        return 0 if bench_transfer(args.count or 100000) else 1
+    elif args.suite == "storage":
+        return 0 if bench_storage(args.count or 5000) else 1
+    elif args.suite == "ui":
+        return 0 if bench_ui(args.count or 100000, args.disk_latency / 1000) else 1
+    elif args.suite == "events":
+        return 0 if bench_events(args.threads or 4, args.count or 2000) else 1
+    elif args.suite == "launch":
+        return 0 if bench_launch() else 1
+    elif args.suite == "wake":
+        return 0 if bench_wake(args.fixtures) else 1
+    elif args.suite == "regress":
+        return 0 if bench_regress(sizes, args.json, args.baseline, args.save_baseline, args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
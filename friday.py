@@ -9,43 +9,162 @@ Author: FRIDAY Development Team
 Version: 3.5 (Iron Man Edition - With Voice & Personality)
 """
 
+import time
+STARTUP_T0 = time.perf_counter()
+
 import os
 import sys
-import time
 import logging
+import logging.handlers
+import atexit
+import gzip
 import sqlite3
 import threading
+import queue
 import platform
 import subprocess
 import random
+import re
+import itertools
+import importlib
+import importlib.util
+import contextlib
+import argparse
+import asyncio
+import socket
+import tempfile
+import hashlib
+import heapq
+import zlib
+import selectors
+import uuid
+import difflib
+import json
+import shlex
+import shutil
+import glob
+import math
+import wave
 from datetime import datetime
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from tkinter import (
     Tk, Frame, Label, Button, messagebox, simpledialog, ttk, 
-    BooleanVar, DoubleVar, IntVar, StringVar, Canvas, Text
+    Scale, TclError, BooleanVar, DoubleVar, IntVar, StringVar, Canvas, Text
 )
 import tkinter.font as tkFont
-import speech_recognition as sr
 
-try:
-    import pyttsx3
-    HAS_PYTTSX3 = True
-except ImportError:
-    HAS_PYTTSX3 = False
-    logger_temp = logging.getLogger(__name__)
-    logger_temp.warning("pyttsx3 not installed. Install with: pip install pyttsx3")
+
+class _LazyModule:
+    """Stand-in for a heavy module; imports it on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# speech_recognition and pyttsx3 are slow to import; load them off the
+# startup path (pyttsx3 is imported on the speech thread).
+sr = _LazyModule("speech_recognition")
+audioop = _LazyModule("audioop")
+HAS_PYTTSX3 = importlib.util.find_spec("pyttsx3") is not None
 
 
 # ==========================================================
 # LOGGING CONFIGURATION
 # ==========================================================
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('friday_assistant.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, for log tooling"""
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    """Compress the file being rotated out (runs on the listener thread)"""
+    with open(source, "rb") as src, gzip.open(dest, "wb") as out:
+        shutil.copyfileobj(src, out)
+    os.remove(source)
+
+
+_log_listener = None
+
+
+def setup_logging(path="friday_assistant.log", json_lines=False, max_bytes=5 * 2 ** 20,
+                  backups=5, when=None, level=logging.INFO, console=True):
+    """Route all logging through a queue to one listener thread.
+
+    Callers only enqueue records, so a slow disk never stalls the Tk or
+    voice threads. The file rotates at `max_bytes`, or on the `when`
+    schedule of TimedRotatingFileHandler (e.g. 'midnight') if given; rotated
+    files are gzipped and only the newest `backups` are kept. With no
+    `path` records only go to the console. Calling it again replaces the
+    previous configuration.
+    """
+    global _log_listener
+    if _log_listener:
+        _log_listener.stop()
+    handlers = []
+    if path and when:
+        handlers.append(logging.handlers.TimedRotatingFileHandler(
+            path, when=when, backupCount=backups, encoding="utf-8", delay=True))
+    elif path:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True))
+    for file_handler in handlers:
+        file_handler.namer = _gzip_namer
+        file_handler.rotator = _gzip_rotator
+    if console:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    formatter = JsonLinesFormatter() if json_lines else logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    return _log_listener
+
+
+def shutdown_logging():
+    """Write out queued records and close the log files"""
+    global _log_listener
+    if _log_listener:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+
+
+atexit.register(shutdown_logging)
 logger = logging.getLogger(__name__)
 
 
@@ -80,6 +199,18 @@ class FRIDAYPersonality:
         "Right away, Sir. {app} is being launched.",
     ]
     
+    APP_RUNNING_RESPONSES = [
+        "{app} is already running, Sir. Bringing it up.",
+        "{app} is already open, Sir.",
+        "You have {app} open already, Sir.",
+    ]
+
+    REMINDER_RESPONSES = [
+        "Sir, you asked me to remind you to {text}.",
+        "A reminder, Sir: {text}.",
+        "Pardon the interruption, Sir. Time to {text}.",
+    ]
+
     SUCCESS_RESPONSES = [
         "Task complete, Sir.",
         "Done, Sir.",
@@ -147,280 +278,4048 @@ class FRIDAYPersonality:
         template = random.choice(FRIDAYPersonality.APP_LAUNCH_RESPONSES)
         return template.format(app=app_name)
 
+    @staticmethod
+    def app_running_message(app_name):
+        """Get message for an app that is already running"""
+        template = random.choice(FRIDAYPersonality.APP_RUNNING_RESPONSES)
+        return template.format(app=app_name)
+
+    @staticmethod
+    def reminder_message(text):
+        """Get reminder announcement"""
+        template = random.choice(FRIDAYPersonality.REMINDER_RESPONSES)
+        return template.format(text=text)
+
+    @staticmethod
+    def all_phrases(app_names=()):
+        """Every canned phrase FRIDAY can say (launch messages for each app)"""
+        phrases = (
+            FRIDAYPersonality.GREETINGS + FRIDAYPersonality.STARTUP_MESSAGES
+            + FRIDAYPersonality.SUCCESS_RESPONSES + FRIDAYPersonality.ERROR_RESPONSES
+            + FRIDAYPersonality.NOTE_RESPONSES + FRIDAYPersonality.FAREWELL_MESSAGES
+            + FRIDAYPersonality.WITTY_RESPONSES
+        )
+        for app in app_names:
+            phrases += [t.format(app=app) for t in FRIDAYPersonality.APP_LAUNCH_RESPONSES]
+            phrases += [t.format(app=app) for t in FRIDAYPersonality.APP_RUNNING_RESPONSES]
+        return list(dict.fromkeys(phrases))
+
+
+def _percentile_ms(sorted_seconds, q):
+    """q-th percentile of a sorted list of seconds, in milliseconds"""
+    if not sorted_seconds:
+        return None
+    index = min(len(sorted_seconds) - 1, int(len(sorted_seconds) * q))
+    return round(sorted_seconds[index] * 1000, 1)
+
+
+# ==========================================================
+# LATENCY TRACING
+# ==========================================================
+class Trace:
+    """Stage latencies of one utterance, from capture to the start of speech.
+
+    The trace travels with the utterance: in the capture/recognition queues,
+    as the calling thread's current trace (`activate`/`current`) while the
+    command is handled, and with the reply to the speech worker. Whoever
+    handles the last stage calls `finish`, which reports it to the tracer.
+    """
+
+    _local = threading.local()
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self.id = uuid.uuid4().hex[:16]
+        self.stages = {}  # stage -> seconds
+        self._finished = False
+
+    def __bool__(self):
+        return True
+
+    def mark(self, stage, since):
+        """Record `stage` as having taken from `since` until now"""
+        self.stages[stage] = time.perf_counter() - since
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = time.perf_counter() - start
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make this the calling thread's current trace"""
+        previous = getattr(Trace._local, "trace", NULL_TRACE)
+        Trace._local.trace = self
+        try:
+            yield self
+        finally:
+            Trace._local.trace = previous
+
+    @staticmethod
+    def current():
+        return getattr(Trace._local, "trace", NULL_TRACE)
+
+    def as_ms(self):
+        return {stage: round(seconds * 1000, 2) for stage, seconds in self.stages.items()}
+
+    def finish(self):
+        if not self._finished:
+            self._finished = True
+            self.tracer.finish(self)
+
+
+class _NullTrace:
+    """Stand-in when tracing is off: every operation is a no-op"""
+
+    id = None
+    stages = {}
+    _context = contextlib.nullcontext()
+
+    def __bool__(self):
+        return False
+
+    def mark(self, stage, since):
+        pass
+
+    def stage(self, name):
+        return self._context
+
+    def activate(self):
+        return self._context
+
+    def as_ms(self):
+        return {}
+
+    def finish(self):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+class LatencyTracer:
+    """Rolling per-stage latency histograms for the voice command pipeline.
+
+    Disabled, `begin` hands out NULL_TRACE and nothing is timed. Finished
+    traces feed a window of the last `window` samples per stage and are
+    passed to `on_finish` (used to persist them with the history row).
+    """
+
+    STAGES = ("mic_open", "adjust", "listen", "wake", "recognize", "dispatch", "launch", "after_hop", "tts_start")
+
+    def __init__(self, enabled=False, window=500, on_finish=None):
+        self.enabled = enabled
+        self.on_finish = on_finish
+        self.traces = 0
+        self.samples = {stage: deque(maxlen=window) for stage in self.STAGES}
+        self._lock = threading.Lock()
+
+    def begin(self):
+        return Trace(self) if self.enabled else NULL_TRACE
+
+    def record(self, stage, seconds):
+        with self._lock:
+            if stage not in self.samples:
+                self.samples[stage] = deque(maxlen=next(iter(self.samples.values())).maxlen)
+            self.samples[stage].append(seconds)
+
+    def finish(self, trace):
+        with self._lock:
+            self.traces += 1
+        for stage, seconds in trace.stages.items():
+            self.record(stage, seconds)
+        if self.on_finish:
+            try:
+                self.on_finish(trace)
+            except Exception as e:
+                logger.error(f"Trace sink error: {e}")
+
+    def stats(self):
+        """{stage: {count, p50_ms, p95_ms, p99_ms}} for stages with samples"""
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self.samples.items() if samples}
+        return {
+            stage: {
+                "count": len(samples),
+                "p50_ms": _percentile_ms(samples, 0.50),
+                "p95_ms": _percentile_ms(samples, 0.95),
+                "p99_ms": _percentile_ms(samples, 0.99),
+            }
+            for stage, samples in snapshot.items()
+        }
+
+    def report(self):
+        stats = self.stats()
+        if not stats:
+            return "No latency samples recorded"
+        lines = [f"{'stage':12s} {'count':>7s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}"]
+        for stage in sorted(stats, key=lambda s: self.STAGES.index(s) if s in self.STAGES else len(self.STAGES)):
+            row = stats[stage]
+            lines.append(f"{stage:12s} {row['count']:7d} {row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f}")
+        return "\n".join(lines)
+
+
+# ==========================================================
+# SPEECH CACHE
+# ==========================================================
+class SpeechCache:
+    """Pre-rendered audio for canned phrases, LRU-evicted on disk.
+
+    Files are keyed by text, voice, rate and volume, so changing any of them
+    renders fresh audio. Only phrases registered with `add_phrases` are
+    rendered; everything else is synthesized live.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".friday", "tts_cache")
+        self.max_bytes = max_bytes
+        self.ext = ".aiff" if platform.system() == "Darwin" else ".wav"
+        self.phrases = set()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def add_phrases(self, phrases):
+        self.phrases.update(phrases)
+
+    def path_for(self, text, voice, rate, volume):
+        key = hashlib.sha1(f"{voice}|{rate}|{volume}|{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + self.ext)
+
+    def get(self, text, voice, rate, volume):
+        """Path of the rendered phrase, or None on a miss"""
+        path = self.path_for(text, voice, rate, volume)
+        try:
+            os.utime(path)  # mtime doubles as the LRU timestamp
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def render(self, engine, text, voice, rate, volume, cancelled=None):
+        """Render text to the cache with the TTS engine (speech thread only).
+
+        When `cancelled()` is true afterwards the engine was stopped part way
+        and the partial file is discarded.
+        """
+        path = self.path_for(text, voice, rate, volume)
+        tmp = path + ".part" + self.ext
+        try:
+            engine.save_to_file(text, tmp)
+            engine.runAndWait()
+            if not (cancelled and cancelled()) and os.path.getsize(tmp) > 0:
+                os.replace(tmp, path)
+                self.evict()
+                return path
+        except Exception as e:
+            logger.error(f"Speech cache render error: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+
+    def evict(self):
+        """Delete least recently used files until the cache fits max_bytes"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.ext) and ".part" not in entry.name:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError as e:
+                logger.error(f"Speech cache evict error: {e}")
+
+
+class AudioPlayer:
+    """Plays rendered audio files with the platform's stock player"""
+
+    def __init__(self):
+        self.system = platform.system()
+        self._proc = None
+        if self.system == "Windows":
+            self.command = None
+            self.available = True
+        elif self.system == "Darwin":
+            self.command = ["afplay"]
+            self.available = True
+        else:
+            player = shutil.which("paplay") or shutil.which("aplay")
+            self.command = [player] if player else None
+            self.available = player is not None
+
+    def play(self, path):
+        """Play path to completion (or until stop)"""
+        if self.system == "Windows":
+            import winsound
+            winsound.PlaySound(path, winsound.SND_FILENAME)
+            return
+        self._proc = subprocess.Popen(
+            self.command + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self._proc.wait()
+        self._proc = None
+
+    def stop(self):
+        if self.system == "Windows":
+            import winsound
+            winsound.PlaySound(None, winsound.SND_PURGE)
+        elif self._proc:
+            self._proc.terminate()
+
+
+# ==========================================================
+# SPEECH WORKER
+# ==========================================================
+class SpeechWorker:
+    """Single long-lived thread that owns the TTS engine.
+
+    Messages are spoken in priority order (URGENT, NORMAL, STATUS), FIFO
+    within a priority. A message queued with a `key` supersedes any older
+    message with the same key that has not been spoken yet, so a burst of
+    status updates collapses to the latest one. URGENT messages also stop
+    the utterance in progress.
+
+    `engine` is anything with pyttsx3's say/runAndWait/stop interface, which
+    keeps the worker testable with a fake engine. Alternatively `factory`
+    creates the engine on the speech thread itself, so a slow engine start
+    never blocks the caller; `on_ready(ok)` reports when that finished and
+    messages queued meanwhile are spoken afterwards. With a SpeechCache,
+    cached phrases are played from disk and canned phrases are rendered at
+    RENDER priority whenever the worker is otherwise idle; a render in
+    progress is stopped as soon as anything is queued to be spoken, and
+    retried later.
+    """
+
+    URGENT, NORMAL, STATUS, RENDER = 0, 1, 2, 3
+
+    def __init__(self, engine=None, cache=None, factory=None, on_ready=None):
+        self.engine = engine
+        self.cache = cache
+        self._factory = factory
+        self._on_ready = on_ready
+        self.player = AudioPlayer() if cache else None
+        self._playing = False
+        self.queue = queue.PriorityQueue()
+        self.spoken = 0
+        self.coalesced = 0
+        self.interrupted = 0
+        self.first_audio_times = deque(maxlen=200)  # seconds from queued to audio
+        self._seq = itertools.count()
+        self._latest = {}  # key -> seq of the newest queued message
+        self._lock = threading.Lock()
+        self._current = None  # (priority, queued_at) of the utterance in progress
+        self._audio_started = False
+        self._render_stopped = False
+        self._properties = {}  # engine properties to set before the next utterance
+        self._thread = threading.Thread(target=self._run, name="friday-speech", daemon=True)
+        self._thread.start()
+
+    def say(self, text, priority=NORMAL, key=None, wait=False, trace=NULL_TRACE):
+        """Queue text; with wait=True block until it was spoken or dropped.
+
+        `trace` gets its tts_start stage when the text reaches the engine and
+        is finished then (or when the text is dropped).
+        """
+        done = threading.Event() if wait else None
+        seq = next(self._seq)
+        with self._lock:
+            if key is not None:
+                self._latest[key] = seq
+            current = self._current
+            rendering = current is not None and current[0] == self.RENDER and not self._render_stopped
+            if rendering:
+                self._render_stopped = True
+            self.queue.put((priority, seq, time.perf_counter(), text, key, done, trace))
+        if rendering:
+            self._stop_render()
+        elif priority == self.URGENT and current and self.URGENT < current[0] < self.RENDER:
+            self.interrupt()
+        if done:
+            done.wait()
+
+    def prerender(self, phrases):
+        """Queue background rendering of phrases that are not cached yet"""
+        if not self.cache:
+            return
+        self.cache.add_phrases(phrases)
+        for text in phrases:
+            self.queue.put((self.RENDER, next(self._seq), time.perf_counter(), text, None, None, NULL_TRACE))
+
+    def set_property(self, name, value):
+        """Change an engine property (rate, volume, voice) from any thread.
+
+        Applied on the speech thread before the next utterance, so the
+        engine is never reinitialized or touched off its own thread.
+        """
+        with self._lock:
+            self._properties[name] = value
+
+    def _apply_properties(self):
+        with self._lock:
+            properties, self._properties = self._properties, {}
+        for name, value in properties.items():
+            try:
+                self.engine.setProperty(name, value)
+            except Exception as e:
+                logger.error(f"TTS property {name}={value!r} not applied: {e}")
+
+    def interrupt(self):
+        """Stop the utterance in progress"""
+        try:
+            if self._playing:
+                self.player.stop()
+            else:
+                self.engine.stop()
+            self.interrupted += 1
+        except Exception as e:
+            logger.error(f"Speech interrupt error: {e}")
+
+    def _stop_render(self):
+        """Make a background render give way to speech"""
+        try:
+            self.engine.stop()
+        except Exception as e:
+            logger.error(f"Speech render stop error: {e}")
+
+    def stats(self):
+        """Queue depth and time-to-first-audio summary"""
+        samples = sorted(self.first_audio_times)
+        return {
+            "queue_depth": self.queue.qsize(),
+            "spoken": self.spoken,
+            "coalesced": self.coalesced,
+            "interrupted": self.interrupted,
+            "cache_hits": self.cache.hits if self.cache else 0,
+            "cache_misses": self.cache.misses if self.cache else 0,
+            "first_audio_p50_ms": _percentile_ms(samples, 0.50),
+            "first_audio_p95_ms": _percentile_ms(samples, 0.95),
+        }
+
+    def close(self, timeout=2):
+        self.queue.put((self.URGENT, -1, 0.0, None, None, None, NULL_TRACE))
+        self._thread.join(timeout)
+
+    def _on_started(self, *args, **kwargs):
+        with self._lock:
+            current = self._current
+            if current and not self._audio_started:
+                self._audio_started = True
+                self.first_audio_times.append(time.perf_counter() - current[1])
+
+    def _start_engine(self):
+        if self.engine is None and self._factory:
+            self.engine = self._factory()
+        connect = getattr(self.engine, "connect", None)
+        if connect:
+            try:
+                connect("started-utterance", self._on_started)
+            except Exception as e:
+                logger.debug(f"TTS engine has no start callback: {e}")
+        if self._on_ready:
+            self._on_ready(self.engine is not None)
+
+    def _run(self):
+        self._start_engine()
+        while True:
+            priority, seq, queued_at, text, key, done, trace = self.queue.get()
+            if text is None:
+                break
+            if self.engine is not None and self._properties:
+                self._apply_properties()
+            if self.engine is None or priority == self.RENDER:
+                if self.engine is not None:
+                    self._render(text, queued_at)
+                trace.finish()
+                if done:
+                    done.set()
+                continue
+            with self._lock:
+                stale = key is not None and self._latest.get(key) != seq
+                if not stale:
+                    self._current = (priority, queued_at)
+                    self._audio_started = False
+            if stale:
+                self.coalesced += 1
+                trace.finish()
+            else:
+                trace.mark("tts_start", queued_at)
+                trace.finish()
+                try:
+                    self._speak(text)
+                    self.spoken += 1
+                except Exception as e:
+                    logger.error(f"Speech error: {e}")
+                finally:
+                    with self._lock:
+                        if not self._audio_started:
+                            # Engine without a start callback: count when it returned
+                            self.first_audio_times.append(time.perf_counter() - queued_at)
+                        self._current = None
+            if done:
+                done.set()
+
+    def _voice_key(self):
+        """(voice, rate, volume) of the engine, part of every cache key"""
+        return tuple(self.engine.getProperty(name) for name in ("voice", "rate", "volume"))
+
+    def _speak(self, text):
+        if self.cache and self.player.available:
+            voice_key = self._voice_key()
+            path = self.cache.get(text, *voice_key)
+            if path:
+                self._on_started()
+                self._playing = True
+                try:
+                    self.player.play(path)
+                finally:
+                    self._playing = False
+                return
+            if text in self.cache.phrases:
+                # Render on first use so the next time is a cache hit
+                self.queue.put((self.RENDER, next(self._seq), time.perf_counter(), text, None, None, NULL_TRACE))
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def _render(self, text, queued_at):
+        if not (self.cache and self.player.available):
+            return
+        voice_key = self._voice_key()
+        if os.path.exists(self.cache.path_for(text, *voice_key)):
+            return
+        with self._lock:
+            # Speech queued before this point is seen here, later speech
+            # finds _current set and stops the render (see say)
+            with self.queue.mutex:
+                speech_pending = bool(self.queue.queue) and self.queue.queue[0][0] < self.RENDER
+            if not speech_pending:
+                self._current = (self.RENDER, queued_at)
+                self._render_stopped = False
+        if not speech_pending:
+            try:
+                self.cache.render(self.engine, text, *voice_key, cancelled=lambda: self._render_stopped)
+            finally:
+                with self._lock:
+                    self._current = None
+        if speech_pending or self._render_stopped:
+            # Speech pre-empted it: try again once the queue is idle
+            self.queue.put((self.RENDER, next(self._seq), time.perf_counter(), text, None, None, NULL_TRACE))
+
+
+# ==========================================================
+# TEXT TO SPEECH ENGINE
+# ==========================================================
+class VoiceEngine:
+    """Text-to-speech engine using pyttsx3.
+
+    With `preferences`, the voice_rate and voice_volume preferences are
+    applied at start and again whenever they change.
+    """
+
+    URGENT, NORMAL, STATUS = SpeechWorker.URGENT, SpeechWorker.NORMAL, SpeechWorker.STATUS
+    PREFERENCES = {"voice_rate": ("rate", int), "voice_volume": ("volume", float)}
+    
+    def __init__(self, engine=None, cache=None, on_ready=None, preferences=None):
+        self.enabled = HAS_PYTTSX3 or engine is not None
+        self.engine = engine
+        self.worker = None
+        self.ready = threading.Event()
+        self._on_ready = on_ready
+        if self.enabled:
+            self.worker = SpeechWorker(engine, cache, factory=self._create_engine, on_ready=self._ready)
+        else:
+            logger.warning("pyttsx3 not available. Voice disabled. Install with: pip install pyttsx3")
+            self._ready(False)
+        if preferences is not None:
+            for key in self.PREFERENCES:
+                value = preferences.get(key)
+                if value is not None:
+                    self._on_preference(key, value)
+            preferences.subscribe(self._on_preference, *self.PREFERENCES)
+
+    def _on_preference(self, key, value):
+        name, convert = self.PREFERENCES[key]
+        try:
+            self.set_property(name, convert(value))
+        except ValueError:
+            logger.error(f"Ignoring invalid {key} preference: {value!r}")
+
+    def set_property(self, name, value):
+        """Change rate/volume/voice live; takes effect from the next utterance"""
+        if self.worker:
+            self.worker.set_property(name, value)
+
+    def _create_engine(self):
+        """Start pyttsx3 (runs on the speech thread)"""
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            # Configure for FRIDAY's voice
+            engine.setProperty('rate', 150)  # Speed
+            engine.setProperty('volume', 0.9)  # Volume
+            
+            # Try to set female voice
+            voices = engine.getProperty('voices')
+            if len(voices) > 0:
+                # Use first female voice if available
+                for voice in voices:
+                    if 'female' in voice.name.lower():
+                        engine.setProperty('voice', voice.id)
+                        break
+            
+            logger.info("VoiceEngine initialized with pyttsx3")
+            return engine
+        except Exception as e:
+            logger.error(f"VoiceEngine initialization error: {e}")
+            return None
+
+    def _ready(self, ok):
+        self.enabled = ok
+        if self.worker:
+            self.engine = self.worker.engine
+        self.ready.set()
+        if self._on_ready:
+            self._on_ready(ok)
+    
+    def speak(self, text, priority=NORMAL):
+        """Speak text and wait until it has been spoken"""
+        if not self.enabled:
+            logger.warning(f"Voice disabled. Text: {text}")
+            return
+        logger.info(f"FRIDAY: {text}")
+        self.worker.say(text, priority, wait=True)
+    
+    def speak_async(self, text, priority=NORMAL, key=None, trace=NULL_TRACE):
+        """Queue text on the speech worker; STATUS messages coalesce by default"""
+        if not self.enabled:
+            logger.warning(f"Voice disabled. Text: {text}")
+            trace.finish()
+            return
+        if priority == self.STATUS and key is None:
+            key = "status"
+        logger.info(f"FRIDAY: {text}")
+        self.worker.say(text, priority, key, trace=trace)
+
+    def prerender(self, phrases):
+        """Render canned phrases to the speech cache in the background"""
+        if self.worker:
+            self.worker.prerender(phrases)
+
+    def stats(self):
+        return self.worker.stats() if self.worker else {}
+
+    def close(self):
+        if self.worker:
+            self.worker.close()
+
+
+# ==========================================================
+# MODERN COLORS & THEME (Iron Man Edition)
+# ==========================================================
+class Theme:
+    """Iron Man cyberpunk theme"""
+    PRIMARY = "#FFB81C"           # Iron Man Gold
+    SECONDARY = "#DC143C"         # Stark Red
+    TERTIARY = "#00BFFF"          # Sky Blue
+    BACKGROUND = "#0a0e27"        # Deep Blue-Black
+    SURFACE = "#16213e"           # Surface Blue
+    SURFACE_LIGHT = "#1f3a52"     # Lighter Surface
+    SURFACE_LIGHTER = "#2a5f7f"   # Even Lighter
+    TEXT_PRIMARY = "#ffffff"      # White
+    TEXT_SECONDARY = "#b0b0b0"    # Gray
+    SUCCESS = "#00ff41"           # Green
+    ERROR = "#ff006e"             # Pink/Red
+    WARNING = "#ffb800"           # Orange
+    ACCENT = "#FFB81C"            # Gold
+
+
+# ==========================================================
+# WRITE-BEHIND QUEUE
+# ==========================================================
+class WriteBehindQueue:
+    """Background writer that group-commits queued statements.
+
+    Statements are batched into one transaction and committed once `max_batch`
+    are pending or `max_delay` seconds after the first one arrived, so callers
+    never wait on disk. When the bounded queue is full, `policy` decides:
+    "block" waits for room, "drop_newest" discards the new statement and
+    "drop_oldest" evicts the oldest pending one to make room.
+    """
+
+    POLICIES = ("block", "drop_newest", "drop_oldest")
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(self, connect, max_batch=64, max_delay=0.5, maxsize=1000, policy="drop_oldest"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown back-pressure policy: {policy}")
+        self.connect = connect
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.policy = policy
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.written = 0
+        self._thread = threading.Thread(target=self._run, name="friday-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, sql, params=()):
+        """Queue a statement; returns False if it was dropped"""
+        item = (sql, params)
+        if self.policy == "block":
+            self.queue.put(item)
+            return True
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return True
+            except queue.Full:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    logger.warning(f"Write queue full ({self.policy}), {self.dropped} statements dropped so far")
+                if self.policy == "drop_newest":
+                    return False
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is committed"""
+        if not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self.queue.put((self._FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5):
+        """Commit pending statements and stop the writer thread"""
+        if self._thread.is_alive():
+            self.queue.put((self._STOP, None))
+            self._thread.join(timeout)
+
+    def _run(self):
+        conn = self.connect()
+        running = True
+        while running:
+            item = self.queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.max_delay
+            while True:
+                if item[0] is self._STOP:
+                    running = False
+                    break
+                if item[0] is self._FLUSH:
+                    waiters.append(item[1])
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            self._write(conn, batch)
+            for waiter in waiters:
+                waiter.set()
+        conn.close()
+
+    def _write(self, conn, batch):
+        if not batch:
+            return
+        try:
+            with conn:
+                for sql, params in batch:
+                    conn.execute(sql, params)
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            logger.error(f"Write-behind batch of {len(batch)} failed: {e}")
+
+
+# ==========================================================
+# CONNECTION MANAGER
+# ==========================================================
+class ConnectionManager:
+    """Per-thread SQLite connections in WAL mode.
+
+    Every thread gets its own connection, so the Tk thread, the voice
+    listener and the background writer never share a cursor, and WAL lets
+    readers proceed while another connection is writing. With WAL,
+    synchronous=NORMAL only risks the last commits on power loss, never
+    corruption, and saves an fsync per transaction.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA cache_size=-16000",     # KiB, per connection
+        "PRAGMA mmap_size=268435456",   # map up to 256 MiB of the file
+        "PRAGMA temp_store=MEMORY",
+    )
+
+    def __init__(self, db_path, timeout=10.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []  # (thread, connection)
+
+    def connect(self):
+        """Open a new, unshared connection"""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        # For LIKE search and FTS rebuilds over compressed bodies
+        conn.create_function("friday_inflate", 1, _inflate_content, deterministic=True)
+        return conn
+
+    def connection(self):
+        """Return the calling thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.connect()
+            self._local.conn = conn
+            with self._lock:
+                self._prune()
+                self._connections.append((threading.current_thread(), conn))
+        return conn
+
+    def _prune(self):
+        """Close connections whose owning thread has exited"""
+        alive = []
+        for thread, conn in self._connections:
+            if thread.is_alive():
+                alive.append((thread, conn))
+            else:
+                conn.close()
+        self._connections = alive
+
+    def close_all(self):
+        with self._lock:
+            for _, conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    logger.error(f"Connection close error: {e}")
+            self._connections = []
+        self._local = threading.local()
+
+
+# ==========================================================
+# NOTE BODY STORAGE
+# ==========================================================
+# Bodies of at least NOTE_COMPRESS_THRESHOLD characters are stored as zlib
+# BLOBs when that saves space; shorter ones stay TEXT. Storage type tells the
+# two apart, so the Database methods see plain text either way. The FTS
+# triggers must work in any SQLite client (the sqlite3 shell, backup tools),
+# so they cannot call friday_inflate: they index TEXT bodies only, and the
+# Database methods index compressed ones themselves.
+NOTE_COMPRESS_THRESHOLD = 4096
+
+
+def _deflate_content(content):
+    """Note body as stored: compressed BLOB if large and compressible, else the text"""
+    if content is None or len(content) < NOTE_COMPRESS_THRESHOLD:
+        return content
+    raw = content.encode("utf-8")
+    packed = zlib.compress(raw, 6)
+    return packed if len(packed) < len(raw) * 0.9 else content
+
+
+def _inflate_content(value):
+    return zlib.decompress(value).decode("utf-8") if isinstance(value, bytes) else value
+
+
+# ==========================================================
+# SCHEMA MIGRATIONS
+# ==========================================================
+NOTES_FTS_TRIGGERS = (
+    '''CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, title, content)
+        SELECT new.id, new.title, new.content WHERE typeof(new.content) != 'blob';
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content)
+        SELECT 'delete', old.id, old.title, old.content WHERE typeof(old.content) != 'blob';
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content)
+        SELECT 'delete', old.id, old.title, old.content WHERE typeof(old.content) != 'blob';
+        INSERT INTO notes_fts(rowid, title, content)
+        SELECT new.id, new.title, new.content WHERE typeof(new.content) != 'blob';
+    END''',
+)
+NOTES_FTS_TRIGGER_NAMES = ("notes_ai", "notes_ad", "notes_au")
+
+
+def _table_sql(conn, name):
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _migrate_base_tables(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS preferences (
+        key TEXT PRIMARY KEY, value TEXT
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL, content TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS command_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        command TEXT, timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+        success BOOLEAN DEFAULT 1
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS applications (
+        id INTEGER PRIMARY KEY,
+        name TEXT, path TEXT
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS reminders (
+        id INTEGER PRIMARY KEY,
+        text TEXT, time DATETIME, completed BOOLEAN DEFAULT 0
+    )''')
+
+
+def _migrate_notes_autoincrement(conn):
+    """Rebuild a legacy notes table (no AUTOINCREMENT, nullable title).
+
+    Without AUTOINCREMENT a deleted note's id can be reused, which would
+    let a stale list row or FTS entry point at a different note. Ids are
+    kept, so the FTS index stays valid and only its triggers (dropped with
+    the old table) are recreated.
+    """
+    if "AUTOINCREMENT" in (_table_sql(conn, "notes") or "").upper():
+        return
+    conn.execute('''CREATE TABLE notes_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL, content TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )''')
+    conn.execute('''INSERT INTO notes_new (id, title, content, created_at, updated_at)
+        SELECT id, COALESCE(title, ''), content,
+               COALESCE(created_at, CURRENT_TIMESTAMP), COALESCE(updated_at, created_at, CURRENT_TIMESTAMP)
+        FROM notes''')
+    conn.execute("DROP TABLE notes")
+    conn.execute("ALTER TABLE notes_new RENAME TO notes")
+    if _table_sql(conn, "notes_fts"):
+        for trigger in NOTES_FTS_TRIGGERS:
+            conn.execute(trigger)
+
+
+def _migrate_legacy_history(conn):
+    """Fold the old `history` table into command_history.
+
+    command_history has nowhere for the old `response` texts, so the table
+    itself is kept, renamed to history_legacy, rather than dropped.
+    """
+    if not _table_sql(conn, "history"):
+        return
+    conn.execute('''INSERT INTO command_history (command, timestamp, success)
+        SELECT input, COALESCE(timestamp, CURRENT_TIMESTAMP), 1 FROM history
+        WHERE input IS NOT NULL ORDER BY timestamp, id''')
+    conn.execute("ALTER TABLE history RENAME TO history_legacy")
+
+
+def _migrate_application_kind(conn):
+    if "kind" not in _columns(conn, "applications"):
+        conn.execute("ALTER TABLE applications ADD COLUMN kind TEXT")
+
+
+def _migrate_history_tracing(conn):
+    columns = _columns(conn, "command_history")
+    for column in ("trace_id", "latency_ms"):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE command_history ADD COLUMN {column} TEXT")
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_command_history_trace
+        ON command_history(trace_id) WHERE trace_id IS NOT NULL''')
+
+
+def _migrate_hot_indexes(conn):
+    # Matches list_notes' ORDER BY updated_at DESC, id DESC and its keyset
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_notes_updated ON notes(updated_at, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_command_history_timestamp ON command_history(timestamp)")
+
+
+def _migrate_reminder_index(conn):
+    # Partial: the scheduler only ever reads pending reminders in due order
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_pending ON reminders(time, id) WHERE completed = 0")
+
+
+def _migrate_usage_rollups(conn):
+    """Per-day and all-time command counts, kept current by a trigger.
+
+    Commands are keyed lower-cased and trimmed, dates are the UTC dates of
+    command_history.timestamp. Existing history is rolled up once here.
+    Launches are counted per app in app_launches, once per launch however
+    it was asked for, seeded from the successful "open <app>" commands.
+    """
+    conn.execute('''CREATE TABLE IF NOT EXISTS command_usage_daily (
+        day TEXT NOT NULL, command TEXT NOT NULL,
+        count INTEGER NOT NULL, successes INTEGER NOT NULL,
+        PRIMARY KEY (day, command)
+    ) WITHOUT ROWID''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS command_usage (
+        command TEXT PRIMARY KEY,
+        count INTEGER NOT NULL, successes INTEGER NOT NULL, last_used TEXT
+    ) WITHOUT ROWID''')
+    conn.execute("DELETE FROM command_usage_daily")
+    conn.execute("DELETE FROM command_usage")
+    conn.execute('''INSERT INTO command_usage_daily (day, command, count, successes)
+        SELECT date(timestamp), lower(trim(command)), COUNT(*), SUM(success != 0)
+        FROM command_history WHERE command IS NOT NULL GROUP BY 1, 2''')
+    conn.execute('''INSERT INTO command_usage (command, count, successes, last_used)
+        SELECT lower(trim(command)), COUNT(*), SUM(success != 0), MAX(timestamp)
+        FROM command_history WHERE command IS NOT NULL GROUP BY 1''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS command_history_rollup
+        AFTER INSERT ON command_history WHEN new.command IS NOT NULL BEGIN
+        INSERT INTO command_usage_daily (day, command, count, successes)
+        VALUES (date(new.timestamp), lower(trim(new.command)), 1, new.success != 0)
+        ON CONFLICT (day, command) DO UPDATE SET
+            count = count + 1, successes = successes + excluded.successes;
+        INSERT INTO command_usage (command, count, successes, last_used)
+        VALUES (lower(trim(new.command)), 1, new.success != 0, new.timestamp)
+        ON CONFLICT (command) DO UPDATE SET
+            count = count + 1, successes = successes + excluded.successes,
+            last_used = max(last_used, excluded.last_used);
+    END''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS app_launches (
+        app TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0,
+        last_launched TEXT
+    )''')
+    conn.execute('''INSERT OR IGNORE INTO app_launches (app, count)
+        SELECT substr(command, 6), successes FROM command_usage
+        WHERE command LIKE 'open %' AND successes > 0''')
+
+
+def _migrate_note_imports(conn):
+    # One row per interrupted bulk import: where its reader should restart
+    conn.execute('''CREATE TABLE IF NOT EXISTS note_imports (
+        source TEXT PRIMARY KEY,
+        position INTEGER NOT NULL, count INTEGER NOT NULL,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )''')
+
+
+def _migrate_compressed_notes(conn, batch=1000):
+    """Compress existing large bodies.
+
+    The FTS triggers are dropped while rows are rewritten: the text is
+    unchanged, so the index entries stay valid as they are.
+    """
+    fts = _table_sql(conn, "notes_fts") is not None
+    for name in NOTES_FTS_TRIGGER_NAMES:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    last = 0
+    while True:
+        rows = conn.execute('''
+            SELECT id, content FROM notes
+            WHERE id > ? AND typeof(content) = 'text' AND length(content) >= ?
+            ORDER BY id LIMIT ?
+        ''', (last, NOTE_COMPRESS_THRESHOLD, batch)).fetchall()
+        if not rows:
+            break
+        last = rows[-1][0]
+        conn.executemany("UPDATE notes SET content = ? WHERE id = ?",
+                         [(_deflate_content(content), note_id) for note_id, content in rows])
+    if fts:
+        for trigger in NOTES_FTS_TRIGGERS:
+            conn.execute(trigger)
+
+
+# Append only: a database at user_version N has had the first N applied.
+# Steps are idempotent, so databases created before versioning (user_version
+# 0 with some of the schema in place) upgrade through the same path.
+MIGRATIONS = (
+    ("base tables", _migrate_base_tables),
+    ("notes AUTOINCREMENT", _migrate_notes_autoincrement),
+    ("legacy history", _migrate_legacy_history),
+    ("applications.kind", _migrate_application_kind),
+    ("command_history tracing", _migrate_history_tracing),
+    ("hot query indexes", _migrate_hot_indexes),
+    ("pending reminders index", _migrate_reminder_index),
+    ("command usage rollups", _migrate_usage_rollups),
+    ("note import checkpoints", _migrate_note_imports),
+    ("compressed note bodies", _migrate_compressed_notes),
+)
+
+
+# ==========================================================
+# DATABASE CLASS
+# ==========================================================
+class Database:
+    """SQLite database handler (safe to share between threads)"""
+
+    SCHEMA_VERSION = len(MIGRATIONS)
+    
+    def __init__(self, db_path="friday.db", write_policy="drop_oldest"):
+        self.db_path = db_path
+        self.pool = ConnectionManager(db_path)
+        self.has_fts = False
+        self.migrations_applied = []  # (version, name, seconds) run by this open
+        self._migrate()
+        self._create_fts_index()
+        self.writer = WriteBehindQueue(self.pool.connect, policy=write_policy)
+        self.preferences = Preferences(self)
+
+    @property
+    def conn(self):
+        """The calling thread's connection"""
+        return self.pool.connection()
+
+    def _migrate(self):
+        """Bring the schema up to SCHEMA_VERSION, one transaction per step.
+
+        BEGIN IMMEDIATE takes the write lock before user_version is read, so
+        two processes opening the same old database cannot both migrate it.
+        """
+        conn = self.conn
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version >= self.SCHEMA_VERSION:
+                    conn.rollback()
+                    return
+                name, migrate = MIGRATIONS[version]
+                start = time.perf_counter()
+                migrate(conn)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            elapsed = time.perf_counter() - start
+            self.migrations_applied.append((version + 1, name, elapsed))
+            logger.info(f"Database migrated to v{version + 1} ({name}) in {elapsed * 1000:.1f} ms")
+
+    def _create_fts_index(self):
+        """Create the FTS5 notes index and the triggers that keep it in sync.
+
+        Not a migration: FTS5 availability depends on the SQLite build, which
+        can change under an existing database, so it is checked on every open.
+        """
+        conn = self.conn
+        triggers = conn.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name IN {NOTES_FTS_TRIGGER_NAMES}"
+        ).fetchone()[0]
+        try:
+            conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+                title, content,
+                content='notes', content_rowid='id', prefix='2 3'
+            )''')
+        except sqlite3.OperationalError as e:
+            # Without FTS5 the sync triggers would make every notes write fail,
+            # so drop them; the index is rebuilt when FTS5 is available again.
+            logger.warning(f"FTS5 unavailable, falling back to LIKE search: {e}")
+            with conn:
+                for name in NOTES_FTS_TRIGGER_NAMES:
+                    conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            return
+
+        with conn:
+            for trigger in NOTES_FTS_TRIGGERS:
+                conn.execute(trigger)
+            if triggers < 3:
+                # Index is new (or was left stale while FTS5 was missing).
+                # Not 'rebuild': that would index compressed bodies as stored.
+                conn.execute("INSERT INTO notes_fts(notes_fts) VALUES ('delete-all')")
+                conn.execute('''INSERT INTO notes_fts(rowid, title, content)
+                    SELECT id, title, friday_inflate(content) FROM notes''')
+        self.has_fts = True
+
+    @staticmethod
+    def _fts_query(query, prefix=True):
+        """Turn free text into an FTS5 MATCH expression (all terms, optionally prefix-matched)"""
+        terms = re.findall(r"\w+", query)
+        suffix = "*" if prefix else ""
+        return " ".join(f'"{term}"{suffix}' for term in terms)
+
+    def get_preference(self, key, default=None):
+        return self.preferences.get(key, default)
+
+    def set_preference(self, key, value):
+        """Cached at once, persisted shortly after (see Preferences)"""
+        self.preferences.set(key, value)
+
+    def search_notes(self, query="", prefix=True):
+        """Search notes; ranked FTS5 match when available, LIKE scan otherwise.
+
+        Returns the same metadata rows as list_notes; bodies come from get_note.
+        """
+        match = self._fts_query(query, prefix) if self.has_fts else ""
+        if match:
+            try:
+                return self.conn.execute('''
+                    SELECT notes.id, notes.title, notes.created_at, notes.updated_at
+                    FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid
+                    WHERE notes_fts MATCH ?
+                    ORDER BY bm25(notes_fts, 5.0, 1.0), notes.updated_at DESC
+                ''', (match,)).fetchall()
+            except sqlite3.OperationalError as e:
+                logger.error(f"FTS search error, falling back to LIKE: {e}")
+        return self._search_notes_like(query)
+
+    def _search_notes_like(self, query=""):
+        return self.conn.execute('''
+            SELECT id, title, created_at, updated_at
+            FROM notes
+            WHERE title LIKE ? OR friday_inflate(content) LIKE ?
+            ORDER BY updated_at DESC
+        ''', (f'%{query}%', f'%{query}%')).fetchall()
+
+    def list_notes(self, limit=100, after=None):
+        """One page of note metadata, newest first.
+
+        `after` is the (updated_at, id) of the last row of the previous page;
+        keyset paging keeps every page equally cheap regardless of depth.
+        """
+        if after is None:
+            return self.conn.execute('''
+                SELECT id, title, created_at, updated_at FROM notes
+                ORDER BY updated_at DESC, id DESC LIMIT ?
+            ''', (limit,)).fetchall()
+        return self.conn.execute('''
+            SELECT id, title, created_at, updated_at FROM notes
+            WHERE (updated_at, id) < (?, ?)
+            ORDER BY updated_at DESC, id DESC LIMIT ?
+        ''', (*after, limit)).fetchall()
+
+    def iter_notes(self, after_id=0, batch=1000):
+        """Yield every note with id > after_id in id order.
+
+        One cursor streams the table from a single read snapshot, `batch`
+        rows at a time, so memory stays flat however large the table is.
+        """
+        cursor = self.conn.execute('''
+            SELECT id, title, content, created_at, updated_at FROM notes
+            WHERE id > ? ORDER BY id
+        ''', (after_id,))
+        try:
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    return
+                for note_id, title, content, created_at, updated_at in rows:
+                    yield note_id, title, _inflate_content(content), created_at, updated_at
+        finally:
+            cursor.close()
+
+    def import_notes(self, records, source=None, chunk=5000, progress=None):
+        """Bulk-insert (position, title, content, created_at, updated_at) records.
+
+        Rows are inserted with executemany, `chunk` per transaction. With a
+        `source` name, each transaction also stores the position of its last
+        record in note_imports, so an interrupted import can restart its
+        reader from `import_checkpoint(source)`; the checkpoint is dropped
+        once the import completes. `progress(count, position)` is called
+        after every commit. Returns the total imported under this source.
+        """
+        conn = self.conn
+        insert = '''INSERT INTO notes (title, content, created_at, updated_at)
+            VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, ?, CURRENT_TIMESTAMP))'''
+        checkpoint = self.import_checkpoint(source) if source else None
+        count = checkpoint[1] if checkpoint else 0
+        rows = []
+        position = None
+
+        compressed = []  # (row index, title, content) of bodies stored as BLOBs
+
+        def commit():
+            with conn:
+                conn.executemany(insert, rows)
+                if compressed:
+                    # One transaction holds the write lock, so AUTOINCREMENT ids are consecutive
+                    first = conn.execute("SELECT last_insert_rowid()").fetchone()[0] - len(rows) + 1
+                    self._index_compressed(conn, [(first + i, title, content) for i, title, content in compressed])
+                if source:
+                    conn.execute(
+                        "REPLACE INTO note_imports (source, position, count) VALUES (?, ?, ?)",
+                        (source, position, count)
+                    )
+            rows.clear()
+            compressed.clear()
+
+        for position, title, content, created_at, updated_at in records:
+            stored = _deflate_content(content)
+            if isinstance(stored, bytes):
+                compressed.append((len(rows), title, content))
+            rows.append((title, stored, created_at, updated_at, created_at))
+            if len(rows) >= chunk:
+                count += len(rows)
+                commit()
+                if progress:
+                    progress(count, position)
+        if rows:
+            count += len(rows)
+            commit()
+        if source:
+            with conn:
+                conn.execute("DELETE FROM note_imports WHERE source = ?", (source,))
+        if progress:
+            progress(count, position)
+        return count
+
+    def import_checkpoint(self, source):
+        """(position, count) of an unfinished import of `source`, or None"""
+        return self.conn.execute(
+            "SELECT position, count FROM note_imports WHERE source = ?", (source,)
+        ).fetchone()
+
+    def get_note(self, note_id):
+        """The full note, body decompressed; listings only carry metadata"""
+        row = self.conn.execute(
+            "SELECT id, title, content, created_at, updated_at FROM notes WHERE id = ?", (note_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], _inflate_content(row[2]), row[3], row[4]
+
+    def _index_compressed(self, conn, notes):
+        """Add (id, title, content) of notes stored compressed to the FTS index.
+
+        The triggers skip BLOB bodies (see NOTE BODY STORAGE).
+        """
+        if self.has_fts and notes:
+            conn.executemany("INSERT INTO notes_fts(rowid, title, content) VALUES (?, ?, ?)", notes)
+
+    def _unindex_compressed(self, conn, note_id):
+        """Remove a note stored compressed from the FTS index, before it changes"""
+        if not self.has_fts:
+            return
+        row = conn.execute("SELECT title, content FROM notes WHERE id = ?", (note_id,)).fetchone()
+        if row and isinstance(row[1], bytes):
+            conn.execute("INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', ?, ?, ?)",
+                         (note_id, row[0], _inflate_content(row[1])))
+
+    def add_note(self, title, content):
+        stored = _deflate_content(content)
+        with self.conn as conn:
+            cursor = conn.execute("INSERT INTO notes (title, content) VALUES (?, ?)", (title, stored))
+            if isinstance(stored, bytes):
+                self._index_compressed(conn, [(cursor.lastrowid, title, content)])
+        return cursor.lastrowid
+
+    def update_note(self, note_id, title, content):
+        stored = _deflate_content(content)
+        with self.conn as conn:
+            conn.execute("BEGIN IMMEDIATE")  # the old body must not change between read and update
+            self._unindex_compressed(conn, note_id)
+            cursor = conn.execute('''
+                UPDATE notes
+                SET title=?, content=?, updated_at=CURRENT_TIMESTAMP
+                WHERE id=?
+            ''', (title, stored, note_id))
+            if cursor.rowcount and isinstance(stored, bytes):
+                self._index_compressed(conn, [(note_id, title, content)])
+
+    def delete_note(self, note_id):
+        with self.conn as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._unindex_compressed(conn, note_id)
+            conn.execute("DELETE FROM notes WHERE id=?", (note_id,))
+
+    def get_applications(self):
+        return self.conn.execute("SELECT name, path, kind FROM applications ORDER BY id").fetchall()
+
+    def replace_applications(self, apps):
+        """Replace the cached application index with (name, path, kind) rows"""
+        with self.conn as conn:
+            conn.execute("DELETE FROM applications")
+            conn.executemany("INSERT INTO applications (name, path, kind) VALUES (?, ?, ?)", apps)
+
+    def add_command_history(self, command, success=True, trace_id=None):
+        """Queue a history row; committed in the background by the writer"""
+        self.writer.submit(
+            "INSERT INTO command_history (command, success, trace_id) VALUES (?, ?, ?)",
+            (command, success, trace_id)
+        )
+
+    def save_latencies(self, trace_id, stages):
+        """Attach a finished trace's stage latencies (ms) to its history row.
+
+        Goes through the same writer as the INSERT, so it always lands after it.
+        """
+        self.writer.submit(
+            "UPDATE command_history SET latency_ms = ? WHERE trace_id = ?",
+            (json.dumps(stages), trace_id)
+        )
+
+    def command_usage(self, days=None, limit=20, prefix=None):
+        """Most used commands as (command, count, success_rate), busiest first.
+
+        Reads the rollup tables: all-time totals, or the per-day rollup for
+        the last `days` days. `prefix` restricts to commands starting with it.
+        """
+        pattern = f"{prefix.lower()}%" if prefix else "%"
+        if days is None:
+            sql = '''SELECT command, count, successes FROM command_usage
+                     WHERE command LIKE ? ORDER BY count DESC, command LIMIT ?'''
+            params = (pattern, limit)
+        else:
+            sql = '''SELECT command, SUM(count) AS total, SUM(successes) FROM command_usage_daily
+                     WHERE day >= date('now', ?) AND command LIKE ?
+                     GROUP BY command ORDER BY total DESC, command LIMIT ?'''
+            params = (f"-{int(days)} days", pattern, limit)
+        return [(command, count, successes / count) for command, count, successes in self.conn.execute(sql, params)]
+
+    def command_usage_by_day(self, command, days=30):
+        """(day, count, success_rate) for one command over the last `days` days"""
+        rows = self.conn.execute('''
+            SELECT day, count, successes FROM command_usage_daily
+            WHERE day >= date('now', ?) AND command = ? ORDER BY day
+        ''', (f"-{int(days)} days", command.strip().lower())).fetchall()
+        return [(day, count, successes / count) for day, count, successes in rows]
+
+    def record_app_launch(self, app):
+        """Queue one launch of `app` for app_launch_counts"""
+        self.writer.submit(
+            '''INSERT INTO app_launches (app, count, last_launched) VALUES (?, 1, CURRENT_TIMESTAMP)
+               ON CONFLICT(app) DO UPDATE SET count = count + 1, last_launched = excluded.last_launched''',
+            (app.lower(),)
+        )
+
+    def app_launch_counts(self, apps):
+        """{app: times launched}"""
+        names = {app.lower(): app for app in apps}
+        placeholders = ", ".join("?" * len(names))
+        rows = self.conn.execute(
+            f"SELECT app, count FROM app_launches WHERE app IN ({placeholders})", list(names)
+        ).fetchall()
+        return {names[app]: count for app, count in rows}
+
+    def get_latencies(self, limit=1000):
+        """Stage latencies of the most recent traced commands, newest first"""
+        rows = self.conn.execute(
+            "SELECT latency_ms FROM command_history WHERE latency_ms IS NOT NULL "
+            "ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    REMINDER_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"  # local time, as in the legacy table
+
+    @classmethod
+    def _reminder_time(cls, due):
+        return time.strftime(cls.REMINDER_TIME_FORMAT, time.localtime(due))
+
+    def add_reminder(self, text, due):
+        """Store a reminder due at epoch seconds `due`; returns its id"""
+        with self.conn as conn:
+            cursor = conn.execute("INSERT INTO reminders (text, time) VALUES (?, ?)", (text, self._reminder_time(due)))
+        return cursor.lastrowid
+
+    def add_reminders(self, reminders):
+        """Bulk-store (text, due) pairs in one transaction"""
+        with self.conn as conn:
+            conn.executemany(
+                "INSERT INTO reminders (text, time) VALUES (?, ?)",
+                ((text, self._reminder_time(due)) for text, due in reminders)
+            )
+
+    def pending_reminders(self, until, after=None, limit=1000):
+        """Pending reminders due by epoch `until`, in due order.
+
+        `after` is the (time, id) of the last row of the previous batch.
+        Returns (id, text, time, due) rows, `due` in epoch seconds.
+        """
+        if after is None:
+            rows = self.conn.execute('''
+                SELECT id, text, time FROM reminders
+                WHERE completed = 0 AND time <= ?
+                ORDER BY time, id LIMIT ?
+            ''', (self._reminder_time(until), limit)).fetchall()
+        else:
+            rows = self.conn.execute('''
+                SELECT id, text, time FROM reminders
+                WHERE completed = 0 AND time <= ? AND (time, id) > (?, ?)
+                ORDER BY time, id LIMIT ?
+            ''', (self._reminder_time(until), *after, limit)).fetchall()
+        pending = []
+        for reminder_id, text, when in rows:
+            try:
+                due = datetime.fromisoformat(when).timestamp()
+            except (TypeError, ValueError):
+                logger.warning(f"Reminder {reminder_id} has an unreadable time {when!r}, announcing now")
+                due = 0.0
+            pending.append((reminder_id, text, when, due))
+        return pending
+
+    def complete_reminders(self, reminder_ids):
+        with self.conn as conn:
+            conn.executemany("UPDATE reminders SET completed = 1 WHERE id = ?", ((i,) for i in reminder_ids))
+
+    def flush(self):
+        """Wait for queued background writes to be committed"""
+        self.preferences.flush()
+        self.writer.flush()
+
+    def close(self):
+        try:
+            self.preferences.close()
+            self.writer.close()
+            self.pool.close_all()
+        except Exception as e:
+            logger.error(f"Database close error: {e}")
+
+
+# ==========================================================
+# PREFERENCES
+# ==========================================================
+class Preferences:
+    """In-memory view of the preferences table.
+
+    Every key is read once at start-up and `get` never waits on a query.
+    `set` updates the cache and notifies subscribers at once; the write is
+    deferred `delay` seconds and committed together with any other keys
+    changed meanwhile, so dragging a slider costs one row per key instead of
+    a commit per step. Preferences are written on their own connection, not
+    through the write-behind queue, whose back-pressure policy may drop
+    statements. Values are strings, as stored.
+
+    Other writers (another process such as the daemon) are noticed through
+    PRAGMA data_version, checked at most every `refresh_interval` seconds
+    from `get`: changed keys are reloaded and their subscribers notified.
+    """
+
+    def __init__(self, db, delay=0.5, refresh_interval=2.0):
+        self.db = db
+        self.delay = delay
+        self.refresh_interval = refresh_interval
+        self.written = 0  # rows committed
+        self._conn = db.pool.connect()
+        self._conn_lock = threading.Lock()  # serializes use of _conn
+        self._values = dict(self._conn.execute("SELECT key, value FROM preferences"))
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._next_refresh = time.monotonic() + refresh_interval
+        self._dirty = {}
+        self._timer = None
+        self._subscribers = []  # (keys or None for all, callback)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        if time.monotonic() >= self._next_refresh:
+            self.refresh(wait=False)
+        return self._values.get(key, default)
+
+    def set(self, key, value):
+        value = str(value)
+        with self._lock:
+            if self._values.get(key) == value:
+                return
+            self._values[key] = value
+            self._dirty[key] = value
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            subscribers = list(self._subscribers)
+        self._notify(subscribers, [(key, value)])
+
+    def subscribe(self, callback, *keys):
+        """Call callback(key, value) whenever one of `keys` (any key if none) changes"""
+        entry = (frozenset(keys) or None, callback)
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+    @staticmethod
+    def _notify(subscribers, changes):
+        for key, value in changes:
+            for keys, callback in subscribers:
+                if keys is not None and key not in keys:
+                    continue
+                try:
+                    callback(key, value)
+                except Exception as e:
+                    logger.error(f"Preference subscriber error for {key}: {e}")
+
+    def refresh(self, wait=True):
+        """Reload keys another connection has committed; returns them as {key: value}.
+
+        Keys with a change of our own still pending keep our value. With
+        wait=False, gives up at once if a flush is using the connection.
+        """
+        self._next_refresh = time.monotonic() + self.refresh_interval
+        if not self._conn_lock.acquire(blocking=wait):
+            return {}
+        changes = []
+        try:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return {}
+            self._data_version = version
+            stored = self._conn.execute("SELECT key, value FROM preferences").fetchall()
+            with self._lock:
+                for key, value in stored:
+                    if key not in self._dirty and self._values.get(key) != value:
+                        self._values[key] = value
+                        changes.append((key, value))
+                subscribers = list(self._subscribers)
+        except sqlite3.Error as e:
+            logger.error(f"Preferences refresh error: {e}")
+            return {}
+        finally:
+            self._conn_lock.release()
+        self._notify(subscribers, changes)
+        return dict(changes)
+
+    def flush(self):
+        """Commit the pending changes now"""
+        with self._conn_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+            if not dirty:
+                return
+            try:
+                with self._conn as conn:
+                    conn.executemany("REPLACE INTO preferences (key, value) VALUES (?, ?)", dirty.items())
+                self.written += len(dirty)
+            except sqlite3.Error as e:
+                logger.error(f"Preferences write error, will retry: {e}")
+                with self._lock:
+                    for key, value in dirty.items():
+                        self._dirty.setdefault(key, value)
+                    if self._timer is None:
+                        self._timer = threading.Timer(self.delay, self.flush)
+                        self._timer.daemon = True
+                        self._timer.start()
+
+    def close(self):
+        self.flush()
+        with self._conn_lock:
+            self._conn.close()
+
+
+# ==========================================================
+# NOTES IMPORT / EXPORT
+# ==========================================================
+# Two formats: JSON Lines (one {"id", "title", "content", "created_at",
+# "updated_at"} object per line, chosen by a .jsonl suffix) and a directory
+# of Markdown files, one per note, named <id>-<slug>.md:
+#
+#     # Title
+#     <!-- friday {"id": 7, "created_at": "...", "updated_at": "..."} -->
+#
+#     content
+#
+# Any directory of .md files imports; without the heading the file name is
+# the title. Both directions stream and can resume: imports through
+# note_imports checkpoints, exports (when asked to) by continuing after the
+# last note already written. An export in progress is written to <path>.part
+# or marked by EXPORT_MARKER in the directory, so a finished export is never
+# mistaken for an interrupted one.
+NOTE_FIELDS = ("id", "title", "content", "created_at", "updated_at")
+MARKDOWN_META = re.compile(r"<!-- friday (\{.*\}) -->")
+MARKDOWN_NAME = re.compile(r"^(\d+)-")
+EXPORT_MARKER = ".friday-export-incomplete"
+
+
+def _is_jsonl(path):
+    return path.lower().endswith(".jsonl")
+
+
+def read_notes_jsonl(path, start=0):
+    """Yield import records from a JSON Lines file, from byte offset `start`.
+
+    The position of each record is the offset just past its line.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        for line in f:
+            offset, position = position, position + len(line)
+            if not line.strip():
+                continue
+            try:
+                note = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}: invalid note at byte {offset}: {e}") from None
+            yield (position, note.get("title") or "", note.get("content"),
+                   note.get("created_at"), note.get("updated_at"))
+
+
+def _parse_markdown_note(text, name):
+    title, meta = None, {}
+    lines = text.split("\n")
+    if lines and lines[0].startswith("# "):
+        title = lines.pop(0)[2:].strip()
+        match = MARKDOWN_META.fullmatch(lines[0].strip()) if lines else None
+        if match:
+            meta = json.loads(match.group(1))
+            lines.pop(0)
+        if lines and not lines[0].strip():
+            lines.pop(0)
+    if title is None:
+        title = MARKDOWN_NAME.sub("", name).replace("-", " ").strip() or name
+    return title, "\n".join(lines), meta.get("created_at"), meta.get("updated_at")
+
+
+def read_notes_markdown(directory, start=0):
+    """Yield import records from the .md files of a directory, in name order.
+
+    The position of each record is the number of files consumed, so resuming
+    assumes the directory has not changed in between.
+    """
+    names = sorted(name for name in os.listdir(directory) if name.lower().endswith(".md"))
+    for position, name in enumerate(names[start:], start + 1):
+        with open(os.path.join(directory, name), encoding="utf-8", newline="") as f:
+            yield (position, *_parse_markdown_note(f.read(), name[:-3]))
+
+
+def import_notes_from(db, path, progress=None, chunk=5000):
+    """Import a JSON Lines file or Markdown directory, resuming if interrupted.
+
+    `progress(count, fraction)` reports notes imported and the share of the
+    source consumed. Returns the number of notes imported.
+    """
+    source = os.path.realpath(path)
+    checkpoint = db.import_checkpoint(source)
+    start = checkpoint[0] if checkpoint else 0
+    if start:
+        logger.info(f"Resuming import of {path} after {checkpoint[1]} notes")
+    if _is_jsonl(path):
+        total = os.path.getsize(path)
+        records = read_notes_jsonl(path, start)
+    else:
+        total = sum(1 for name in os.listdir(path) if name.lower().endswith(".md"))
+        records = read_notes_markdown(path, start)
+    report = None
+    if progress:
+        report = lambda count, position: progress(count, (position or start) / total if total else 1.0)
+    return db.import_notes(records, source, chunk, report)
+
+
+def _last_exported_id(path):
+    """Id of the last complete line of a JSON Lines export, dropping a torn tail"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        tail = b""
+        while end - len(tail) > 0 and tail.count(b"\n") < 2:
+            step = min(65536, end - len(tail))
+            f.seek(end - len(tail) - step)
+            tail = f.read(step) + tail
+        keep = tail.rfind(b"\n") + 1
+        f.truncate(end - len(tail) + keep)
+        lines = tail[:keep].split(b"\n")
+        last = lines[-2] if len(lines) > 1 else b""
+    return json.loads(last)["id"] if last.strip() else 0
+
+
+def _markdown_note_name(note_id, title):
+    slug = re.sub(r"[^\w]+", "-", title.lower()).strip("-")[:60] or "note"
+    return f"{note_id:08d}-{slug}.md"
+
+
+def _write_markdown_note(directory, note):
+    note_id, title, content, created_at, updated_at = note
+    meta = json.dumps({"id": note_id, "created_at": created_at, "updated_at": updated_at})
+    path = os.path.join(directory, _markdown_note_name(note_id, title))
+    with open(path + ".part", "w", encoding="utf-8", newline="") as f:
+        f.write(f"# {' '.join(title.split())}\n<!-- friday {meta} -->\n\n{content or ''}")
+    os.replace(path + ".part", path)
+
+
+def export_notes_to(db, path, progress=None, batch=1000, resume=False):
+    """Stream every note to a JSON Lines file or a Markdown directory.
+
+    An earlier export at `path` is replaced. With `resume`, an interrupted
+    export is continued after its last complete note instead; notes edited
+    or deleted before that point since it started are not revisited.
+    `progress(count, fraction)` is called every `batch` notes. Returns the
+    number of notes written by this call.
+    """
+    if _is_jsonl(path):
+        partial = path + ".part"
+        if not resume and os.path.exists(partial):
+            os.remove(partial)
+        after = _last_exported_id(partial)
+        out = open(partial, "a", encoding="utf-8")
+        write = lambda note: out.write(json.dumps(dict(zip(NOTE_FIELDS, note)), ensure_ascii=False) + "\n")
+        finish = lambda: os.replace(partial, path)
+    else:
+        os.makedirs(path, exist_ok=True)
+        marker = os.path.join(path, EXPORT_MARKER)
+        exported = [m for m in map(MARKDOWN_NAME.match, os.listdir(path)) if m]
+        if resume and os.path.exists(marker):
+            after = max((int(m.group(1)) for m in exported if m.string.endswith(".md")), default=0)
+        else:
+            after = 0
+            open(marker, "w").close()
+            for m in exported:
+                os.remove(os.path.join(path, m.string))
+        out = None
+        write = lambda note: _write_markdown_note(path, note)
+        finish = lambda: os.remove(marker)
+    if after:
+        logger.info(f"Resuming export to {path} after note {after}")
+    total = db.conn.execute("SELECT COUNT(*) FROM notes WHERE id > ?", (after,)).fetchone()[0]
+    count = 0
+    try:
+        for count, note in enumerate(db.iter_notes(after, batch), 1):
+            write(note)
+            if progress and count % batch == 0:
+                progress(count, count / total)
+    finally:
+        if out:
+            out.close()
+    finish()
+    if progress:
+        progress(count, 1.0)
+    return count
+
+
+# ==========================================================
+# REMINDER SCHEDULER
+# ==========================================================
+class ReminderScheduler:
+    """Announces due reminders from a single thread.
+
+    Pending reminders due within the next `window` seconds are kept in a
+    min-heap on due time, loaded from the reminders table `batch` rows at a
+    time through its pending-reminders index. The thread sleeps until the
+    earlier of the next due reminder and the end of the loaded window, so
+    its idle cost does not depend on how many reminders are pending.
+
+    `clock` returns epoch seconds; after moving a test clock forward, call
+    `wake()` so the thread re-reads it.
+    """
+
+    def __init__(self, db, announce=None, clock=time.time, window=3600.0, batch=1000):
+        self.db = db
+        self.announce = announce
+        self.clock = clock
+        self.window = window
+        self.batch = batch
+        self.announced = 0
+        self.loads = 0
+        self._heap = []  # (due, id, text)
+        self._queued = set()  # ids in the heap
+        self._cursor = None  # (time, id) of the last row loaded
+        self._horizon = 0.0  # every pending reminder due by then is loaded
+        self._reload = True
+        self._running = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="friday-reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify()
+
+    def add(self, text, due):
+        """Store a reminder due at epoch seconds `due`; returns its id"""
+        reminder_id = self.db.add_reminder(text, due)
+        with self._cond:
+            # Beyond the horizon it is picked up when the window gets there
+            if due <= self._horizon and reminder_id not in self._queued:
+                self._push(due, reminder_id, text)
+                self._cond.notify()
+        return reminder_id
+
+    def add_many(self, reminders):
+        """Bulk-store (text, due) pairs and reload the window once"""
+        self.db.add_reminders(reminders)
+        with self._cond:
+            self._reload = True
+            self._cond.notify()
+
+    def pending(self):
+        """Number of reminders currently held in memory"""
+        with self._cond:
+            return len(self._heap)
+
+    def _push(self, due, reminder_id, text):
+        heapq.heappush(self._heap, (due, reminder_id, text))
+        self._queued.add(reminder_id)
+
+    def _load(self, now):
+        until = now + self.window
+        rows = self.db.pending_reminders(until, self._cursor, self.batch)
+        self.loads += 1
+        for reminder_id, text, when, due in rows:
+            if reminder_id not in self._queued:
+                self._push(due, reminder_id, text)
+        if rows:
+            self._cursor = (rows[-1][2], rows[-1][0])
+        # A full batch may have stopped mid-window: load again from its end
+        self._horizon = until if len(rows) < self.batch else rows[-1][3]
+
+    def _run(self):
+        while True:
+            due = []
+            with self._cond:
+                if not self._running:
+                    break
+                if self._reload:
+                    self._heap, self._queued, self._cursor, self._horizon = [], set(), None, 0.0
+                    self._reload = False
+                now = self.clock()
+                try:
+                    if now >= self._horizon:
+                        self._load(now)
+                except sqlite3.Error as e:
+                    logger.error(f"Reminder load error: {e}")
+                    self._cond.wait(5)
+                    continue
+                while self._heap and self._heap[0][0] <= now and len(due) < self.batch:
+                    item = heapq.heappop(self._heap)
+                    self._queued.discard(item[1])
+                    due.append(item)
+                if not due:
+                    wake_at = min(self._heap[0][0], self._horizon) if self._heap else self._horizon
+                    self._cond.wait(max(0.0, wake_at - now))
+                    continue
+            self._fire(due)
+
+    def _fire(self, due):
+        try:
+            self.db.complete_reminders([reminder_id for _, reminder_id, _ in due])
+        except sqlite3.Error as e:
+            logger.error(f"Reminder completion error: {e}")
+        for _, reminder_id, text in due:
+            self.announced += 1
+            if self.announce:
+                try:
+                    self.announce(text)
+                except Exception as e:
+                    logger.error(f"Reminder announce error: {e}")
+
+
+# ==========================================================
+# CONTINUOUS AUDIO CAPTURE
+# ==========================================================
+class WavFileSource:
+    """Audio source backed by a WAV file, interchangeable with sr.Microphone.
+
+    Exposes the same SAMPLE_RATE / SAMPLE_WIDTH / CHUNK / stream.read(frames)
+    surface. With realtime=True reads are paced like a live microphone.
+    """
+
+    def __init__(self, path, chunk_size=1024, realtime=False):
+        self.path = path
+        self.CHUNK = chunk_size
+        self.realtime = realtime
+        self.stream = None
+        self._wav = None
+
+    def __enter__(self):
+        self._wav = wave.open(self.path, "rb")
+        if self._wav.getnchannels() != 1:
+            raise ValueError(f"{self.path}: only mono WAV files are supported")
+        self.SAMPLE_RATE = self._wav.getframerate()
+        self.SAMPLE_WIDTH = self._wav.getsampwidth()
+        self.stream = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._wav.close()
+        self.stream = None
+
+    def read(self, frames):
+        data = self._wav.readframes(frames)
+        if self.realtime and data:
+            time.sleep(len(data) / (self.SAMPLE_WIDTH * self.SAMPLE_RATE))
+        return data
+
+
+class ContinuousListener:
+    """Keeps the input stream open and segments utterances out of it.
+
+    A capture thread reads the source continuously; nothing is lost between
+    utterances. Each chunk's RMS energy is compared with a noise floor that
+    is learned in the background from quiet chunks, so there is no blocking
+    calibration step. A ring buffer holds the last `pre_roll` seconds so the
+    onset of speech that triggered detection is kept. Each utterance is
+    handed to `on_utterance` as sr.AudioData; keep that callback cheap.
+    `on_noise_floor` receives the learned floor every `persist_interval`
+    seconds and when capture ends. `on_exit` is called on the capture thread
+    when it ends for any reason.
+    """
+
+    def __init__(self, source, on_utterance, noise_floor=None, on_noise_floor=None,
+                 ratio=3.0, pause=0.8, pre_roll=0.3, min_phrase=0.25, max_phrase=10.0, on_exit=None,
+                 persist_interval=30.0):
+        self.source = source
+        self.on_utterance = on_utterance
+        self.on_noise_floor = on_noise_floor
+        self.persist_interval = persist_interval
+        self.on_exit = on_exit
+        self.noise_floor = noise_floor
+        self.ratio = ratio
+        self.pause = pause
+        self.pre_roll = pre_roll
+        self.min_phrase = min_phrase
+        self.max_phrase = max_phrase
+        self.running = False
+        self.utterances = 0
+        self._thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="friday-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2):
+        self.running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def wait(self, timeout=None):
+        """Block until the source is exhausted (file sources) or stop()"""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _capture_loop(self):
+        try:
+            with self.source as source:
+                self._segment(source)
+        except Exception as e:
+            logger.error(f"Capture error: {e}")
+        finally:
+            self.running = False
+            if self.on_noise_floor and self.noise_floor is not None:
+                self.on_noise_floor(self.noise_floor)
+            if self.on_exit:
+                self.on_exit()
+
+    def _segment(self, source):
+        width, rate, chunk = source.SAMPLE_WIDTH, source.SAMPLE_RATE, source.CHUNK
+        chunk_seconds = chunk / rate
+        ring = deque(maxlen=max(1, int(self.pre_roll / chunk_seconds)))
+        frames = []
+        quietest = None
+        quiet = 0.0
+        alpha = min(1.0, chunk_seconds / 2.0)  # ~2 s time constant
+        last_persist = time.monotonic()
+
+        while self.running:
+            data = source.stream.read(chunk)
+            if not data:
+                break
+            energy = audioop.rms(data, width)
+            if self.noise_floor is None:
+                self.noise_floor = float(energy)
+            threshold = max(self.noise_floor * self.ratio, 50.0)
+            if self.on_noise_floor and time.monotonic() - last_persist >= self.persist_interval:
+                last_persist = time.monotonic()
+                self.on_noise_floor(self.noise_floor)
+
+            if not frames:
+                if energy > threshold:
+                    frames = list(ring)
+                    frames.append(data)
+                    ring.clear()
+                    quietest = energy
+                    quiet = 0.0
+                else:
+                    ring.append(data)
+                    self.noise_floor += alpha * (energy - self.noise_floor)
+                continue
+
+            frames.append(data)
+            quietest = energy if quietest is None else min(quietest, energy)
+            quiet = quiet + chunk_seconds if energy <= threshold else 0.0
+            if quiet >= self.pause:
+                self._emit(frames, rate, width, chunk_seconds)
+                frames, quietest = [], None
+            elif len(frames) * chunk_seconds >= self.max_phrase:
+                # Never went quiet: the room got louder, so lift the floor
+                self.noise_floor = max(self.noise_floor, float(quietest))
+                self._emit(frames, rate, width, chunk_seconds)
+                frames, quietest = [], None
+
+        if frames:
+            self._emit(frames, rate, width, chunk_seconds)
+
+    def _emit(self, frames, rate, width, chunk_seconds):
+        if len(frames) * chunk_seconds < self.min_phrase:
+            return
+        self.utterances += 1
+        self.on_utterance(sr.AudioData(b"".join(frames), rate, width))
+
+
+# ==========================================================
+# RECOGNITION BACKENDS & PIPELINE
+# ==========================================================
+class RecognizerBackend:
+    """Speech-to-text backend interface.
+
+    `recognize` returns the transcript or raises sr.UnknownValueError (no
+    speech understood) or sr.RequestError (backend unavailable, timed out).
+    RecognitionPipeline gives up on a call after `timeout` seconds.
+    """
+
+    name = "backend"
+
+    def __init__(self, timeout=8.0):
+        self.timeout = timeout
+
+    def recognize(self, audio):
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API (network)"""
+
+    name = "google"
+
+    def __init__(self, language="en-US", timeout=8.0):
+        super().__init__(timeout)
+        self.language = language
+        self.recognizer = sr.Recognizer()
+        self.recognizer.operation_timeout = timeout
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+
+class SphinxBackend(RecognizerBackend):
+    """CMU PocketSphinx (offline; needs the pocketsphinx package)"""
+
+    name = "sphinx"
+
+    def __init__(self, language="en-US", timeout=15.0):
+        super().__init__(timeout)
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    @staticmethod
+    def available():
+        return importlib.util.find_spec("pocketsphinx") is not None
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_sphinx(audio, language=self.language)
+
+
+class FixtureBackend(RecognizerBackend):
+    """Local stand-in that answers from known recordings.
+
+    `transcripts` maps the SHA-1 of an utterance's raw frame data to its
+    text; `latency` simulates backend processing time. Used for offline
+    benchmarks of the pipeline itself.
+    """
+
+    name = "fixture"
+
+    def __init__(self, transcripts, latency=0.0, timeout=8.0):
+        super().__init__(timeout)
+        self.transcripts = dict(transcripts)
+        self.latency = latency
+
+    @staticmethod
+    def fingerprint(audio):
+        return hashlib.sha1(audio.frame_data).hexdigest()
+
+    def recognize(self, audio):
+        if self.latency:
+            time.sleep(self.latency)
+        text = self.transcripts.get(self.fingerprint(audio))
+        if text is None:
+            raise sr.UnknownValueError()
+        return text
+
+
+def default_backends(language="en-US"):
+    """Google first, with offline Sphinx as fallback when installed"""
+    backends = [GoogleBackend(language)]
+    if SphinxBackend.available():
+        backends.append(SphinxBackend(language))
+    return backends
+
+
+class RecognitionPipeline:
+    """Decouples capture from recognition.
+
+    Captured utterances go into a bounded queue (`submit` never blocks the
+    capture thread; when full, the oldest utterance is dropped). A pool of
+    `workers` threads runs them through the backends in order, falling back
+    to the next backend on errors or when one does not answer within its
+    `timeout`, and results are delivered to `callback` in capture order.
+    Each utterance carries a Trace (from `tracer`, unless the capture side
+    started one); it is the current trace while `callback` runs. With a
+    `gate` (WakeWordGate), utterances are filtered on the dispatch thread,
+    in capture order, before recognition; those it drops are not traced.
+    """
+
+    def __init__(self, backends, callback, workers=2, maxsize=8, tracer=None, gate=None):
+        self.backends = list(backends)
+        self.callback = callback
+        self.tracer = tracer
+        self.gate = gate
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.running = False
+        self.recognized = 0
+        self.failed = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=500)  # seconds, submit to delivery
+        self._seq = itertools.count()
+        self._pending = queue.Queue()  # (seq, submitted_at, future, trace) in capture order
+        self._slots = threading.Semaphore(workers)
+        self._submit_lock = threading.Lock()
+        self._pool = None
+        self._threads = []
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="friday-recognizer")
+        self._threads = [
+            threading.Thread(target=self._dispatch_loop, name="friday-dispatch", daemon=True),
+            threading.Thread(target=self._deliver_loop, name="friday-deliver", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, audio, trace=None):
+        """Queue an utterance for recognition (capture-thread safe, non-blocking).
+
+        Returns False, dropping the utterance, once the pipeline is stopped.
+        """
+        with self._submit_lock:
+            if not self.running:
+                return False
+            if trace is None:
+                trace = self.tracer.begin() if self.tracer else NULL_TRACE
+            item = (next(self._seq), time.perf_counter(), audio, trace)
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    return True
+                except queue.Full:
+                    # Only utterances are queued while running: the shutdown
+                    # sentinel goes in under the same lock, after running is cleared
+                    try:
+                        self.queue.get_nowait()[3].finish()
+                        self.queue.task_done()
+                        self.dropped += 1
+                        logger.warning("Recognition is falling behind, dropped the oldest utterance")
+                    except queue.Empty:
+                        pass
+
+    def drain(self, timeout=None):
+        """Wait until every submitted utterance has been delivered"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.queue.unfinished_tasks or self._pending.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self):
+        with self._submit_lock:
+            if not self.running:
+                return
+            self.running = False
+            while True:
+                try:
+                    self.queue.put_nowait(None)
+                    break
+                except queue.Full:
+                    try:  # the utterance would be discarded by the dispatcher anyway
+                        self.queue.get_nowait()[3].finish()
+                        self.queue.task_done()
+                    except queue.Empty:
+                        pass
+        if self._pool:
+            self._pool.shutdown(wait=False)
+
+    def recognize(self, audio):
+        """Run audio through the backends; returns (success, text or error)"""
+        error = "No recognizer backend"
+        for backend in self.backends:
+            try:
+                return True, self._call(backend, audio)
+            except sr.UnknownValueError:
+                return False, "Could not understand"
+            except Exception as e:
+                error = f"{backend.name}: {e}"
+                logger.warning(f"Recognizer {error}, trying next backend")
+        return False, error
+
+    @staticmethod
+    def _call(backend, audio):
+        """backend.recognize(audio), abandoned after backend.timeout seconds.
+
+        The call runs on its own daemon thread: a hung backend keeps that
+        thread, not a pipeline worker, and cannot hold up shutdown.
+        """
+        future = Future()
+
+        def run():
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(backend.recognize(audio))
+                except BaseException as e:
+                    future.set_exception(e)
+
+        threading.Thread(target=run, name=f"friday-{backend.name}", daemon=True).start()
+        try:
+            return future.result(timeout=backend.timeout)
+        except FutureTimeout:
+            raise sr.RequestError(f"no answer within {backend.timeout:g} s") from None
+
+    def _recognize_traced(self, audio, trace):
+        with trace.stage("recognize"):
+            return self.recognize(audio)
+
+    def stats(self):
+        samples = sorted(self.latencies)
+        return {
+            "queue_depth": self.queue.qsize(),
+            "recognized": self.recognized,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "latency_p50_ms": _percentile_ms(samples, 0.50),
+            "latency_p95_ms": _percentile_ms(samples, 0.95),
+        }
+
+    def _dispatch_loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None or not self.running:
+                self.queue.task_done()
+                break
+            seq, submitted_at, audio, trace = item
+            if self.gate:
+                try:
+                    with trace.stage("wake"):
+                        audio = self.gate.filter(audio)
+                except Exception as e:
+                    logger.error(f"Wake word gate error, dropping the utterance: {e}")
+                    audio = None
+                if audio is None:
+                    self.queue.task_done()
+                    continue
+            self._slots.acquire()
+            try:
+                future = self._pool.submit(self._recognize_traced, audio, trace)
+            except RuntimeError:  # pool shut down
+                self._slots.release()
+                self.queue.task_done()
+                break
+            future.add_done_callback(lambda _: self._slots.release())
+            self._pending.put((seq, submitted_at, future, trace))
+            self.queue.task_done()
+        self._pending.put(None)
+
+    def _deliver_loop(self):
+        budget = sum(backend.timeout for backend in self.backends) + 1.0
+        while True:
+            item = self._pending.get()
+            if item is None:
+                self._pending.task_done()
+                break
+            seq, submitted_at, future, trace = item
+            try:
+                success, result = future.result(timeout=budget)
+            except FutureTimeout:
+                success, result = False, "Recognition timed out"
+            except Exception as e:
+                success, result = False, str(e)
+            self.latencies.append(time.perf_counter() - submitted_at)
+            try:
+                if success:
+                    self.recognized += 1
+                    if self.running:
+                        with trace.activate():
+                            self.callback(result)
+                else:
+                    self.failed += 1
+                    trace.finish()
+                    logger.debug(f"Utterance {seq} not recognized: {result}")
+            except Exception as e:
+                logger.error(f"Voice callback error: {e}")
+            finally:
+                self._pending.task_done()
+
+
+# ==========================================================
+# WAKE-WORD GATE
+# ==========================================================
+WAKE_WORD = "friday"
+WAKE_WORD_DIR = os.path.join(os.path.expanduser("~"), ".friday", "wake_word")
+
+
+def _frame_energies(data, width, frame):
+    """RMS energy of each `frame`-byte slice of raw PCM"""
+    return [audioop.rms(data[i:i + frame], width) for i in range(0, len(data) - frame + 1, frame)]
+
+
+def voiced_seconds(audio, ratio=3.0, frame_seconds=0.02):
+    """Seconds of `audio` louder than `ratio` x its own quiet level.
+
+    The quiet level is the 10th percentile of the frame energies, so a
+    phrase segmented with its trailing pause measures only what was said,
+    and a click or a door slam measures close to nothing.
+    """
+    width, rate = audio.sample_width, audio.sample_rate
+    frame = max(1, int(rate * frame_seconds)) * width
+    energies = _frame_energies(audio.frame_data, width, frame)
+    if not energies:
+        return 0.0
+    floor = sorted(energies)[len(energies) // 10]
+    threshold = max(floor * ratio, 50.0)
+    return sum(energy > threshold for energy in energies) * frame_seconds
+
+
+WAKE_LAGS = (1, 2, 4, 8, 16, 32)  # autocorrelation lags (samples) in the spotter's features
+
+
+def audio_features(audio, frame_seconds=0.03, hop_seconds=0.02):
+    """Cheap per-frame spectral features of `audio` for the template spotter.
+
+    Each frame gives its log energy and the normalized autocorrelation at
+    WAKE_LAGS, which together describe the spectral envelope the way LPC
+    does. The autocorrelation comes from the energies of x[n] - x[n-k], so
+    all per-sample work is done by audioop in C. The noise level, estimated
+    from the quietest fifth of the frames, is subtracted before normalizing:
+    stationary room noise then barely moves the features. Log energy is
+    relative to the loudest frame, so the input level does not matter.
+    """
+    width, rate, data = audio.sample_width, audio.sample_rate, audio.frame_data
+    if width != 2:
+        data, width = audioop.lin2lin(data, width, 2), 2
+    top = WAKE_LAGS[-1] * width
+    base = data[top:]
+    diffs = [audioop.add(base, audioop.mul(data[top - lag * width:len(data) - lag * width], width, -1), width)
+             for lag in WAKE_LAGS]
+    frame = int(rate * frame_seconds) * width
+    hop = int(rate * hop_seconds) * width
+    rms = audioop.rms
+    frames = []  # [R0, R1, R2, ...] per frame; E[(x[n] - x[n-k])^2] = 2 (R0 - Rk)
+    for i in range(0, len(base) - frame + 1, hop):
+        r0 = rms(base[i:i + frame], width) ** 2
+        frames.append([r0] + [r0 - rms(diff[i:i + frame], width) ** 2 / 2.0 for diff in diffs])
+    if not frames:
+        return []
+    quiet = sorted(frames, key=lambda f: f[0])[:max(1, len(frames) // 5)]
+    noise = [sum(f[k] for f in quiet) / len(quiet) for k in range(len(WAKE_LAGS) + 1)]
+    loudest = max(max(f[0] for f in frames) - noise[0], 1.0)
+    floor = max(loudest * 1e-3, 1.0)
+    features = []
+    for f in frames:
+        power = max(f[0] - noise[0], floor)
+        row = [math.log(power / loudest) / 8.0]
+        for k in range(1, len(WAKE_LAGS) + 1):
+            r = (f[k] - noise[k]) / power
+            row.append(-1.0 if r < -1.0 else 1.0 if r > 1.0 else r)
+        features.append(row)
+    return features
+
+
+def _trim_features(features, floor=math.log(0.02) / 8.0):
+    """`features` without leading and trailing frames 34 dB below the loudest"""
+    loud = [i for i, f in enumerate(features) if f[0] > floor]
+    return features[loud[0]:loud[-1] + 1] if loud else features
+
+
+def _subsequence_dtw(template, query, limit=float("inf")):
+    """Best match of `template` anywhere in `query`.
+
+    Returns (cost per template frame, index of the query frame where the
+    match ends). Dynamic time warping with a free start and end in the
+    query, so the word can be said at any pace and be followed by other
+    speech. Gives up early, returning (inf, None), once the cost must
+    exceed `limit`. This loop is the spotter's whole cost, hence the
+    feature distance unrolled for len(WAKE_LAGS) + 1 == 7 features.
+    """
+    inf = float("inf")
+    bound = limit * len(template)
+    previous = None
+    for t0, t1, t2, t3, t4, t5, t6 in template:
+        row = []
+        left = inf
+        for j, (q0, q1, q2, q3, q4, q5, q6) in enumerate(query):
+            d = (abs(t0 - q0) + abs(t1 - q1) + abs(t2 - q2) + abs(t3 - q3)
+                 + abs(t4 - q4) + abs(t5 - q5) + abs(t6 - q6))
+            if previous is None:
+                best = 0.0  # the match may start at any query frame
+            else:
+                best = previous[j]
+                if j and previous[j - 1] < best:
+                    best = previous[j - 1]
+            if left < best:
+                best = left
+            left = d + best
+            row.append(left)
+        if not row or min(row) > bound:
+            return inf, None
+        previous = row
+    if not previous:
+        return inf, None
+    end = min(range(len(previous)), key=previous.__getitem__)
+    return previous[end] / len(template), end
+
+
+class KeywordSpotter:
+    """Wake-word detector interface.
+
+    `spot(audio)` returns (found, end) where `end` is the offset in seconds
+    at which the keyword ends, or None when the spotter cannot tell.
+    """
+
+    name = "spotter"
+
+    def spot(self, audio):
+        raise NotImplementedError
+
+
+class TemplateSpotter(KeywordSpotter):
+    """Matches the start of an utterance against recordings of the wake word.
+
+    Needs no models or extra packages: a few enrolled recordings of the
+    user saying "Friday" are reduced to `audio_features` and compared with
+    the first `lead` seconds of each utterance by subsequence DTW. An
+    utterance matches when its cost to the closest template is at most
+    `threshold`; by default that is derived from how close the templates
+    are to each other, scaled by `sensitivity` (higher accepts more).
+    """
+
+    name = "template"
+    FRAME_SECONDS = 0.04
+    HOP_SECONDS = 0.03  # DTW cost grows with the square of the frame rate
+
+    def __init__(self, templates, threshold=None, sensitivity=1.0, lead=1.5):
+        self.templates = [t for t in templates if t]
+        if not self.templates:
+            raise ValueError("TemplateSpotter needs at least one non-empty template")
+        self.lead = lead
+        self.threshold = (threshold or self._spread()) * sensitivity
+
+    @classmethod
+    def from_audio(cls, recordings, **kwargs):
+        """Templates from AudioData recordings of the wake word said alone"""
+        return cls([_trim_features(audio_features(audio, cls.FRAME_SECONDS, cls.HOP_SECONDS))
+                    for audio in recordings], **kwargs)
+
+    @classmethod
+    def from_wavs(cls, paths, **kwargs):
+        recordings = []
+        for path in paths:
+            with wave.open(path, "rb") as wav:
+                if wav.getnchannels() != 1:
+                    raise ValueError(f"{path}: only mono WAV files are supported")
+                data = wav.readframes(wav.getnframes())
+                recordings.append(sr.AudioData(data, wav.getframerate(), wav.getsampwidth()))
+        return cls.from_audio(recordings, **kwargs)
+
+    def _spread(self):
+        """1.5 x the median distance from a template to its nearest other take"""
+        if len(self.templates) < 2:
+            return 0.6
+        nearest = sorted(min(_subsequence_dtw(a, b)[0] for b in self.templates if b is not a)
+                         for a in self.templates)
+        return 1.5 * nearest[len(nearest) // 2]
+
+    def score(self, audio):
+        """(cost to the closest template, offset in seconds where the match ends)"""
+        head = audio.frame_data[:int(self.lead * audio.sample_rate) * audio.sample_width]
+        query = audio_features(sr.AudioData(head, audio.sample_rate, audio.sample_width),
+                               self.FRAME_SECONDS, self.HOP_SECONDS)
+        best, end = float("inf"), None
+        for template in self.templates:
+            cost, j = _subsequence_dtw(template, query, min(best, self.threshold))
+            if cost < best:
+                best, end = cost, j
+        if end is None:
+            return best, None
+        return best, end * self.HOP_SECONDS + self.FRAME_SECONDS + WAKE_LAGS[-1] / audio.sample_rate
+
+    def spot(self, audio):
+        cost, end = self.score(audio)
+        return cost <= self.threshold, end
+
+
+class SphinxSpotter(KeywordSpotter):
+    """PocketSphinx keyword search for the wake word.
+
+    Loads the acoustic model once and keeps the decoder (recognize_sphinx
+    would load it for every utterance). `sensitivity` is on the same 0..1
+    scale as speech_recognition's keyword_entries.
+    """
+
+    name = "sphinx"
+
+    def __init__(self, keyword=WAKE_WORD, sensitivity=0.8, language="en-US"):
+        self.keyword = keyword
+        self.sensitivity = sensitivity
+        self.language = language
+        self._decoder = None
+
+    @staticmethod
+    def available():
+        return SphinxBackend.available()
+
+    def _load(self):
+        from pocketsphinx import pocketsphinx
+        data = os.path.join(os.path.dirname(os.path.realpath(sr.__file__)), "pocketsphinx-data", self.language)
+        config = pocketsphinx.Config()
+        config.set_string("-hmm", os.path.join(data, "acoustic-model"))
+        config.set_string("-dict", os.path.join(data, "pronounciation-dictionary.dict"))
+        config.set_string("-logfn", os.devnull)
+        decoder = pocketsphinx.Decoder(config)
+        with tempfile.NamedTemporaryFile("w", suffix=".kws", delete=False) as f:
+            f.write(f"{self.keyword} /1e{100 * self.sensitivity - 110}/\n")
+        try:
+            decoder.add_kws("wake", f.name)
+        finally:
+            os.unlink(f.name)
+        decoder.activate_search("wake")
+        return decoder
+
+    def spot(self, audio):
+        if self._decoder is None:
+            self._decoder = self._load()
+        decoder = self._decoder
+        decoder.start_utt()
+        decoder.process_raw(audio.get_raw_data(convert_rate=16000, convert_width=2), False, True)
+        decoder.end_utt()
+        if decoder.hyp() is None:
+            return False, None
+        end = None
+        try:
+            for segment in decoder.seg():
+                if segment.word.strip().lower() == self.keyword:
+                    end = (segment.end_frame + 1) / 100.0  # 10 ms frames
+                    break
+        except AttributeError:  # segment timing differs across pocketsphinx versions
+            pass
+        return True, end
+
+
+class WakeWordGate:
+    """Local first stage in front of the recognizer.
+
+    Each captured utterance passes two cheap checks before it may reach a
+    recognizer backend: a voice-activity check (`voiced_seconds` at least
+    `min_voiced`) and the keyword spotter. "Friday, open chrome" goes on
+    with the wake word cut off; a bare "Friday" opens a `window`-second
+    window in which the next voiced utterance passes whole. Everything
+    else is dropped here, so background chatter costs neither a network
+    round-trip nor recognizer CPU. `filter` is not thread-safe; the
+    RecognitionPipeline runs it on its dispatch thread, never the capture
+    thread.
+    """
+
+    def __init__(self, spotter, window=6.0, min_voiced=0.2, ratio=3.0, on_wake=None):
+        self.spotter = spotter
+        self.window = window
+        self.min_voiced = min_voiced
+        self.ratio = ratio
+        self.on_wake = on_wake
+        self.utterances = 0
+        self.silent = 0
+        self.rejected = 0
+        self.woken = 0
+        self.passed = 0
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self._armed_until = 0.0
+
+    def filter(self, audio):
+        """The part of `audio` to recognize, or None to drop it"""
+        start = time.thread_time()
+        try:
+            return self._filter(audio)
+        finally:
+            self.cpu_seconds += time.thread_time() - start
+
+    def _filter(self, audio):
+        self.utterances += 1
+        self.audio_seconds += len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        if voiced_seconds(audio, self.ratio) < self.min_voiced:
+            self.silent += 1
+            return None
+        if time.monotonic() < self._armed_until:
+            self._armed_until = 0.0
+            self.passed += 1
+            return audio
+        found, end = self.spotter.spot(audio)
+        if not found:
+            self.rejected += 1
+            return None
+        self.woken += 1
+        if end is not None:
+            offset = int(end * audio.sample_rate) * audio.sample_width
+            audio = sr.AudioData(audio.frame_data[offset:], audio.sample_rate, audio.sample_width)
+            if voiced_seconds(audio, self.ratio) < self.min_voiced:
+                self._armed_until = time.monotonic() + self.window
+                if self.on_wake:
+                    self.on_wake()
+                return None
+        self.passed += 1
+        return audio
+
+    def stats(self):
+        return {
+            "spotter": self.spotter.name,
+            "utterances": self.utterances,
+            "silent": self.silent,
+            "rejected": self.rejected,
+            "woken": self.woken,
+            "passed": self.passed,
+            "cpu_ms_per_audio_s": round(1000 * self.cpu_seconds / self.audio_seconds, 2) if self.audio_seconds else 0.0,
+        }
+
+
+def default_wake_gate(directory=WAKE_WORD_DIR, on_wake=None):
+    """PocketSphinx when installed, else templates recorded in `directory`.
+
+    Returns None (no gating) when neither is available.
+    """
+    if SphinxSpotter.available():
+        spotter = SphinxSpotter()
+    else:
+        paths = sorted(glob.glob(os.path.join(directory, "*.wav")))
+        if not paths:
+            logger.warning(f"Wake word: no pocketsphinx and no recordings in {directory}; not gating")
+            return None
+        try:
+            spotter = TemplateSpotter.from_wavs(paths)
+        except Exception as e:
+            logger.error(f"Wake word templates unusable: {e}")
+            return None
+    logger.info(f"Wake word gate: {spotter.name} spotter")
+    return WakeWordGate(spotter, on_wake=on_wake)
+
+
+def enroll_wake_word(capture, count=5, directory=WAKE_WORD_DIR, attempts=3, prompt=None, min_voiced=0.2):
+    """Record `count` takes of the wake word said alone, for TemplateSpotter.
+
+    `capture()` returns one utterance as AudioData; it may return None or
+    raise sr.WaitTimeoutError when nothing was said. Takes with less than
+    `min_voiced` seconds of voice are asked for again, up to `attempts`
+    tries each. `prompt(take, count)` is called before every try. The takes
+    replace any earlier recordings in `directory` only once all were
+    captured. Returns the paths written.
+    """
+    takes = []
+    for take in range(1, count + 1):
+        for _ in range(attempts):
+            if prompt:
+                prompt(take, count)
+            try:
+                audio = capture()
+            except sr.WaitTimeoutError:
+                audio = None
+            if audio is not None and voiced_seconds(audio) >= min_voiced:
+                takes.append(audio)
+                break
+            logger.warning(f"Wake word take {take}: nothing heard, trying again")
+        else:
+            raise RuntimeError(f"Wake word enrollment: no usable recording for take {take}")
+    TemplateSpotter.from_audio(takes)  # refuses takes that give no features
+    os.makedirs(directory, exist_ok=True)
+    for old in glob.glob(os.path.join(directory, "*.wav")):
+        os.remove(old)
+    paths = []
+    for take, audio in enumerate(takes, 1):
+        path = os.path.join(directory, f"take_{take}.wav")
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(audio.sample_width)
+            wav.setframerate(audio.sample_rate)
+            wav.writeframes(audio.frame_data)
+        paths.append(path)
+    logger.info(f"Wake word enrolled: {len(paths)} takes in {directory}")
+    return paths
+
+
+# ==========================================================
+# VOICE ASSISTANT CLASS
+# ==========================================================
+class VoiceAssistant:
+    """Speech recognition handler.
+
+    Capture and recognition are pipelined: the capture loop only records
+    and hands utterances to a RecognitionPipeline, so recognition latency
+    never adds deaf time. In continuous mode the microphone stays open (see
+    ContinuousListener) and the learned noise floor is kept in
+    `preferences` across sessions. With `wake_word` (or an explicit
+    `wake_gate`) only utterances addressed to Friday reach the backends;
+    see WakeWordGate.
+    """
+    
+    def __init__(self, preferences=None, continuous=False, source=None, backends=None, workers=2,
+                 tracer=None, wake_word=False, wake_gate=None, on_wake=None, queue_size=8):
+        self.recognizer = None
+        self.microphone = source
+        self.preferences = preferences
+        self.continuous = continuous
+        self.is_listening = False
+        self.language = "en-US"
+        self.backends = backends
+        self.workers = workers
+        self.queue_size = queue_size  # utterances waiting for the gate and recognition
+        self.tracer = tracer or LatencyTracer()
+        self.pipeline = None
+        self.wake_word = wake_word
+        self.wake_gate = wake_gate
+        self.on_wake = on_wake
+        self.ready = threading.Event()
+        self._capture = None
+
+    def prepare(self):
+        """Load speech_recognition, the backends and the microphone.
+
+        This is the slow part of start-up (device enumeration), so the GUI
+        runs it on a background thread; it is also called on first use.
+        """
+        if self.ready.is_set():
+            return
+        self.recognizer = sr.Recognizer()
+        if self.backends is None:
+            self.backends = default_backends(self.language)
+        if self.microphone is None:
+            self.microphone = self._get_microphone()
+        if self.wake_word and self.wake_gate is None:
+            self.wake_gate = default_wake_gate(on_wake=self.on_wake)
+        self.ready.set()
+
+    def _get_microphone(self):
+        try:
+            mics = sr.Microphone.list_microphone_names()
+            if not mics:
+                return None
+            return sr.Microphone(device_index=0)
+        except Exception:
+            return None
+
+    def capture(self, trace=NULL_TRACE):
+        """Record one phrase from the microphone; returns AudioData or None"""
+        start = time.perf_counter()
+        with self.microphone as source:
+            trace.mark("mic_open", start)
+            with trace.stage("adjust"):
+                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            with trace.stage("listen"):
+                return self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
+
+    def listen(self):
+        """Capture and recognize one phrase synchronously"""
+        self.prepare()
+        if not self.microphone:
+            return False, "Microphone not found"
+        try:
+            audio = self.capture()
+        except sr.WaitTimeoutError:
+            return False, "Timeout"
+        except Exception as e:
+            return False, str(e)
+        return self.recognize(audio)
+
+    def recognize(self, audio):
+        self.prepare()
+        if self.pipeline:
+            return self.pipeline.recognize(audio)
+        return RecognitionPipeline(self.backends, None).recognize(audio)
+
+    def start_listening(self, callback):
+        if self.is_listening:
+            return
+        self.prepare()
+        self.is_listening = True
+        if self.pipeline:
+            self.pipeline.stop()  # left over from a capture that died
+        self.pipeline = RecognitionPipeline(self.backends, callback, workers=self.workers,
+                                            maxsize=self.queue_size, tracer=self.tracer, gate=self.wake_gate)
+        self.pipeline.start()
+        if self.continuous and self.microphone:
+            self._start_capture()
+        else:
+            thread = threading.Thread(target=self._voice_listener_loop, daemon=True)
+            thread.start()
+
+    def stop_listening(self):
+        self.is_listening = False
+        if self._capture:
+            self._capture.stop()
+            self._capture = None
+        if self.pipeline:
+            self.pipeline.stop()
+        if self.wake_gate:
+            logger.info(f"Wake word gate: {self.wake_gate.stats()}")
+
+    def stats(self):
+        stats = self.pipeline.stats() if self.pipeline else {}
+        if self.wake_gate:
+            stats["wake"] = self.wake_gate.stats()
+        return stats
+
+    def submit(self, audio, trace=None):
+        """Hand a captured utterance to recognition (the pipeline applies the wake gate)"""
+        self.pipeline.submit(audio, trace)
+
+    def _start_capture(self):
+        floor = None
+        if self.preferences:
+            try:
+                floor = float(self.preferences.get_preference("noise_floor"))
+            except (TypeError, ValueError):
+                floor = None
+        self._capture = ContinuousListener(
+            self.microphone, self.submit,
+            noise_floor=floor, on_noise_floor=self._save_noise_floor, on_exit=self._capture_exited
+        )
+        self._capture.start()
+
+    def _capture_exited(self):
+        if self.is_listening:
+            logger.warning("Audio capture stopped; no longer listening")
+            self.is_listening = False
+
+    def _save_noise_floor(self, floor):
+        if self.preferences:
+            try:
+                self.preferences.set_preference("noise_floor", round(floor, 1))
+            except Exception as e:
+                logger.error(f"Noise floor save error: {e}")
+
+    def _voice_listener_loop(self):
+        error_count = 0
+        while self.is_listening:
+            try:
+                if not self.microphone:
+                    error_count += 1
+                    if error_count >= 5:
+                        self.is_listening = False
+                        break
+                    time.sleep(2 ** error_count)
+                    continue
+
+                trace = self.tracer.begin()
+                audio = self.capture(trace)
+                error_count = 0
+                self.submit(audio, trace)
+            except sr.WaitTimeoutError:
+                continue
+            except Exception as e:
+                logger.error(f"Voice error: {e}")
+                error_count += 1
+                if error_count >= 5:
+                    self.is_listening = False
+
+
+# ==========================================================
+# APPLICATION INDEX
+# ==========================================================
+class AppIndex:
+    """Applications discovered on this machine, cached in friday.db.
+
+    Linux: XDG .desktop entries. macOS: .app bundles in the Applications
+    folders. Bare executables on $PATH are never indexed, so only what has
+    a desktop entry (or a built-in APPS entry) can be launched by name;
+    "open reboot" must not run /usr/sbin/reboot. The cache is reused until the
+    mtime of one of the scanned directories changes, and rescans happen on
+    a background thread. Lookups are dictionary hits on the name, derived
+    aliases and a squashed (alphanumeric-only) form; difflib is only the
+    last resort for names that miss all of those.
+    """
+
+    DESKTOP, BUNDLE, EXECUTABLE = "desktop", "bundle", "path"
+    VENDORS = ("google ", "microsoft ", "mozilla ", "gnu ", "apple ")
+    FIELD_CODES = re.compile(r"\s*%[fFuUdDnNickvm]")
+
+    def __init__(self, db, system=None):
+        self.db = db
+        self.system = system or platform.system()
+        self.entries = {}  # name -> (kind, target)
+        self._lookup = {}  # name / alias / squashed key -> name
+        self._thread = None
+
+    @staticmethod
+    def _squash(name):
+        return re.sub(r"[^a-z0-9]", "", name.lower())
+
+    def source_dirs(self):
+        if self.system == "Linux":
+            data_dirs = os.environ.get("XDG_DATA_DIRS", "/usr/local/share:/usr/share").split(":")
+            data_dirs.insert(0, os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share")))
+            data_dirs += ["/var/lib/flatpak/exports/share", "/var/lib/snapd/desktop"]
+            dirs = [os.path.join(d, "applications") for d in data_dirs if d]
+        elif self.system == "Darwin":
+            dirs = ["/Applications", "/Applications/Utilities", "/System/Applications",
+                    "/System/Applications/Utilities", os.path.expanduser("~/Applications")]
+        else:
+            dirs = []
+        return [d for d in dict.fromkeys(dirs) if d and os.path.isdir(d)]
+
+    def _mtimes(self):
+        return {d: os.stat(d).st_mtime for d in self.source_dirs()}
+
+    def load(self):
+        """Build the in-memory maps from the cached table"""
+        self._build(self.db.get_applications())
+
+    def refresh_async(self):
+        """Rescan in the background if any source directory changed"""
+        self._thread = threading.Thread(target=self.refresh, name="friday-app-index", daemon=True)
+        self._thread.start()
+
+    def refresh(self, force=False):
+        try:
+            mtimes = self._mtimes()
+            cached = json.loads(self.db.get_preference("app_index_mtimes", "{}"))
+            if force or mtimes != cached or not self.entries:
+                apps = self.scan()
+                self.db.replace_applications(apps)
+                self.db.set_preference("app_index_mtimes", json.dumps(mtimes))
+                self._build(apps)
+                logger.info(f"Application index rebuilt: {len(apps)} entries")
+        except Exception as e:
+            logger.error(f"Application index refresh error: {e}")
+
+    def scan(self):
+        """Walk the platform sources; returns [(name, target, kind)]"""
+        apps = []
+        for directory in self.source_dirs():
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if self.system == "Darwin" and entry.name.endswith(".app"):
+                    apps.append((entry.name[:-4].lower(), entry.path, self.BUNDLE))
+                elif entry.name.endswith(".desktop"):
+                    app = self._parse_desktop(entry.path)
+                    if app:
+                        apps.append(app)
+        return apps
+
+    def _parse_desktop(self, path):
+        fields = {}
+        in_entry = False
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith("["):
+                        in_entry = line == "[Desktop Entry]"
+                    elif in_entry and "=" in line:
+                        key, value = line.split("=", 1)
+                        fields.setdefault(key.strip(), value.strip())
+        except OSError:
+            return None
+        if fields.get("Type", "Application") != "Application" or "Name" not in fields or "Exec" not in fields:
+            return None
+        if fields.get("NoDisplay") == "true" or fields.get("Hidden") == "true":
+            return None
+        command = self.FIELD_CODES.sub("", fields["Exec"]).strip()
+        return fields["Name"].lower(), command, self.DESKTOP
+
+    def _build(self, apps):
+        entries, lookup = {}, {}
+        for name, target, kind in apps:
+            # Older builds cached every executable on $PATH
+            if name in entries or kind == self.EXECUTABLE:
+                continue
+            entries[name] = (kind, target)
+            aliases = [name, self._squash(name)]
+            for vendor in self.VENDORS:
+                if name.startswith(vendor):
+                    aliases.append(name[len(vendor):])
+            if kind == self.DESKTOP and target:
+                try:
+                    aliases.append(os.path.basename(shlex.split(target)[0]).lower())
+                except (ValueError, IndexError):
+                    pass
+            for alias in aliases:
+                lookup.setdefault(alias, name)
+        self.entries, self._lookup = entries, lookup
+
+    def lookup(self, spoken):
+        """Indexed name for a spoken app name, or None"""
+        spoken = spoken.lower().strip()
+        lookup = self._lookup
+        name = lookup.get(spoken) or lookup.get(self._squash(spoken))
+        if name:
+            return name
+        close = difflib.get_close_matches(spoken, list(self.entries), n=1, cutoff=0.8)
+        return close[0] if close else None
+
+    def get(self, name):
+        """(kind, target) for an indexed name"""
+        return self.entries.get(name)
+
+    def gui_apps(self):
+        return list(self.entries)
+
+
+# ==========================================================
+# PROCESS SUPERVISOR
+# ==========================================================
+class ProcessSupervisor:
+    """Owns the processes FRIDAY launches.
+
+    `spawn` starts an argv list (no shell) in its own session and tracks it
+    under an app name until it exits. A reaper thread waits on the children
+    so none are left as zombies: it sleeps on Linux pidfds when available,
+    otherwise it polls every `poll` seconds. Launched apps outlive FRIDAY;
+    `close` only stops the reaper.
+    """
+
+    def __init__(self, poll=1.0):
+        self.poll = poll
+        self.spawned = 0
+        self.reaped = 0
+        self._apps = {}  # name -> Popen of its latest launch
+        self._children = {}  # Popen -> pidfd or None, until reaped
+        self._selector = None
+        self._wake_r = self._wake_w = None
+        self._thread = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def spawn(self, name, argv):
+        proc = subprocess.Popen(argv, start_new_session=True, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with self._lock:
+            self._start_reaper()
+            pidfd = None
+            if self._selector:
+                try:
+                    pidfd = os.pidfd_open(proc.pid)
+                    self._selector.register(pidfd, selectors.EVENT_READ, proc)
+                except OSError:
+                    pidfd = None  # already exited or pidfds unsupported: polled instead
+            self._children[proc] = pidfd
+            self._apps[name] = proc
+            self.spawned += 1
+        self._wake()
+        return proc
+
+    def running(self, name):
+        """The live process launched as `name`, or None"""
+        with self._lock:
+            proc = self._apps.get(name)
+        return proc if proc is not None and proc.poll() is None else None
+
+    def focus(self, name):
+        """Raise the window of a running app; best effort, True if done"""
+        proc = self.running(name)
+        if proc is None or platform.system() != "Linux" or not shutil.which("wmctrl"):
+            return False
+        try:
+            windows = subprocess.run(["wmctrl", "-lp"], capture_output=True, text=True, timeout=2).stdout
+            for line in windows.splitlines():
+                fields = line.split(None, 4)
+                if len(fields) > 2 and fields[2] == str(proc.pid):
+                    return subprocess.run(["wmctrl", "-ia", fields[0]], timeout=2).returncode == 0
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error(f"Focus {name} failed: {e}")
+        return False
+
+    def _start_reaper(self):
+        if self._thread:
+            return
+        if hasattr(os, "pidfd_open"):
+            self._selector = selectors.DefaultSelector()
+            self._wake_r, self._wake_w = os.pipe()
+            self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._thread = threading.Thread(target=self._run, name="friday-reaper", daemon=True)
+        self._thread.start()
+
+    def _wake(self):
+        if self._wake_w is not None:
+            os.write(self._wake_w, b"x")
+
+    def _run(self):
+        while not self._closed:
+            if self._selector:
+                with self._lock:
+                    polled = any(fd is None for fd in self._children.values())
+                for key, _ in self._selector.select(self.poll if polled else None):
+                    if key.fd == self._wake_r:
+                        os.read(self._wake_r, 512)
+            else:
+                time.sleep(self.poll)
+            self._reap()
+
+    def _reap(self):
+        with self._lock:
+            children = list(self._children.items())
+        for proc, pidfd in children:
+            if proc.poll() is None:
+                continue
+            with self._lock:
+                del self._children[proc]
+                if pidfd is not None:
+                    self._selector.unregister(pidfd)
+                    os.close(pidfd)
+                self.reaped += 1
+            logger.info(f"Launched process {proc.pid} exited with {proc.returncode}")
+
+    def children(self):
+        with self._lock:
+            return len(self._children)
+
+    def close(self):
+        self._closed = True
+        self._wake()
+
+
+# ==========================================================
+# APPLICATION LAUNCHER
+# ==========================================================
+class ApplicationLauncher:
+    """Cross-platform app launcher.
+
+    The built-in APPS cover the common Office/browser/system tools; on
+    Linux their entry is an executable name looked up on $PATH. Anything
+    else is found through the optional AppIndex.
+    """
+    
+    APPS = {
+        "excel": {"Windows": "start excel", "Darwin": "/Applications/Microsoft Excel.app",
+                  "Linux": "localc"},
+        "word": {"Windows": "start winword", "Darwin": "/Applications/Microsoft Word.app",
+                 "Linux": "lowriter"},
+        "powerpoint": {"Windows": "start powerpnt", "Darwin": "/Applications/Microsoft PowerPoint.app",
+                       "Linux": "loimpress"},
+        "outlook": {"Windows": "start outlook", "Darwin": "/Applications/Microsoft Outlook.app",
+                    "Linux": "thunderbird"},
+        "notepad": {"Windows": "notepad", "Darwin": "/Applications/TextEdit.app", "Linux": "gedit"},
+        "chrome": {"Windows": "start chrome", "Darwin": "/Applications/Google Chrome.app",
+                   "Linux": "google-chrome"},
+        "firefox": {"Windows": "start firefox", "Darwin": "/Applications/Firefox.app", "Linux": "firefox"},
+        "calculator": {"Windows": "calc", "Darwin": "/Applications/Calculator.app",
+                       "Linux": "gnome-calculator"},
+        "terminal": {"Windows": "start cmd", "Darwin": "/Applications/Utilities/Terminal.app",
+                     "Linux": "x-terminal-emulator"},
+    }
+
+    # Spoken names -> APPS key
+    ALIASES = {
+        "microsoft excel": "excel", "spreadsheet": "excel",
+        "microsoft word": "word", "ms word": "word",
+        "power point": "powerpoint", "microsoft powerpoint": "powerpoint",
+        "mail": "outlook", "email": "outlook",
+        "text editor": "notepad", "textedit": "notepad",
+        "google chrome": "chrome", "browser": "chrome",
+        "mozilla firefox": "firefox",
+        "calc": "calculator",
+        "command prompt": "terminal", "cmd": "terminal", "console": "terminal",
+    }
+
+    SYSTEM = platform.system()
+    _names = {**{app: app for app in APPS}, **ALIASES}
+
+    # launch() results (both truthy)
+    LAUNCHED, RUNNING = "launched", "running"
+
+    def __init__(self, index=None, supervisor=None):
+        self.index = index
+        self.supervisor = supervisor or ProcessSupervisor()
+
+    def resolve(self, spoken):
+        """Map a spoken app name to an APPS key or indexed app name"""
+        spoken = spoken.lower().strip()
+        names = self._names
+        builtin = names.get(spoken)
+        if builtin and self.is_available(builtin):
+            return builtin
+        indexed = self.index.lookup(spoken) if self.index else None
+        if indexed:
+            return indexed
+        if builtin:
+            return builtin
+        close = difflib.get_close_matches(spoken, names.keys(), n=1, cutoff=0.8)
+        return names[close[0]] if close else None
+
+    def _linux_executable(self, app_name):
+        exe = self.APPS.get(app_name, {}).get("Linux")
+        if not exe:
+            return None
+        if self.index:
+            entry = self.index.get(exe)
+            if entry:
+                return entry[1]
+        return shutil.which(exe)
+
+    def _windows_program(self, app_name):
+        cmd = self.APPS.get(app_name, {}).get("Windows")
+        return cmd[len("start "):] if cmd and cmd.startswith("start ") else cmd
+
+    def _command(self, app_name):
+        """argv that starts an app without a shell, or None"""
+        sys_os = self.SYSTEM
+        if sys_os == "Windows":
+            path = shutil.which(self._windows_program(app_name) or "")
+            if path:
+                return [path]
+        elif sys_os == "Darwin":
+            app_path = self.APPS.get(app_name, {}).get("Darwin")
+            if app_path:
+                # `open` reuses a running instance and exits at once
+                return ["open", app_path] if os.path.exists(app_path) else ["open", "-a", app_path]
+        elif sys_os == "Linux":
+            exe = self._linux_executable(app_name)
+            if exe:
+                return [exe]
+
+        entry = self.index.get(app_name) if self.index else None
+        if entry:
+            kind, target = entry
+            if kind == AppIndex.BUNDLE:
+                return ["open", target]
+            if kind == AppIndex.DESKTOP:
+                return shlex.split(target)
+            # Only built-in APPS and desktop entries are launchable by name
+            logger.warning(f"Refusing to launch {app_name}: not a desktop entry or built-in app")
+        return None
+
+    def launch(self, app_name):
+        """Start an app, or focus it if our previous launch is still running.
+
+        Returns LAUNCHED, RUNNING or False.
+        """
+        app_name = app_name.lower().strip()
+        try:
+            if self.supervisor.running(app_name):
+                self.supervisor.focus(app_name)
+                return self.RUNNING
+            command = self._command(app_name)
+            if command:
+                self.supervisor.spawn(app_name, command)
+                return self.LAUNCHED
+            if self.SYSTEM == "Windows" and self._windows_program(app_name):
+                # What `start` does (App Paths lookup), minus the cmd.exe;
+                # there is no handle to supervise
+                os.startfile(self._windows_program(app_name))
+                return self.LAUNCHED
+            return False
+        except Exception as e:
+            logger.error(f"Launch {app_name} failed: {e}")
+            return False
+
+    def launch_many(self, app_names):
+        """Launch several apps concurrently; {app_name: launch() result}"""
+        if len(app_names) < 2:
+            return {name: self.launch(name) for name in app_names}
+        with ThreadPoolExecutor(max_workers=len(app_names), thread_name_prefix="friday-launch") as pool:
+            return dict(zip(app_names, pool.map(self.launch, app_names)))
+
+    def get_available_apps(self):
+        sys_os = self.SYSTEM
+        if sys_os == "Linux":
+            apps = [app for app in self.APPS if self._linux_executable(app)]
+        else:
+            apps = [app for app, paths in self.APPS.items() if paths.get(sys_os)]
+        if self.index:
+            apps += [name for name in self.index.gui_apps() if name not in self.APPS]
+        return apps
+
+    def is_available(self, app_name):
+        if app_name in self.APPS:
+            if self.SYSTEM == "Linux":
+                return self._linux_executable(app_name) is not None
+            return bool(self.APPS[app_name].get(self.SYSTEM))
+        return bool(self.index and self.index.get(app_name))
+
+
+# ==========================================================
+# INTENT ROUTER
+# ==========================================================
+class Intent:
+    """A named command with precompiled patterns and an optional handler"""
+
+    def __init__(self, name, patterns, handler=None, keywords=(), order=0):
+        self.name = name
+        self.patterns = [re.compile(p) for p in patterns]
+        self.handler = handler
+        self.keywords = tuple(keywords)
+        self.order = order
+
+    def match(self, text):
+        """Slot values (dict) if any pattern matches, else None"""
+        for pattern in self.patterns:
+            m = pattern.search(text)
+            if m:
+                return {k: v.strip() for k, v in m.groupdict().items() if v}
+        return None
+
+
+class IntentRouter:
+    """Keyword-indexed registry of intents.
+
+    Each intent lists the keywords that must appear for it to apply; the
+    router only tries the patterns of intents whose keyword occurs in the
+    utterance, so dispatch cost does not grow with the number of intents.
+    Intents without keywords are tried on every utterance. Candidates are
+    tried in registration order and the first match wins.
+    """
+
+    FILLER = re.compile(r"\b(?:hey|friday|please|now|for me|could you|can you|would you)\b")
+    PUNCTUATION = re.compile(r"[^\w\s']")
+
+    # name, patterns, keywords
+    DEFAULT_INTENTS = [
+        ("start_listening", [r"^(?:start|begin) listening$"], ("listening",)),
+        ("stop_listening", [r"^stop listening$"], ("listening",)),
+        ("add_note", [r"\b(?:add|new|create|take|make) (?:a )?note\b"], ("note",)),
+        ("add_reminder", [r"^remind me (?:to )?(?P<text>.+) in (?P<amount>\d+|an?|one) (?P<unit>second|minute|hour|day)s?$"],
+         ("remind",)),
+        ("launch_app", [r"^(?:open|launch|start|run) (?:up )?(?:the |my )?(?!notes?$)(?P<app>.+)$"],
+         ("open", "launch", "start", "run")),
+        ("quit", [r"^(?:stop|exit|quit|goodbye|shut ?down|power down)$"],
+         ("stop", "exit", "quit", "goodbye", "shut", "shutdown", "power")),
+    ]
+
+    def __init__(self):
+        self.intents = {}
+        self._by_keyword = {}
+        self._always = []
+
+    @classmethod
+    def default(cls, handlers=None):
+        """Router with FRIDAY's built-in intents bound to `handlers` by name"""
+        handlers = handlers or {}
+        router = cls()
+        for name, patterns, keywords in cls.DEFAULT_INTENTS:
+            router.register(name, patterns, handlers.get(name), keywords)
+        return router
+
+    def register(self, name, patterns, handler=None, keywords=()):
+        intent = Intent(name, patterns, handler, keywords, order=len(self.intents))
+        self.intents[name] = intent
+        if intent.keywords:
+            for keyword in intent.keywords:
+                self._by_keyword.setdefault(keyword, []).append(intent)
+        else:
+            self._always.append(intent)
+        return intent
+
+    def on(self, name, handler):
+        """Bind (or rebind) the handler of a registered intent"""
+        self.intents[name].handler = handler
+
+    @classmethod
+    def normalize(cls, text):
+        text = cls.PUNCTUATION.sub(" ", text.lower())
+        text = cls.FILLER.sub(" ", text)
+        return " ".join(text.split())
+
+    def match(self, text):
+        """Return (intent, slots) for the first matching intent, or (None, {})"""
+        text = self.normalize(text)
+        candidates = set(self._always)
+        for token in text.split():
+            candidates.update(self._by_keyword.get(token, ()))
+        for intent in sorted(candidates, key=lambda i: i.order):
+            slots = intent.match(text)
+            if slots is not None:
+                return intent, slots
+        return None, {}
+
+    def dispatch(self, text):
+        """Match and run the handler; returns the matched intent or None"""
+        intent, slots = self.match(text)
+        if intent and intent.handler:
+            intent.handler(**slots)
+        return intent
+
 
 # ==========================================================
-# TEXT TO SPEECH ENGINE
+# FRIDAY CORE
 # ==========================================================
-class VoiceEngine:
-    """Text-to-speech engine using pyttsx3"""
-    
-    def __init__(self):
-        self.enabled = HAS_PYTTSX3
-        if self.enabled:
-            try:
-                self.engine = pyttsx3.init()
-                # Configure for FRIDAY's voice
-                self.engine.setProperty('rate', 150)  # Speed
-                self.engine.setProperty('volume', 0.9)  # Volume
-                
-                # Try to set female voice
-                voices = self.engine.getProperty('voices')
-                if len(voices) > 0:
-                    # Use first female voice if available
-                    for voice in voices:
-                        if 'female' in voice.name.lower():
-                            self.engine.setProperty('voice', voice.id)
-                            break
-                
-                logger.info("VoiceEngine initialized with pyttsx3")
-            except Exception as e:
-                logger.error(f"VoiceEngine initialization error: {e}")
-                self.enabled = False
-        else:
-            logger.warning("pyttsx3 not available. Voice disabled. Install with: pip install pyttsx3")
-    
-    def speak(self, text):
-        """Speak text using TTS"""
-        if not self.enabled:
-            logger.warning(f"Voice disabled. Text: {text}")
-            return
-        
-        try:
-            logger.info(f"FRIDAY: {text}")
-            self.engine.say(text)
-            self.engine.runAndWait()
-        except Exception as e:
-            logger.error(f"Speech error: {e}")
-    
-    def speak_async(self, text):
-        """Speak text asynchronously"""
-        thread = threading.Thread(target=self.speak, args=(text,), daemon=True)
-        thread.start()
+class FridayCore:
+    """Storage, app launching and command routing without any UI.
 
+    Shared by the Tk GUI and the headless daemon. Command handlers return a
+    response dict (ok, message, ...) instead of touching widgets; intents
+    that need a front end (note dialog, quit, listening) only report an
+    `action`, and the GUI rebinds them to its own handlers.
 
-# ==========================================================
-# MODERN COLORS & THEME (Iron Man Edition)
-# ==========================================================
-class Theme:
-    """Iron Man cyberpunk theme"""
-    PRIMARY = "#FFB81C"           # Iron Man Gold
-    SECONDARY = "#DC143C"         # Stark Red
-    TERTIARY = "#00BFFF"          # Sky Blue
-    BACKGROUND = "#0a0e27"        # Deep Blue-Black
-    SURFACE = "#16213e"           # Surface Blue
-    SURFACE_LIGHT = "#1f3a52"     # Lighter Surface
-    SURFACE_LIGHTER = "#2a5f7f"   # Even Lighter
-    TEXT_PRIMARY = "#ffffff"      # White
-    TEXT_SECONDARY = "#b0b0b0"    # Gray
-    SUCCESS = "#00ff41"           # Green
-    ERROR = "#ff006e"             # Pink/Red
-    WARNING = "#ffb800"           # Orange
-    ACCENT = "#FFB81C"            # Gold
+    Latency tracing is on when `trace` is true or, by default, when the
+    latency_tracing preference is '1'; finished traces are stored with their
+    command_history row. Reminders are only announced once a front end calls
+    `start_reminders` with its announcer.
+    """
 
+    UI_INTENTS = ("start_listening", "stop_listening", "add_note", "quit")
+    TIME_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
 
-# ==========================================================
-# DATABASE CLASS
-# ==========================================================
-class Database:
-    """SQLite database handler"""
-    
-    def __init__(self, db_path="friday.db"):
-        self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.cursor = self.conn.cursor()
-        self._create_tables()
-
-    def _create_tables(self):
-        self.cursor.execute('''CREATE TABLE IF NOT EXISTS preferences (
-            key TEXT PRIMARY KEY, value TEXT
-        )''')
-        self.cursor.execute('''CREATE TABLE IF NOT EXISTS notes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL, content TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )''')
-        self.cursor.execute('''CREATE TABLE IF NOT EXISTS command_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            command TEXT, timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-            success BOOLEAN DEFAULT 1
-        )''')
-        self.conn.commit()
+    def __init__(self, db_path="friday.db", trace=None, load_apps=True):
+        self.db = Database(db_path)
+        if trace is None:
+            trace = self.db.get_preference("latency_tracing", "0") == "1"
+        self.tracer = LatencyTracer(trace, on_finish=self._save_trace)
+        self.app_index = AppIndex(self.db)
+        if load_apps:
+            self.load_apps()
+        self.app_launcher = ApplicationLauncher(self.app_index)
+        handlers = {name: (lambda action=name: {"action": action}) for name in self.UI_INTENTS}
+        handlers["launch_app"] = self.launch_app
+        handlers["add_reminder"] = self.add_reminder
+        self.router = IntentRouter.default(handlers)
+        self.reminders = ReminderScheduler(self.db)
 
-    def get_preference(self, key, default=None):
-        self.cursor.execute("SELECT value FROM preferences WHERE key = ?", (key,))
-        row = self.cursor.fetchone()
-        return row[0] if row else default
+    def load_apps(self):
+        """Read the cached application index, then rescan it in the background.
 
-    def set_preference(self, key, value):
-        self.cursor.execute("REPLACE INTO preferences (key, value) VALUES (?, ?)", (key, str(value)))
-        self.conn.commit()
+        Pass load_apps=False to the constructor to call this from elsewhere
+        (the UI runs it on its storage thread); until then no app resolves.
+        """
+        self.app_index.load()
+        self.app_index.refresh_async()
 
-    def search_notes(self, query=""):
-        self.cursor.execute('''
-            SELECT id, title, content, created_at
-            FROM notes
-            WHERE title LIKE ? OR content LIKE ?
-            ORDER BY updated_at DESC
-        ''', (f'%{query}%', f'%{query}%'))
-        return self.cursor.fetchall()
+    def start_reminders(self, announce):
+        """Start announcing due reminders through `announce(text)`"""
+        self.reminders.announce = announce
+        self.reminders.start()
 
-    def get_note(self, note_id):
-        self.cursor.execute("SELECT id, title, content, created_at, updated_at FROM notes WHERE id = ?", (note_id,))
-        return self.cursor.fetchone()
+    def add_reminder(self, text, amount, unit):
+        """Voice intent: remind me to <text> in <amount> <unit>"""
+        count = 1 if amount in ("a", "an", "one") else int(amount)
+        due = self.reminders.clock() + count * self.TIME_UNITS[unit]
+        self.reminders.add(text, due)
+        at = time.strftime("%H:%M" if count * self.TIME_UNITS[unit] < 86400 else "%A %H:%M", time.localtime(due))
+        return {"ok": True, "message": f"Very well, Sir. I'll remind you at {at}."}
 
-    def add_note(self, title, content):
-        self.cursor.execute("INSERT INTO notes (title, content) VALUES (?, ?)", (title, content))
-        self.conn.commit()
-        return self.cursor.lastrowid
+    def handle_command(self, text, trace=NULL_TRACE):
+        """Route one spoken/typed command; returns the response dict"""
+        with trace.stage("dispatch"), trace.activate():
+            intent, slots = self.router.match(text)
+            response = {"intent": intent.name if intent else None, "slots": slots, "ok": True, "message": None}
+            if intent is None:
+                response["message"] = FRIDAYPersonality.get_random("witty")
+            elif intent.handler:
+                response.update(intent.handler(**slots) or {})
+        self.db.add_command_history(text, intent is not None and response.get("ok", True), trace.id)
+        return response
 
-    def update_note(self, note_id, title, content):
-        self.cursor.execute('''
-            UPDATE notes
-            SET title=?, content=?, updated_at=CURRENT_TIMESTAMP
-            WHERE id=?
-        ''', (title, content, note_id))
-        self.conn.commit()
+    COMPOUND = re.compile(r"\s*(?:,|&|\band\b|\bplus\b)\s*")
 
-    def delete_note(self, note_id):
-        self.cursor.execute("DELETE FROM notes WHERE id=?", (note_id,))
-        self.conn.commit()
+    def launch_app(self, app):
+        """Resolve a spoken app name and launch it.
 
-    def add_command_history(self, command, success=True):
-        self.cursor.execute(
-            "INSERT INTO command_history (command, success) VALUES (?, ?)",
-            (command, success)
-        )
-        self.conn.commit()
+        "excel and word" (or "excel, word") launches each app concurrently
+        unless the whole phrase names an app itself.
+        """
+        app_name = self.app_launcher.resolve(app)
+        parts = [part for part in self.COMPOUND.split(app) if part]
+        if (not app_name or not self.app_launcher.is_available(app_name)) and len(parts) > 1:
+            return self._launch_many(parts)
+        if not app_name or not self.app_launcher.is_available(app_name):
+            return {"ok": False, "app": app, "message": f"I'm unable to locate {app}, Sir."}
+        with Trace.current().stage("launch"):
+            launched = self.app_launcher.launch(app_name)
+        if not launched:
+            return {"ok": False, "app": app_name, "message": FRIDAYPersonality.get_random("error")}
+        self.db.record_app_launch(app_name)
+        if launched == ApplicationLauncher.RUNNING:
+            return {"ok": True, "app": app_name, "running": True,
+                    "message": FRIDAYPersonality.app_running_message(app_name)}
+        return {"ok": True, "app": app_name, "message": FRIDAYPersonality.app_launch_message(app_name)}
+
+    def _launch_many(self, spoken):
+        resolved = {}  # app name -> spoken name, in request order
+        missing = []
+        for name in spoken:
+            app_name = self.app_launcher.resolve(name)
+            if app_name and self.app_launcher.is_available(app_name):
+                resolved.setdefault(app_name, name)
+            else:
+                missing.append(name)
+        with Trace.current().stage("launch"):
+            results = self.app_launcher.launch_many(list(resolved))
+        launched = [app_name for app_name, result in results.items() if result]
+        for app_name in launched:
+            self.db.record_app_launch(app_name)
+        missing += [resolved[app_name] for app_name, result in results.items() if not result]
+        message = FRIDAYPersonality.app_launch_message(" and ".join(launched)) if launched else ""
+        if missing:
+            message += f" I'm unable to locate {' or '.join(missing)}, Sir."
+        return {"ok": bool(launched) and not missing, "apps": launched, "missing": missing,
+                "message": message.strip()}
+
+    def _save_trace(self, trace):
+        self.db.save_latencies(trace.id, trace.as_ms())
 
     def close(self):
-        try:
-            if self.cursor:
-                self.cursor.close()
-            if self.conn:
-                self.conn.close()
-        except Exception as e:
-            logger.error(f"Database close error: {e}")
+        self.reminders.stop()
+        self.app_launcher.supervisor.close()
+        self.db.close()
 
 
 # ==========================================================
-# VOICE ASSISTANT CLASS
+# HEADLESS DAEMON
 # ==========================================================
-class VoiceAssistant:
-    """Speech recognition handler"""
-    
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.microphone = self._get_microphone()
-        self.is_listening = False
-        self.language = "en-US"
+# The socket accepts app launches and commands, so it lives in a directory
+# only its owner can write to: XDG_RUNTIME_DIR, or a per-user 0700
+# directory under the temp dir, never the shared temp dir itself
+DEFAULT_SOCKET = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR")
+    or os.path.join(tempfile.gettempdir(), f"friday-{os.getuid() if hasattr(os, 'getuid') else 'user'}"),
+    "friday.sock")
 
-    def _get_microphone(self):
+
+def _private_directory(path):
+    """Create `path` (mode 0700) if needed; refuse one others can write to"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise RuntimeError(f"Refusing to use {path} for the FRIDAY socket: "
+                           "it must be owned by you and writable by nobody else")
+
+
+class CommandServer:
+    """JSON-lines API for a FridayCore on a Unix domain socket.
+
+    Each request is one line: {"id": ..., "method": ..., "params": {...}};
+    each reply is {"id": ..., "result": ...} or {"id": ..., "error": ...}.
+    Clients may pipeline: requests on a connection run concurrently on a
+    thread pool (the core is blocking SQLite work) and replies are written
+    back in request order. At most `max_inflight` requests per connection
+    are outstanding before the server stops reading from it.
+    """
+
+    def __init__(self, core, path=DEFAULT_SOCKET, workers=8, max_inflight=256):
+        self.core = core
+        self.path = path
+        self.max_inflight = max_inflight
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="friday-api")
+        self.requests = 0
+        self.clients = 0
+        self.methods = {
+            "ping": lambda: "pong",
+            "command": self._command,
+            "apps.list": core.app_launcher.get_available_apps,
+            "apps.launch": core.launch_app,
+            "notes.search": core.db.search_notes,
+            "notes.list": core.db.list_notes,
+            "notes.get": core.db.get_note,
+            "notes.add": core.db.add_note,
+            "notes.update": core.db.update_note,
+            "notes.delete": core.db.delete_note,
+            "usage.commands": core.db.command_usage,
+            "usage.by_day": core.db.command_usage_by_day,
+            "reminders.add": core.reminders.add,
+            "reminders.pending": lambda until=None, limit=100: core.db.pending_reminders(
+                until if until is not None else time.time() + 86400, limit=limit),
+            "stats": self.stats,
+        }
+        self.bound = False  # whether self.path is our socket, to remove on exit
+        self._server = None
+
+    def stats(self):
+        return {"requests": self.requests, "clients": self.clients, "latency": self.core.tracer.stats()}
+
+    def _command(self, text):
+        trace = self.core.tracer.begin()
         try:
-            mics = sr.Microphone.list_microphone_names()
-            if not mics:
-                return None
-            return sr.Microphone(device_index=0)
-        except Exception:
-            return None
+            return self.core.handle_command(text, trace)
+        finally:
+            trace.finish()
 
-    def listen(self):
-        if not self.microphone:
-            return False, "Microphone not found"
+    async def start(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        _private_directory(directory)
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except ConnectionRefusedError:
+                os.remove(self.path)  # stale socket from an unclean exit
+            except FileNotFoundError:
+                pass
+            else:
+                raise RuntimeError(f"FRIDAY daemon is already running on {self.path}")
+            finally:
+                probe.close()
+        # Bind in a fresh 0700 directory and move the socket into place, so it
+        # is never reachable before its mode is 0600
+        staging = tempfile.mkdtemp(dir=directory, prefix=".friday-")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         try:
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
-            text = self.recognizer.recognize_google(audio)
-            return True, text
-        except sr.WaitTimeoutError:
-            return False, "Timeout"
-        except sr.UnknownValueError:
-            return False, "Could not understand"
+            sock.bind(os.path.join(staging, "s"))
+            os.chmod(os.path.join(staging, "s"), 0o600)
+            os.rename(os.path.join(staging, "s"), self.path)
+        except OSError:
+            sock.close()
+            raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.bound = True
+        self._server = await asyncio.start_unix_server(self._serve_client, sock=sock)
+        logger.info(f"FRIDAY daemon listening on {self.path}")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+        if self.bound and os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def _serve_client(self, reader, writer):
+        self.clients += 1
+        replies = asyncio.Queue(maxsize=self.max_inflight)
+        sender = asyncio.create_task(self._send_replies(replies, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    await replies.put(asyncio.create_task(self._handle(line)))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            await replies.put(None)
+            await sender
+            self.clients -= 1
+            writer.close()
+
+    async def _send_replies(self, replies, writer):
+        try:
+            while True:
+                task = await replies.get()
+                if task is None:
+                    break
+                writer.write(json.dumps(await task).encode("utf-8") + b"\n")
+                if replies.empty():
+                    await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _handle(self, line):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            method = self.methods.get(request.get("method"))
+            if method is None:
+                return {"id": request_id, "error": f"Unknown method: {request.get('method')}"}
+            params = request.get("params") or {}
+            call = (lambda: method(*params)) if isinstance(params, list) else (lambda: method(**params))
+            self.requests += 1
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, call)
+            return {"id": request_id, "result": result}
         except Exception as e:
-            return False, str(e)
+            return {"id": request_id, "error": str(e)}
 
-    def start_listening(self, callback):
-        if self.is_listening:
+
+def send_request(method, params=None, path=DEFAULT_SOCKET, timeout=10.0):
+    """Blocking one-shot client for scripts; returns the reply's result"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(json.dumps({"id": 1, "method": method, "params": params or {}}).encode("utf-8") + b"\n")
+        reply = client.makefile("rb").readline()
+    reply = json.loads(reply)
+    if "error" in reply:
+        raise RuntimeError(reply["error"])
+    return reply["result"]
+
+
+def run_headless(path=DEFAULT_SOCKET, db_path="friday.db", trace=None):
+    """Serve the command API until interrupted"""
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Headless mode needs Unix domain sockets")
+    core = FridayCore(db_path, trace)
+    core.start_reminders(lambda text: logger.info(FRIDAYPersonality.reminder_message(text)))
+    server = CommandServer(core, path)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server.bound and os.path.exists(path):
+            os.remove(path)
+        core.close()
+        logger.info("FRIDAY daemon stopped")
+
+
+# ==========================================================
+# UI EVENT BUS
+# ==========================================================
+class UIEventBus:
+    """Typed events from background threads, applied on the Tk thread.
+
+    `post(kind, *args)` is safe from any thread: it only appends to a
+    locked queue. The Tk thread drains the queue every `interval` ms from
+    its own after() loop, calling the handler registered for each kind; a
+    drain stops after `budget` seconds so a flood cannot stall the window.
+    Kinds registered with coalesce=True keep only their latest pending
+    event (status text, "results ready"), so a burst is applied once.
+    """
+
+    def __init__(self, root, interval=16, budget=0.008, window=1000):
+        self.root = root
+        self.interval = interval
+        self.budget = budget
+        self.posted = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self._handlers = {}  # kind -> (handler, coalesce)
+        self._queue = deque()  # (kind, args, posted_at); args None for coalesced kinds
+        self._latest = {}  # coalesced kind -> (args, posted_at)
+        self._latency = deque(maxlen=window)  # seconds from post to apply
+        self._running = False
+        self._lock = threading.Lock()
+
+    def on(self, kind, handler, coalesce=False):
+        self._handlers[kind] = (handler, coalesce)
+
+    def post(self, kind, *args):
+        now = time.perf_counter()
+        with self._lock:
+            self.posted += 1
+            if self._handlers[kind][1]:
+                if kind in self._latest:
+                    self.coalesced += 1
+                    self._latest[kind] = (args, self._latest[kind][1])
+                    return
+                self._latest[kind] = (args, now)
+                args = None
+            self._queue.append((kind, args, now))
+            self.max_depth = max(self.max_depth, len(self._queue))
+
+    def start(self):
+        """Begin draining; call on the Tk thread"""
+        self._running = True
+        self.root.after(self.interval, self._tick)
+
+    def stop(self):
+        self._running = False
+
+    def _tick(self):
+        if not self._running:
             return
-        self.is_listening = True
-        thread = threading.Thread(target=self._voice_listener_loop, args=(callback,), daemon=True)
-        thread.start()
+        self.drain()
+        self.root.after(self.interval, self._tick)
 
-    def stop_listening(self):
-        self.is_listening = False
+    def drain(self, chunk=64):
+        """Apply pending events on the calling (Tk) thread until the budget is spent"""
+        deadline = time.perf_counter() + self.budget
+        applied = 0
+        while True:
+            with self._lock:
+                batch = [self._queue.popleft() for _ in range(min(chunk, len(self._queue)))]
+                for i, (kind, args, posted_at) in enumerate(batch):
+                    if args is None:
+                        args, posted_at = self._latest.pop(kind)
+                        batch[i] = (kind, args, posted_at)
+            for kind, args, posted_at in batch:
+                self._latency.append(time.perf_counter() - posted_at)
+                try:
+                    self._handlers[kind][0](*args)
+                except Exception as e:
+                    logger.error(f"UI event {kind} failed: {e}", exc_info=True)
+            applied += len(batch)
+            if len(batch) < chunk or time.perf_counter() >= deadline:
+                break
+        self.applied += applied
+        return applied
 
-    def _voice_listener_loop(self, callback):
-        error_count = 0
-        while self.is_listening:
+    def stats(self):
+        with self._lock:
+            depth = len(self._queue)
+            latency = sorted(self._latency)
+        return {
+            "posted": self.posted, "applied": self.applied, "coalesced": self.coalesced,
+            "depth": depth, "max_depth": self.max_depth,
+            "apply_p50_ms": _percentile_ms(latency, 0.50),
+            "apply_p95_ms": _percentile_ms(latency, 0.95),
+            "apply_max_ms": _percentile_ms(latency, 1.0),
+        }
+
+
+# ==========================================================
+# STORAGE EXECUTOR
+# ==========================================================
+class StorageExecutor:
+    """Runs database work off the Tk thread and hands results back to it.
+
+    `submit` queues a call on a single worker thread, so storage work runs
+    in the order it was submitted, and returns its Future. Completion
+    callbacks are collected and passed to `post`, which must run its
+    argument on the UI thread; a burst of results costs one hop, not one
+    per result.
+
+    Work submitted with a `key` supersedes earlier work under that key:
+    if the older call has not started it is cancelled, otherwise its result
+    is dropped instead of delivered.
+    """
+
+    def __init__(self, post):
+        self.post = post
+        self.submitted = 0
+        self.cancelled = 0
+        self.stale = 0
+        self.batches = 0
+        self.max_batch = 0
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="friday-storage")
+        self._latest = {}  # key -> most recent future
+        self._ready = []  # (future, key, on_done, on_error) awaiting the UI thread
+        self._posted = False
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None):
+        """Run fn(*args) on the worker; on_done(result) or on_error(exc) on the UI thread"""
+        with self._lock:
+            future = self._pool.submit(fn, *args)
+            self.submitted += 1
+            if key is not None:
+                previous = self._latest.get(key)
+                self._latest[key] = future
+                if previous is not None and previous.cancel():
+                    self.cancelled += 1
+        future.add_done_callback(lambda f: self._finished(f, key, on_done, on_error))
+        return future
+
+    def _finished(self, future, key, on_done, on_error):
+        if future.cancelled():
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._ready.append((future, key, on_done, on_error))
+            if self._posted:
+                return
+            self._posted = True
+        self.post(self._deliver)
+
+    def _deliver(self):
+        """UI thread: run the callbacks of everything finished since the last batch"""
+        with self._lock:
+            batch, self._ready = self._ready, []
+            self._posted = False
+            current = []
+            for future, key, on_done, on_error in batch:
+                if key is not None:
+                    if self._latest.get(key) is not future:
+                        self.stale += 1
+                        continue
+                    del self._latest[key]
+                current.append((future, on_done, on_error))
+        self.batches += 1
+        self.max_batch = max(self.max_batch, len(batch))
+        for future, on_done, on_error in current:
+            error = future.exception()
             try:
-                if not self.microphone:
-                    error_count += 1
-                    if error_count >= 5:
-                        self.is_listening = False
-                        break
-                    time.sleep(2 ** error_count)
-                    continue
-                
-                success, result = self.listen()
-                if success:
-                    error_count = 0
-                    callback(result)
+                if error is None:
+                    if on_done:
+                        on_done(future.result())
+                elif on_error:
+                    on_error(error)
                 else:
-                    error_count += 1
-                
-                time.sleep(0.5)
+                    logger.error(f"Storage task failed: {error}")
             except Exception as e:
-                logger.error(f"Voice error: {e}")
-                error_count += 1
-                if error_count >= 5:
-                    self.is_listening = False
+                logger.error(f"Storage callback error: {e}", exc_info=True)
+
+    def join(self, timeout=None):
+        """Wait until everything submitted so far has run"""
+        self._pool.submit(lambda: None).result(timeout)
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._latest)
+        return {"submitted": self.submitted, "cancelled": self.cancelled, "stale": self.stale,
+                "batches": self.batches, "max_batch": self.max_batch, "pending_keys": pending}
+
+    def close(self):
+        """Finish queued work (writes included) without delivering further results"""
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=True)
 
 
 # ==========================================================
-# APPLICATION LAUNCHER
+# STARTUP TIMING
 # ==========================================================
-class ApplicationLauncher:
-    """Cross-platform app launcher"""
-    
-    APPS = {
-        "excel": {"Windows": "start excel", "Darwin": "/Applications/Microsoft Excel.app"},
-        "word": {"Windows": "start winword", "Darwin": "/Applications/Microsoft Word.app"},
-        "powerpoint": {"Windows": "start powerpnt", "Darwin": "/Applications/Microsoft PowerPoint.app"},
-        "outlook": {"Windows": "start outlook", "Darwin": "/Applications/Microsoft Outlook.app"},
-        "notepad": {"Windows": "notepad", "Darwin": "/Applications/TextEdit.app"},
-        "chrome": {"Windows": "start chrome", "Darwin": "/Applications/Google Chrome.app"},
-        "firefox": {"Windows": "start firefox", "Darwin": "/Applications/Firefox.app"},
-        "calculator": {"Windows": "calc", "Darwin": "/Applications/Calculator.app"},
-        "terminal": {"Windows": "start cmd", "Darwin": "/Applications/Utilities/Terminal.app"},
-    }
+class StartupTimer:
+    """Per-phase start-up timings, relative to process start.
 
-    @staticmethod
-    def launch(app_name):
-        sys_os = platform.system()
-        app_name = app_name.lower().strip()
+    Phases may overlap (background initialization), so each one records
+    when it started as well as how long it took.
+    """
+
+    def __init__(self, t0=STARTUP_T0):
+        self.t0 = t0
+        self.phases = {}  # name -> (start offset, duration) in seconds
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
         try:
-            if sys_os == "Windows":
-                cmd = ApplicationLauncher.APPS.get(app_name, {}).get("Windows")
-                if cmd:
-                    subprocess.Popen(cmd, shell=True)
-                    return True
-            elif sys_os == "Darwin":
-                app_path = ApplicationLauncher.APPS.get(app_name, {}).get("Darwin")
-                if app_path:
-                    if os.path.exists(app_path):
-                        subprocess.Popen(["open", app_path])
-                    else:
-                        subprocess.Popen(["open", "-a", app_path])
-                    return True
-            return False
-        except Exception:
-            return False
+            yield
+        finally:
+            self.record(name, start)
 
-    @staticmethod
-    def get_available_apps():
-        sys_os = platform.system()
-        return [app for app, paths in ApplicationLauncher.APPS.items() if paths.get(sys_os)]
+    def record(self, name, start, end=None):
+        end = time.perf_counter() if end is None else end
+        with self._lock:
+            self.phases[name] = (start - self.t0, end - start)
+
+    def as_dict(self):
+        with self._lock:
+            return {name: {"start_ms": round(start * 1000, 1), "duration_ms": round(duration * 1000, 1)}
+                    for name, (start, duration) in self.phases.items()}
+
+    def report(self):
+        with self._lock:
+            phases = sorted(self.phases.items(), key=lambda item: item[1][0])
+        lines = [f"  {name:<12} +{start * 1000:8.1f} ms  took {duration * 1000:8.1f} ms"
+                 for name, (start, duration) in phases]
+        total = max((start + duration for _, (start, duration) in phases), default=0.0)
+        lines.append(f"  {'ready':<12} +{total * 1000:8.1f} ms")
+        return "Startup timing:\n" + "\n".join(lines)
 
 
 # ==========================================================
@@ -428,14 +4327,30 @@ class ApplicationLauncher:
 # ==========================================================
 class FRIDAYApp:
     """Main application with Iron Man FRIDAY AI"""
+
+    NOTES_PAGE_SIZE = 100
+    UI_INTENTS = ("stop_listening", "add_note", "quit")  # intents handled on the Tk thread
     
-    def __init__(self):
-        self.db = Database()
-        self.voice = VoiceAssistant()
-        self.app_launcher = ApplicationLauncher()
-        self.voice_engine = VoiceEngine()
+    def __init__(self, startup_report=False, trace=None):
+        self.startup = StartupTimer()
+        self.startup.record("imports", STARTUP_T0)
+        self.startup_report = startup_report
+
+        with self.startup.phase("database"):
+            self.core = FridayCore(trace=trace, load_apps=False)
+        self.db = self.core.db
+        self.app_launcher = self.core.app_launcher
+        self.voice = VoiceAssistant(
+            preferences=self.db,
+            continuous=self.db.get_preference('continuous_listening', '1') == '1',
+            tracer=self.core.tracer,
+            wake_word=self.db.get_preference('wake_word', '0') == '1',
+            on_wake=lambda: self.events.post("status", "🟢 Yes, Sir?")
+        )
+        self.router = self.core.router
         self.listening = False
 
+        ui_start = time.perf_counter()
         self.root = Tk()
         self.root.title("FRIDAY - Iron Man AI Assistant")
         self.root.geometry("1300x850")
@@ -443,6 +4358,13 @@ class FRIDAYApp:
         self.root.config(bg=Theme.BACKGROUND)
         self.root.resizable(True, True)
 
+        # The only way background threads reach Tk: see UIEventBus
+        self.events = UIEventBus(self.root)
+        self._register_events()
+        for intent in self.UI_INTENTS:
+            self.router.on(intent, lambda intent=intent: self.events.post(intent))
+        self.router.on("start_listening", lambda: None)  # already listening
+
         # Fonts
         self.title_font = tkFont.Font(family="Segoe UI", size=28, weight="bold")
         self.subtitle_font = tkFont.Font(family="Segoe UI", size=14, weight="bold")
@@ -454,14 +4376,117 @@ class FRIDAYApp:
         self.volume_var = DoubleVar(self.root, value=1.0)
         self.startup_var = BooleanVar(self.root, value=False)
 
+        # Notes queries and writes run on the storage thread
+        self.storage = StorageExecutor(post=lambda deliver: self.events.post("storage", deliver))
+
+        # Notes paging state: (updated_at, id) of the last loaded row
+        self._notes_after = None
+        self._notes_exhausted = False
+        self._notes_page_pending = False
+
         self.setup_ui()
         self.load_preferences()
-        self.load_notes()
-        
-        # Welcome message
-        greeting = FRIDAYPersonality.get_random("startup")
-        self.log_friday(greeting)
-        self.voice_engine.speak_async(greeting)
+        self.events.start()
+        self.root.update_idletasks()
+        self.startup.record("ui", ui_start)
+
+        # Everything below finishes in the background; the status bar
+        # shows progress until all subsystems report in.
+        self._readiness = {"notes": None, "apps": None, "speech": None, "microphone": None}
+        self._greeting = FRIDAYPersonality.get_random("startup")
+        self._show_readiness()
+
+        speech_start = time.perf_counter()
+        self.voice_engine = VoiceEngine(
+            cache=SpeechCache(),
+            on_ready=lambda ok: self._subsystem_ready("speech", ok, speech_start),
+            preferences=self.db.preferences
+        )
+        self.voice_engine.speak_async(self._greeting)
+        self.voice_engine.prerender(FRIDAYPersonality.all_phrases(ApplicationLauncher.APPS))
+        self.core.start_reminders(self._announce_reminder)
+        threading.Thread(target=self._init_microphone, name="friday-mic-init", daemon=True).start()
+        self._init_notes()
+        self._init_apps()
+
+    def _register_events(self):
+        self.events.on("status", self._set_status, coalesce=True)
+        self.events.on("reply", self._reply)
+        self.events.on("announce", self._announce)
+        self.events.on("readiness", self._apply_readiness)
+        self.events.on("storage", lambda deliver: deliver(), coalesce=True)
+        for intent in self.UI_INTENTS:
+            self.events.on(intent, getattr(self, intent))
+
+    def _init_microphone(self):
+        start = time.perf_counter()
+        try:
+            self.voice.prepare()
+            ok = self.voice.microphone is not None
+        except Exception as e:
+            logger.error(f"Microphone initialization error: {e}")
+            ok = False
+        self._subsystem_ready("microphone", ok, start)
+
+    def _init_notes(self):
+        start = time.perf_counter()
+
+        def loaded(rows):
+            self._insert_notes_page(rows)
+            self._subsystem_ready("notes", True, start)
+
+        def failed(error):
+            logger.error(f"Notes load error: {error}")
+            self._notes_page_pending = False
+            self._subsystem_ready("notes", True, start)
+
+        self._notes_page_pending = True
+        self.storage.submit(self.db.list_notes, self.NOTES_PAGE_SIZE,
+                            on_done=loaded, on_error=failed, key="notes_page")
+
+    def _init_apps(self):
+        start = time.perf_counter()
+
+        def failed(error):
+            logger.error(f"Application index load error: {error}")
+            self._subsystem_ready("apps", False, start)
+
+        self.storage.submit(self.core.load_apps, on_done=lambda _: self._subsystem_ready("apps", True, start),
+                            on_error=failed)
+        self.storage.submit(self.db.app_launch_counts, list(self._quick_launch),
+                            on_done=self._order_quick_launch,
+                            on_error=lambda error: logger.error(f"Usage query error: {error}"))
+
+    def _order_quick_launch(self, launches):
+        """Most launched first; ties keep the default order"""
+        order = sorted(self._quick_launch, key=lambda app: -launches.get(app, 0))
+        for i, app in enumerate(order):
+            self._quick_launch[app].grid(row=i//4, column=i%4, padx=5, pady=5)
+
+    def _subsystem_ready(self, name, ok, start):
+        """Called from any thread when a deferred subsystem finished initializing"""
+        self.startup.record(name, start)
+        self.events.post("readiness", name, ok)
+
+    def _apply_readiness(self, name, ok):
+        self._readiness[name] = ok
+        self._show_readiness()
+        if all(state is not None for state in self._readiness.values()):
+            logger.info(self.startup.report())
+            if self.startup_report:
+                print(self.startup.report())
+                print(json.dumps(self.startup.as_dict()))
+                self.root.after(0, lambda: self.quit(farewell=False))
+
+    def _show_readiness(self):
+        if self.listening:
+            return
+        if all(state is not None for state in self._readiness.values()):
+            self.log_friday(self._greeting)
+            return
+        marks = {None: "…", True: "✓", False: "✗"}
+        parts = " | ".join(f"{name} {marks[state]}" for name, state in self._readiness.items())
+        self.status_var.set(f"🟡 Initializing | {parts}")
 
     def setup_ui(self):
         """Setup stunning Iron Man UI"""
@@ -539,6 +4564,23 @@ class FRIDAYApp:
         )
         apps_btn.pack(side="left", padx=5)
 
+        voice_settings = Frame(voice_inner, bg=Theme.SURFACE)
+        voice_settings.pack(fill="x", pady=(10, 0))
+
+        for label, variable, low, high, step in (
+            ("Rate", self.rate_var, 80, 300, 10),
+            ("Volume", self.volume_var, 0.0, 1.0, 0.05),
+        ):
+            Label(
+                voice_settings, text=label, font=self.body_font,
+                bg=Theme.SURFACE, fg=Theme.TEXT_SECONDARY
+            ).pack(side="left", padx=(5, 0))
+            Scale(
+                voice_settings, variable=variable, from_=low, to=high,
+                resolution=step, orient="horizontal", length=180,
+                bg=Theme.SURFACE, fg=Theme.TEXT_PRIMARY, highlightthickness=0, bd=0
+            ).pack(side="left", padx=(5, 15))
+
         self.status_var = StringVar(value="🔵 Standby | Ready for voice commands")
         status = Label(
             voice_inner,
@@ -579,7 +4621,8 @@ class FRIDAYApp:
             ("Terminal", "💻", "terminal"),
             ("Outlook", "📧", "outlook"),
         ]
-
+        # Reordered by launch count once _init_apps has read it
+        self._quick_launch = {}
         for i, (name, icon, app) in enumerate(apps):
             btn = Button(
                 app_btn_frame, text=f"{icon} {name}",
@@ -589,6 +4632,7 @@ class FRIDAYApp:
                 font=("Segoe UI", 9, "bold"), cursor="hand2"
             )
             btn.grid(row=i//4, column=i%4, padx=5, pady=5)
+            self._quick_launch[app] = btn
 
         # ===== NOTES SECTION =====
         notes_section = Frame(main, bg=Theme.SURFACE_LIGHTER, relief="raised", bd=2)
@@ -633,9 +4677,15 @@ class FRIDAYApp:
             font=("Segoe UI", 9, "bold"), cursor="hand2"
         ).pack(side="left", padx=5)
 
+        notes_table = Frame(notes_inner, bg=Theme.SURFACE_LIGHTER)
+        notes_table.pack(fill="both", expand=True)
+
+        notes_scroll = ttk.Scrollbar(notes_table, orient="vertical")
         self.notes_list = ttk.Treeview(
-            notes_inner, columns=("Title", "Created"), show="headings", height=5
+            notes_table, columns=("Title", "Created"), show="headings", height=5,
+            yscrollcommand=lambda first, last: self._on_notes_scroll(notes_scroll, first, last)
         )
+        notes_scroll.config(command=self.notes_list.yview)
         self.notes_list.heading("Title", text="Title")
         self.notes_list.heading("Created", text="Created")
         self.notes_list.column("Title", width=800)
@@ -648,7 +4698,8 @@ class FRIDAYApp:
         style.map('Treeview', background=[('selected', Theme.SURFACE)],
                  foreground=[('selected', Theme.PRIMARY)])
 
-        self.notes_list.pack(fill="both", expand=True)
+        notes_scroll.pack(side="right", fill="y")
+        self.notes_list.pack(side="left", fill="both", expand=True)
 
         # ===== FOOTER =====
         footer_divider = Canvas(main, height=2, bg=Theme.SURFACE_LIGHT, highlightthickness=0)
@@ -664,26 +4715,77 @@ class FRIDAYApp:
         footer.pack(anchor="e")
 
     def log_friday(self, message):
-        """Log FRIDAY message"""
+        """Log FRIDAY message (Tk thread)"""
         logger.info(f"FRIDAY: {message}")
         self.status_var.set(f"FRIDAY: {message}")
 
+    def _set_status(self, text):
+        self.status_var.set(text)
+
     def load_preferences(self):
         try:
             self.rate_var.set(int(self.db.get_preference('voice_rate', 150)))
             self.volume_var.set(float(self.db.get_preference('voice_volume', 1.0)))
         except Exception as e:
             logger.error(f"Preferences error: {e}")
+        # Slider moves update the preferences cache, which the voice engine
+        # follows; the database write is coalesced behind them.
+        self.rate_var.trace_add("write", lambda *_: self._save_preference('voice_rate', self.rate_var))
+        self.volume_var.trace_add("write", lambda *_: self._save_preference('voice_volume', self.volume_var))
+
+    def _save_preference(self, key, variable):
+        try:
+            self.db.set_preference(key, variable.get())
+        except TclError:
+            pass  # transiently invalid while being edited
+
+    def _load_notes_page(self):
+        """Request the next page of notes; it is appended when it arrives"""
+        if self._notes_exhausted:
+            self._notes_page_pending = False
+            return
+        self._notes_page_pending = True
+        self.storage.submit(self.db.list_notes, self.NOTES_PAGE_SIZE, self._notes_after,
+                            on_done=self._insert_notes_page, on_error=self._notes_page_failed,
+                            key="notes_page")
 
-    def load_notes(self):
-        self.notes_list.delete(*self.notes_list.get_children())
-        notes = self.db.search_notes("")
-        for note in notes:
+    def _notes_page_failed(self, error):
+        self._notes_page_pending = False
+        self._storage_error(error)
+
+    def _storage_error(self, error):
+        logger.error(f"Notes storage error: {error}")
+        messagebox.showerror("✗", str(error))
+
+    def _insert_notes_page(self, rows):
+        self._notes_page_pending = False
+        for note_id, title, created, updated in rows:
             try:
-                note_id, title, _, created = note
-                self.notes_list.insert("", "end", iid=str(note_id), values=(title, created))
+                if not self.notes_list.exists(str(note_id)):
+                    self.notes_list.insert("", "end", iid=str(note_id), values=(title, created))
             except Exception as e:
                 logger.error(f"Load note error: {e}")
+        if rows:
+            self._notes_after = (rows[-1][3], rows[-1][0])
+        self._notes_exhausted = len(rows) < self.NOTES_PAGE_SIZE
+
+    def _on_notes_scroll(self, scrollbar, first, last):
+        """Scroll callback: page more notes in as the view nears the end"""
+        scrollbar.set(first, last)
+        if float(last) > 0.9 and not (self._notes_exhausted or self._notes_page_pending):
+            self._notes_page_pending = True
+            self.root.after_idle(self._load_notes_page)
+
+    def _show_note(self, note):
+        """Insert or refresh a note row (as returned by get_note) at the top of the list"""
+        if not note:
+            return
+        iid = str(note[0])
+        if self.notes_list.exists(iid):
+            self.notes_list.item(iid, values=(note[1], note[3]))
+            self.notes_list.move(iid, "", 0)
+        else:
+            self.notes_list.insert("", 0, iid=iid, values=(note[1], note[3]))
 
     def add_note(self):
         title = simpledialog.askstring("New Note", "Enter title:")
@@ -692,9 +4794,13 @@ class FRIDAYApp:
         content = simpledialog.askstring("New Note", "Enter content:")
         if content is None:
             return
-        self.db.add_note(title, content)
-        self.load_notes()
-        msg = FRIDAYPersonality.get_random("note")
+        self.storage.submit(lambda: self.db.get_note(self.db.add_note(title, content)),
+                            on_done=lambda note: self._note_saved(note, "note"),
+                            on_error=self._storage_error)
+
+    def _note_saved(self, note, category):
+        self._show_note(note)
+        msg = FRIDAYPersonality.get_random(category)
         self.log_friday(msg)
         self.voice_engine.speak_async(msg)
 
@@ -703,55 +4809,51 @@ class FRIDAYApp:
         if not selected:
             messagebox.showwarning("⚠", "Please select a note")
             return
-        try:
-            note_id = int(selected[0])
-            note = self.db.get_note(note_id)
-            if not note:
-                return
-            title = simpledialog.askstring("Edit Note", "Title:", initialvalue=note[1])
-            if title is None:
-                return
-            content = simpledialog.askstring("Edit Note", "Content:", initialvalue=note[2])
-            if content is None:
-                return
+        # The body is not in the list; fetch it, then edit. A newer edit
+        # request supersedes one whose note is still loading.
+        self.storage.submit(self.db.get_note, int(selected[0]),
+                            on_done=self._edit_loaded_note, on_error=self._storage_error, key="edit_note")
+
+    def _edit_loaded_note(self, note):
+        if not note:
+            return
+        note_id = note[0]
+        title = simpledialog.askstring("Edit Note", "Title:", initialvalue=note[1])
+        if title is None:
+            return
+        content = simpledialog.askstring("Edit Note", "Content:", initialvalue=note[2])
+        if content is None:
+            return
+
+        def update():
             self.db.update_note(note_id, title, content)
-            self.load_notes()
-            msg = FRIDAYPersonality.get_random("success")
-            self.log_friday(msg)
-            self.voice_engine.speak_async(msg)
-        except Exception as e:
-            messagebox.showerror("✗", str(e))
+            return self.db.get_note(note_id)
+
+        self.storage.submit(update, on_done=lambda note: self._note_saved(note, "success"),
+                            on_error=self._storage_error)
 
     def delete_note(self):
         selected = self.notes_list.selection()
         if not selected:
             messagebox.showwarning("⚠", "Please select a note")
             return
-        try:
-            note_id = int(selected[0])
-            note = self.db.get_note(note_id)
-            if not note:
-                return
-            if messagebox.askyesno("Delete", f"Delete '{note[1]}'?"):
-                self.db.delete_note(note_id)
-                self.load_notes()
-                msg = FRIDAYPersonality.get_random("success")
-                self.log_friday(msg)
-                self.voice_engine.speak_async(msg)
-        except Exception as e:
-            messagebox.showerror("✗", str(e))
+        iid = selected[0]
+        title = self.notes_list.item(iid, "values")[0]
+        if messagebox.askyesno("Delete", f"Delete '{title}'?"):
+            self.storage.submit(self.db.delete_note, int(iid),
+                                on_done=lambda _: self._note_deleted(iid), on_error=self._storage_error)
+
+    def _note_deleted(self, iid):
+        if self.notes_list.exists(iid):
+            self.notes_list.delete(iid)
+        msg = FRIDAYPersonality.get_random("success")
+        self.log_friday(msg)
+        self.voice_engine.speak_async(msg)
 
     def launch_app(self, app_name):
-        success = self.app_launcher.launch(app_name)
-        if success:
-            msg = FRIDAYPersonality.app_launch_message(app_name)
-            self.log_friday(msg)
-            self.voice_engine.speak_async(msg)
-            self.db.add_command_history(f"open {app_name}", True)
-        else:
-            msg = FRIDAYPersonality.get_random("error")
-            self.log_friday(msg)
-            self.voice_engine.speak_async(msg)
+        msg = self.core.launch_app(app_name)["message"]
+        self.log_friday(msg)
+        self.voice_engine.speak_async(msg)
 
     def show_available_apps(self):
         available = self.app_launcher.get_available_apps()
@@ -761,15 +4863,20 @@ class FRIDAYApp:
         messagebox.showinfo("📋 Applications", f"Apps on {platform.system()}:\n\n{apps_list}")
 
     def start_listening(self):
+        if not self.voice.ready.is_set():
+            msg = "The microphone is still warming up, Sir."
+            self.log_friday(msg)
+            self.voice_engine.speak_async(msg, VoiceEngine.STATUS)
+            return
         if not self.voice.microphone:
             msg = "I'm afraid the microphone is not responding, Sir."
             self.log_friday(msg)
-            self.voice_engine.speak_async(msg)
+            self.voice_engine.speak_async(msg, VoiceEngine.URGENT)
             return
         self.listening = True
         msg = "Listening for commands, Sir."
         self.log_friday(msg)
-        self.voice_engine.speak_async(msg)
+        self.voice_engine.speak_async(msg, VoiceEngine.STATUS)
         self.voice.start_listening(self.on_voice_command)
         self.status_var.set("🔴 LISTENING...")
 
@@ -778,45 +4885,51 @@ class FRIDAYApp:
         self.voice.stop_listening()
         msg = "Listening stopped, Sir."
         self.log_friday(msg)
-        self.voice_engine.speak_async(msg)
+        self.voice_engine.speak_async(msg, VoiceEngine.STATUS)
         self.status_var.set("🔵 Standby")
 
     def on_voice_command(self, text):
         logger.info(f"Voice command: {text}")
-        text_lower = text.lower().strip()
 
+        trace = Trace.current()
         try:
-            if "open" in text_lower:
-                parts = text_lower.split("open", 1)
-                if len(parts) > 1:
-                    app_name = parts[1].strip().replace(" please", "").replace(" now", "").strip()
-                    if app_name in self.app_launcher.get_available_apps():
-                        self.root.after(0, lambda: self.launch_app(app_name))
-                    else:
-                        msg = f"I'm unable to locate {app_name}, Sir."
-                        self.root.after(0, lambda: (self.log_friday(msg), self.voice_engine.speak_async(msg)))
-
-            elif "add note" in text_lower or "new note" in text_lower:
-                self.root.after(0, lambda: self.add_note())
-
-            elif "stop" in text_lower or "exit" in text_lower or "quit" in text_lower:
-                self.root.after(0, lambda: self.quit())
-
+            msg = self.core.handle_command(text, trace).get("message")
+            if msg:
+                self.events.post("reply", msg, trace, time.perf_counter())
+                self.events.post("status", f"FRIDAY: {msg}")
             else:
-                msg = FRIDAYPersonality.get_random("witty")
-                self.root.after(0, lambda: (self.log_friday(msg), self.voice_engine.speak_async(msg)))
-
-            self.db.add_command_history(text, True)
+                trace.finish()
 
         except Exception as e:
             logger.error(f"Command error: {e}")
 
-    def quit(self):
-        msg = FRIDAYPersonality.get_random("farewell")
-        self.voice_engine.speak(msg)
+    def _announce_reminder(self, text):
+        """Reminder thread callback"""
+        self.events.post("announce", FRIDAYPersonality.reminder_message(text))
+
+    def _announce(self, msg):
+        self.log_friday(msg)
+        self.voice_engine.speak_async(msg)
+
+    def _reply(self, msg, trace, posted_at):
+        # Status text arrives as its own coalesced event
+        trace.mark("after_hop", posted_at)
+        logger.info(f"FRIDAY: {msg}")
+        self.voice_engine.speak_async(msg, trace=trace)
+
+    def quit(self, farewell=True):
+        if farewell:
+            msg = FRIDAYPersonality.get_random("farewell")
+            self.voice_engine.speak(msg, VoiceEngine.URGENT)
         try:
             self.voice.stop_listening()
-            self.db.close()
+            self.events.stop()
+            logger.info(f"UI event bus: {self.events.stats()}")
+            self.storage.close()
+            self.voice_engine.close()
+            if self.core.tracer.enabled:
+                logger.info(f"Voice pipeline latency:\n{self.core.tracer.report()}")
+            self.core.close()
         except Exception:
             pass
         logger.info("FRIDAY shutting down")
@@ -834,6 +4947,87 @@ class FRIDAYApp:
 # MAIN
 # ==========================================================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FRIDAY - Iron Man AI Assistant")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print per-phase startup timings once every subsystem is ready, then exit")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a window, serving the command API on a Unix socket")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="socket path for --headless/--send")
+    parser.add_argument("--send", metavar="TEXT", help="send a command to a running daemon and print the reply")
+    parser.add_argument("--trace", action="store_true", default=None,
+                        help="record per-stage latency of voice commands (or set the latency_tracing preference)")
+    parser.add_argument("--latency-stats", action="store_true",
+                        help="print per-stage latency percentiles of recent traced commands and exit")
+    parser.add_argument("--import-notes", metavar="PATH",
+                        help="import notes from a .jsonl file or a Markdown directory and exit")
+    parser.add_argument("--export-notes", metavar="PATH",
+                        help="export notes to a .jsonl file or a Markdown directory and exit")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted --export-notes instead of starting over")
+    parser.add_argument("--enroll-wake-word", action="store_true",
+                        help=f"record takes of the wake word for the template spotter ({WAKE_WORD_DIR}) and exit")
+    parser.add_argument("--takes", type=int, default=5, help="recordings to make with --enroll-wake-word")
+    parser.add_argument("--log-json", action="store_true", help="write the log as JSON lines")
+    parser.add_argument("--log-max-mb", type=float, default=5, help="rotate the log at this size")
+    parser.add_argument("--log-when", help="rotate on a schedule instead, e.g. 'midnight' or 'h'")
+    parser.add_argument("--log-backups", type=int, default=5, help="compressed rotated logs to keep")
+    args = parser.parse_args()
+    setup_logging(json_lines=args.log_json, max_bytes=int(args.log_max_mb * 2 ** 20),
+                  backups=args.log_backups, when=args.log_when)
+
+    if args.latency_stats:
+        db = Database()
+        tracer = LatencyTracer(enabled=True, window=1000)
+        for stages in db.get_latencies(1000):
+            for stage, ms in stages.items():
+                tracer.record(stage, ms / 1000)
+        print(tracer.report())
+        db.close()
+        sys.exit(0)
+
+    if args.import_notes or args.export_notes:
+        db = Database()
+        start = time.perf_counter()
+
+        def progress(count, fraction):
+            rate = count / max(time.perf_counter() - start, 1e-9)
+            print(f"\r  {count:,} notes  {fraction:6.1%}  {rate:,.0f} notes/s", end="", file=sys.stderr, flush=True)
+
+        try:
+            if args.import_notes:
+                count = import_notes_from(db, args.import_notes, progress)
+            else:
+                count = export_notes_to(db, args.export_notes, progress, resume=args.resume)
+        except KeyboardInterrupt:
+            print(f"\nInterrupted; run the same command again{'' if args.import_notes else ' with --resume'} "
+                  "to resume", file=sys.stderr)
+            sys.exit(130)
+        finally:
+            db.close()
+        print(f"\n{'Imported' if args.import_notes else 'Exported'} {count:,} notes "
+              f"in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+        sys.exit(0)
+
+    if args.send:
+        print(json.dumps(send_request("command", {"text": args.send}, args.socket), indent=2))
+        sys.exit(0)
+
+    if args.enroll_wake_word:
+        voice = VoiceAssistant(backends=[])
+        voice.prepare()
+        if not voice.microphone:
+            print("No microphone found", file=sys.stderr)
+            sys.exit(1)
+        try:
+            paths = enroll_wake_word(voice.capture, args.takes, prompt=lambda take, count: print(
+                f'Say "{WAKE_WORD}" on its own ({take}/{count})...', file=sys.stderr))
+        except (RuntimeError, ValueError) as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        print(f"Recorded {len(paths)} takes in {WAKE_WORD_DIR}; enable the wake_word preference to use them",
+              file=sys.stderr)
+        sys.exit(0)
+
     logger.info("=" * 70)
     logger.info("F.R.I.D.A.Y 0.1 EDITION")
     logger.info(f"Platform: {platform.system()} | Python: {platform.python_version()}")
@@ -841,8 +5035,11 @@ if __name__ == "__main__":
     logger.info("=" * 70)
     
     try:
-        app = FRIDAYApp()
-        app.run()
+        if args.headless:
+            run_headless(args.socket, trace=args.trace)
+        else:
+            app = FRIDAYApp(startup_report=args.startup_report, trace=args.trace)
+            app.run()
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
         sys.exit(1)
@@ -0,0 +1,26 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from friday import Database  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh Database in a temporary directory"""
+    database = Database(str(tmp_path / "friday.db"), write_policy="block")
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """Path to a copy of the friday.db shipped in the repo, which predates schema versioning"""
+    path = str(tmp_path / "legacy.db")
+    shutil.copy(os.path.join(ROOT, "friday.db"), path)
+    return path
@@ -0,0 +1,242 @@
+"""Test stand-ins: Tk and slow storage for driving FRIDAYApp, a synthetic voice for the wake word"""
+import audioop
+import heapq
+import itertools
+import math
+import queue
+import random
+import struct
+import time
+import wave
+
+from friday import FRIDAYApp, RecognizerBackend, UIEventBus
+
+
+class FakeTree:
+    """The slice of ttk.Treeview the notes list uses"""
+
+    def __init__(self):
+        self.rows = {}
+        self.selected = ()
+
+    def get_children(self):
+        return tuple(self.rows)
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.rows.pop(iid, None)
+
+    def exists(self, iid):
+        return iid in self.rows
+
+    def insert(self, parent, index, iid, values):
+        self.rows[iid] = values
+
+    def item(self, iid, option=None, values=None):
+        if values is not None:
+            self.rows[iid] = values
+        return self.rows[iid] if option == "values" else {"values": self.rows[iid]}
+
+    def move(self, iid, parent, index):
+        pass
+
+    def selection(self):
+        return self.selected
+
+
+class FakeVar:
+    def set(self, value):
+        self.value = value
+
+
+class SilentVoice:
+    def speak_async(self, text, *args, **kwargs):
+        pass
+
+
+class TickRoot:
+    """A single-threaded main loop with Tk's after() contract.
+
+    after() may be called from any thread; callbacks run on the thread
+    inside run(), which records how long each one holds the loop.
+    """
+
+    def __init__(self):
+        self.stalls = []  # seconds per callback
+        self._incoming = queue.Queue()
+        self._timers = []
+        self._seq = itertools.count()
+
+    def after(self, ms, fn=None, *args):
+        if fn:
+            self._incoming.put((time.perf_counter() + ms / 1000, next(self._seq), fn, args))
+
+    def after_idle(self, fn, *args):
+        self.after(0, fn, *args)
+
+    def run(self, done, timeout=30, poll=0.005):
+        deadline = time.perf_counter() + timeout
+        while not done() and time.perf_counter() < deadline:
+            try:
+                heapq.heappush(self._timers, self._incoming.get(timeout=poll))
+                while True:
+                    heapq.heappush(self._timers, self._incoming.get_nowait())
+            except queue.Empty:
+                pass
+            while self._timers and self._timers[0][0] <= time.perf_counter():
+                _, _, fn, args = heapq.heappop(self._timers)
+                start = time.perf_counter()
+                fn(*args)
+                self.stalls.append(time.perf_counter() - start)
+
+
+class InlineStorage:
+    """StorageExecutor's interface, but the work runs on the caller"""
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None):
+        try:
+            result = fn(*args)
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(e)
+            return
+        if on_done:
+            on_done(result)
+
+    def close(self):
+        pass
+
+
+class SlowDisk:
+    """Database proxy adding a fixed latency to every notes call"""
+
+    CALLS = {"list_notes", "get_note", "add_note", "update_note", "delete_note"}
+
+    def __init__(self, db, latency):
+        self.db = db
+        self.latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self.db, name)
+        if name not in self.CALLS:
+            return attr
+
+        def slow(*args, **kwargs):
+            time.sleep(self.latency)
+            return attr(*args, **kwargs)
+        return slow
+
+
+def headless_app(db, root, storage=None):
+    """A FRIDAYApp over `db` whose widgets are fakes and whose Tk loop is `root`"""
+    app = FRIDAYApp.__new__(FRIDAYApp)
+    app.db, app.root = db, root
+    app.status_var = FakeVar()
+    app.notes_list = FakeTree()
+    app.voice_engine = SilentVoice()
+    app.events = UIEventBus(root)
+    app._register_events()
+    app.storage = storage
+    app._notes_after = None
+    app._notes_exhausted = False
+    app._notes_page_pending = False
+    return app
+
+
+# Formants (F1, F2) of the synthetic vowels and the consonant kinds used by
+# the wake-word fixtures: (kind, seconds, relative level)
+VOWELS = {"a": (750, 1200), "i": (300, 2300), "e": (450, 1900), "o": (500, 900), "u": (320, 800), "ae": (660, 1700)}
+CONSONANTS = {"f": ("hiss", 0.09, 0.35), "s": ("hiss", 0.12, 0.6), "d": ("burst", 0.03, 1.0),
+              "t": ("burst", 0.04, 1.2), "m": ("hum", 0.07, 0.5), "r": ("hum", 0.06, 0.8), "": None}
+# A word is [(consonant, vowels gliding within the syllable, vowel seconds)]
+FRIDAY_WORD = [("f", ["a", "i"], 0.20), ("d", ["e", "i"], 0.22)]
+
+
+class Voice:
+    """Crude formant synthesizer for wake-word fixtures (16 kHz, 16-bit)"""
+
+    RATE = 16000
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        noise = random.Random(1)
+        self._noise = struct.pack(f"<{self.RATE * 16}h", *(int(noise.gauss(0, 1000)) for _ in range(self.RATE * 16)))
+
+    def noise(self, seconds, level):
+        n = round(seconds * self.RATE)
+        start = self.rng.randrange(0, len(self._noise) // 2 - n) * 2
+        return audioop.mul(self._noise[start:start + 2 * n], 2, level / 1000)
+
+    def _period(self, f0, f1, f2, level):
+        """One pitch period of a vowel: harmonics of f0 shaped by two formants"""
+        harmonics = [(k * f0, 1 / (1 + ((k * f0 - f1) / 120) ** 2) + 0.6 / (1 + ((k * f0 - f2) / 160) ** 2))
+                     for k in range(1, int(3800 / f0))]
+        period = [sum(a * math.sin(2 * math.pi * f * i / self.RATE) for f, a in harmonics)
+                  for i in range(int(self.RATE / f0))]
+        peak = max(abs(v) for v in period) or 1.0
+        return struct.pack(f"<{len(period)}h", *(int(level * v / peak) for v in period))
+
+    def _repeat(self, period, seconds):
+        size = 2 * int(seconds * self.RATE)
+        return (period * (size // len(period) + 1))[:size]
+
+    def word(self, syllables, stretch, f0, level):
+        out = b""
+        for consonant, vowels, seconds in syllables:
+            if CONSONANTS.get(consonant):
+                kind, length, gain = CONSONANTS[consonant]
+                if kind == "hiss":  # differenced noise: mostly high frequencies
+                    hiss = self.noise(length * stretch + 0.001, level * gain)
+                    out += audioop.add(hiss[2:], audioop.mul(hiss[:-2], 2, -1), 2)
+                elif kind == "burst":
+                    out += self.noise(length * stretch, level * gain * 0.8)
+                else:
+                    out += self._repeat(self._period(120, 250, 1000, level * gain), length * stretch)
+            for vowel in vowels:
+                f1, f2 = VOWELS[vowel]
+                out += self._repeat(self._period(f0 * self.rng.uniform(0.95, 1.05), f1 * self.rng.uniform(0.93, 1.07),
+                                                 f2 * self.rng.uniform(0.93, 1.07), level),
+                                    seconds * stretch / len(vowels))
+        return out
+
+    def babble_word(self):
+        while True:
+            syllables = []
+            for _ in range(self.rng.choice([1, 1, 2, 2, 3])):
+                vowels = [self.rng.choice(list(VOWELS)) for _ in range(self.rng.choice([1, 2]))]
+                syllables.append((self.rng.choice(list(CONSONANTS)), vowels, self.rng.uniform(0.1, 0.25)))
+            if syllables != FRIDAY_WORD:
+                return syllables
+
+    def utterance(self, words, snr_db):
+        """Words from one random speaker with background noise at `snr_db`"""
+        rng = self.rng
+        stretch, f0 = rng.uniform(0.85, 1.15), rng.uniform(100, 200)
+        level = 8000 * 10 ** (rng.uniform(-6, 3) / 20)
+        audio = self.noise(rng.uniform(0.9, 1.1), 1)
+        for word in words:
+            audio += self.word(word, stretch, f0, level) + self.noise(rng.uniform(0.03, 0.12), 1)
+        audio += self.noise(1.0, 1)
+        return audioop.add(audio, self.noise(len(audio) / 2 / self.RATE, level / 10 ** (snr_db / 20)), 2)
+
+    def write(self, path, data):
+        with wave.open(path, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(self.RATE)
+            out.writeframes(data)
+
+
+class CountingBackend(RecognizerBackend):
+    """Recognizer stand-in that counts the utterances it is asked to recognize"""
+
+    name = "counting"
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def recognize(self, audio):
+        self.calls += 1
+        return "heard"
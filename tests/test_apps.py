@@ -0,0 +1,106 @@
+import os
+import platform
+import time
+
+import pytest
+
+from friday import AppIndex, ApplicationLauncher, FridayCore
+
+
+def write_executable(directory, name, body="exit 0"):
+    path = directory / name
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+class RecordingSupervisor:
+    def __init__(self):
+        self.spawned = []
+
+    def running(self, name):
+        return None
+
+    def spawn(self, name, argv):
+        self.spawned.append(argv)
+
+
+@pytest.fixture
+def linux_dirs(tmp_path, monkeypatch):
+    data = tmp_path / "share"
+    (data / "applications").mkdir(parents=True)
+    (data / "applications" / "gedit.desktop").write_text(
+        "[Desktop Entry]\nType=Application\nName=Text Editor\nExec=gedit %U\n")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    write_executable(bin_dir, "reboot")
+    write_executable(bin_dir, "gedit")
+    monkeypatch.setenv("XDG_DATA_HOME", str(data))
+    monkeypatch.setenv("XDG_DATA_DIRS", str(data))
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ["PATH"])
+    return tmp_path
+
+
+def test_scan_indexes_desktop_entries_only(db, linux_dirs):
+    index = AppIndex(db, system="Linux")
+    index.refresh(force=True)
+    assert index.get("text editor") == (AppIndex.DESKTOP, "gedit")
+    assert index.lookup("gedit") == "text editor"
+    assert index.get("reboot") is None
+    assert index.lookup("reboot") is None
+    assert str(linux_dirs / "bin") not in index.source_dirs()
+
+
+def test_executables_cached_by_older_builds_are_ignored(db):
+    db.replace_applications([("reboot", "/usr/sbin/reboot", AppIndex.EXECUTABLE),
+                             ("firefox", "firefox %u", AppIndex.DESKTOP)])
+    index = AppIndex(db, system="Linux")
+    index.load()
+    assert index.lookup("reboot") is None
+    assert index.gui_apps() == ["firefox"]
+
+
+def test_launch_refuses_bare_executables(db, linux_dirs):
+    index = AppIndex(db, system="Linux")
+    index.refresh(force=True)
+    # As an index written before executables were excluded would hold it
+    index.entries["reboot"] = (AppIndex.EXECUTABLE, "/usr/sbin/reboot")
+    supervisor = RecordingSupervisor()
+    launcher = ApplicationLauncher(index, supervisor)
+    launcher.SYSTEM = "Linux"
+
+    assert launcher.launch("reboot") is False
+    assert launcher.launch("text editor") == ApplicationLauncher.LAUNCHED
+    assert supervisor.spawned == [["gedit"]]
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="stand-in executables and /proc need Linux")
+def test_launch_supervises_a_stand_in_app(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    quit_flag = tmp_path / "quit"
+    write_executable(bin_dir, ApplicationLauncher.APPS["excel"]["Linux"],
+                     f'while [ ! -e "{quit_flag}" ]; do sleep 0.02; done')
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ["PATH"])
+    core = FridayCore(str(tmp_path / "launch.db"))
+    try:
+        assert core.handle_command("open excel")["ok"]
+        supervisor = core.app_launcher.supervisor
+        proc = supervisor.running("excel")
+        assert proc is not None
+        with open(f"/proc/{proc.pid}/cmdline", "rb") as f:
+            argv = f.read().split(b"\0")
+        assert os.path.basename(argv[1].decode()) == "localc"  # no sh -c in between
+
+        assert core.handle_command("open excel").get("running")
+        assert supervisor.spawned == 1
+
+        quit_flag.touch()
+        deadline = time.monotonic() + 5
+        while supervisor.reaped < 1:
+            assert time.monotonic() < deadline, "stand-in was not reaped"
+            time.sleep(0.01)
+        assert proc.poll() is not None
+        assert supervisor.running("excel") is None
+    finally:
+        core.close()
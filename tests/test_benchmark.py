@@ -0,0 +1,26 @@
+import json
+
+from benchmark import bench_regress, compare_results
+
+
+def test_regress_skips_the_comparison_without_a_baseline(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    baseline = tmp_path / "baseline.json"
+    assert bench_regress([100], baseline_path=str(baseline))
+    assert "SKIP: no baseline" in capsys.readouterr().out
+    assert bench_regress([100], baseline_path=str(baseline), save_baseline=True)
+    # Timing noise between two runs is far below 100x
+    assert bench_regress([100], baseline_path=str(baseline), tolerance=100)
+
+
+def test_regress_fails_against_a_baseline_without_these_cases(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": {"some other case": {"median_ms": 1.0}}}))
+    assert not bench_regress([100], baseline_path=str(baseline))
+
+
+def test_compare_results_flags_slowdowns_above_the_noise_floor():
+    baseline = {"fast": {"median_ms": 0.01}, "slow": {"median_ms": 10.0}, "gone": {"median_ms": 1.0}}
+    results = {"fast": {"median_ms": 0.05}, "slow": {"median_ms": 16.0}, "new": {"median_ms": 5.0}}
+    assert compare_results(results, baseline, tolerance=1.5) == [("slow", 10.0, 16.0)]
@@ -0,0 +1,102 @@
+import math
+import random
+import struct
+import wave
+
+from friday import ContinuousListener, VoiceAssistant, WavFileSource
+
+RATE = 16000
+NOISE_RMS = 60
+
+
+def write_wav(path, bursts, gap=1.2, seed=3):
+    """Noise with 300 Hz tone bursts of the given lengths; returns burst sample ranges"""
+    rng = random.Random(seed)
+    samples, ranges = [], []
+    for seconds in bursts:
+        samples += [int(rng.gauss(0, NOISE_RMS)) for _ in range(int(gap * RATE))]
+        start = len(samples)
+        samples += [int(4000 * math.sin(2 * math.pi * 300 * i / RATE)) for i in range(int(seconds * RATE))]
+        ranges.append((start, len(samples)))
+    samples += [int(rng.gauss(0, NOISE_RMS)) for _ in range(int(gap * RATE))]
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(RATE)
+        out.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+    return samples, ranges
+
+
+def loud(samples):
+    return sum(abs(s) > 1000 for s in samples)
+
+
+def segment(path, **kwargs):
+    utterances = []
+    listener = ContinuousListener(WavFileSource(str(path)), utterances.append, **kwargs)
+    listener.start()
+    listener.wait(10)
+    return listener, utterances
+
+
+def test_one_utterance_per_burst_with_nothing_lost(tmp_path):
+    bursts = [0.5, 1.0, 1.5]
+    samples, ranges = write_wav(tmp_path / "mic.wav", bursts)
+    listener, utterances = segment(tmp_path / "mic.wav")
+    assert len(utterances) == listener.utterances == len(bursts)
+    for audio, seconds in zip(utterances, bursts):
+        pcm = struct.unpack(f"<{len(audio.frame_data) // 2}h", audio.frame_data)
+        duration = len(pcm) / RATE
+        # pre-roll + the burst + the closing pause, at chunk granularity
+        assert seconds + 0.8 <= duration <= seconds + 0.3 + 0.8 + 0.2
+        assert loud(pcm[:int(0.25 * RATE)]) == 0  # starts in the pre-roll, before the onset
+    # Every sample of every burst was captured exactly once
+    assert sum(loud(struct.unpack(f"<{len(a.frame_data) // 2}h", a.frame_data)) for a in utterances) == \
+        sum(loud(samples[start:end]) for start, end in ranges)
+
+
+def test_noise_floor_is_learned_and_carried_over(tmp_path):
+    write_wav(tmp_path / "first.wav", [0.6, 0.6])
+    floors = []
+    listener, _ = segment(tmp_path / "first.wav", on_noise_floor=floors.append)
+    assert floors and floors[-1] == listener.noise_floor
+    assert NOISE_RMS * 0.7 < listener.noise_floor < NOISE_RMS * 1.3  # noise, not speech
+
+    # Seeded with the learned floor, the next session detects its first
+    # burst right away, without relearning
+    write_wav(tmp_path / "second.wav", [0.6], gap=0.1, seed=4)
+    _, utterances = segment(tmp_path / "second.wav", noise_floor=listener.noise_floor)
+    assert len(utterances) == 1
+    _, deafened = segment(tmp_path / "second.wav", noise_floor=4000.0)  # the seed is what is used
+    assert deafened == []
+
+
+def test_voice_assistant_persists_the_noise_floor(tmp_path, db):
+    write_wav(tmp_path / "mic.wav", [0.6])
+    db.set_preference("noise_floor", 55.0)
+    voice = VoiceAssistant(preferences=db, continuous=True, source=WavFileSource(str(tmp_path / "mic.wav")),
+                           backends=[])
+    voice.start_listening(lambda text: None)
+    voice._capture.wait(10)
+    assert NOISE_RMS * 0.7 < float(db.get_preference("noise_floor")) < NOISE_RMS * 1.3
+
+
+def test_listening_stops_when_capture_dies(tmp_path):
+    write_wav(tmp_path / "mic.wav", [0.3])
+    voice = VoiceAssistant(continuous=True, source=WavFileSource(str(tmp_path / "mic.wav")), backends=[])
+    voice.start_listening(lambda text: None)
+    voice._capture.wait(10)  # a file source ends like a microphone that was unplugged
+    assert not voice.is_listening
+    voice.stop_listening()
+
+
+def test_noise_floor_is_saved_periodically_while_the_room_is_quiet(tmp_path):
+    write_wav(tmp_path / "quiet.wav", [])
+    saved = []
+    listener = ContinuousListener(WavFileSource(str(tmp_path / "quiet.wav")), lambda audio: None,
+                                  on_noise_floor=lambda floor: saved.append(listener.running),
+                                  persist_interval=0)
+    listener.start()
+    listener.wait(10)
+    assert listener.utterances == 0
+    assert saved.count(True) > 1  # during capture, not only the final save at exit
@@ -0,0 +1,47 @@
+import pytest
+
+from friday import ApplicationLauncher, FridayCore
+
+
+@pytest.fixture
+def core(tmp_path):
+    core = FridayCore(str(tmp_path / "core.db"))
+    launched = []
+    core.app_launcher.is_available = lambda name: True
+    core.app_launcher.launch = lambda name: launched.append(name) or ApplicationLauncher.LAUNCHED
+    core.launched = launched
+    yield core
+    core.close()
+
+
+def history(core):
+    core.db.flush()
+    return [command for (command,) in core.db.conn.execute("SELECT command FROM command_history ORDER BY id")]
+
+
+def test_voice_and_button_launches_count_once_each(core):
+    assert core.handle_command("open chrome")["ok"]
+    assert core.launch_app("chrome")["ok"]  # the Chrome button
+    assert core.handle_command("open google chrome please")["ok"]
+
+    assert core.launched == ["chrome"] * 3
+    assert history(core) == ["open chrome", "open google chrome please"]
+    assert core.db.app_launch_counts(["chrome", "excel"]) == {"chrome": 3}
+
+
+def test_compound_launch_counts_each_app(core):
+    core.handle_command("open excel and word")
+    core.db.flush()
+    assert core.db.app_launch_counts(["excel", "word"]) == {"excel": 1, "word": 1}
+
+
+def test_failed_launch_lowers_the_success_rate(core):
+    assert core.handle_command("open chrome")["ok"]
+    core.app_launcher.is_available = lambda name: False  # uninstalled since
+    assert not core.handle_command("open chrome")["ok"]
+    assert not core.handle_command("open flibbertigibbet")["ok"]
+    core.db.flush()
+
+    usage = {command: rate for command, count, rate in core.db.command_usage()}
+    assert usage == {"open chrome": 0.5, "open flibbertigibbet": 0.0}
+    assert core.db.app_launch_counts(["chrome"]) == {"chrome": 1}
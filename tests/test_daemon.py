@@ -0,0 +1,89 @@
+import asyncio
+import os
+import socket
+import tempfile
+
+import pytest
+
+from friday import DEFAULT_SOCKET, CommandServer, FridayCore, send_request
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def core(tmp_path):
+    core = FridayCore(str(tmp_path / "daemon.db"))
+    yield core
+    core.close()
+
+
+@pytest.fixture
+def sock_path(tmp_path):
+    return str(tmp_path / "friday.sock")
+
+
+def test_second_daemon_refuses_to_start(core, sock_path):
+    async def scenario():
+        first = CommandServer(core, sock_path)
+        await first.start()
+        second = CommandServer(core, sock_path)
+        with pytest.raises(RuntimeError, match="already running"):
+            await second.start()
+        await second.close()
+        # The live daemon's socket is untouched and still answers
+        reply = await asyncio.get_running_loop().run_in_executor(None, send_request, "ping", {}, sock_path)
+        await first.close()
+        return reply
+
+    assert asyncio.run(scenario()) == "pong"
+
+
+def test_stale_socket_is_replaced(core, sock_path):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(sock_path)
+    stale.close()  # leaves the file behind with nobody listening
+
+    async def scenario():
+        server = CommandServer(core, sock_path)
+        await server.start()
+        reply = await asyncio.get_running_loop().run_in_executor(None, send_request, "ping", {}, sock_path)
+        await server.close()
+        return reply
+
+    assert asyncio.run(scenario()) == "pong"
+
+
+def test_socket_is_private_from_the_start(core, sock_path, monkeypatch):
+    modes = []
+    real_bind = socket.socket.bind
+
+    def bind(sock, address):
+        real_bind(sock, address)
+        modes.append(os.stat(os.path.dirname(address)).st_mode & 0o777)
+
+    monkeypatch.setattr(socket.socket, "bind", bind)
+
+    async def scenario():
+        server = CommandServer(core, sock_path)
+        await server.start()
+        mode = os.stat(sock_path).st_mode & 0o777
+        await server.close()
+        return mode
+
+    assert asyncio.run(scenario()) == 0o600
+    assert modes == [0o700]  # bound where nobody else could reach it yet
+    assert not any(name.startswith(".friday-") for name in os.listdir(os.path.dirname(sock_path)))
+
+
+def test_refuses_a_directory_others_can_write_to(core, tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o1777)
+    server = CommandServer(core, str(shared / "friday.sock"))
+    with pytest.raises(RuntimeError, match="writable by nobody else"):
+        asyncio.run(server.start())
+    assert not os.path.exists(shared / "friday.sock")
+
+
+def test_default_socket_is_not_in_the_shared_temp_dir():
+    assert os.path.dirname(DEFAULT_SOCKET) != tempfile.gettempdir()
@@ -0,0 +1,57 @@
+import random
+import threading
+
+
+def test_concurrent_access_loses_nothing(db):
+    """Many threads mixing notes, searches, history and preferences"""
+    threads, ops = 12, 200
+    errors = []
+    kept = [0] * threads
+    sent = [0] * threads
+    barrier = threading.Barrier(threads)
+
+    def worker(n):
+        rng = random.Random(n)
+        barrier.wait()
+        try:
+            for i in range(ops):
+                roll = rng.random()
+                if roll < 0.3:
+                    note_id = db.add_note(f"worker {n} note {i}", f"reactor suit {n} {i}")
+                    if rng.random() < 0.2:
+                        db.update_note(note_id, f"worker {n} edited {i}", f"repulsor {n} {i}")
+                    if rng.random() < 0.1:
+                        db.delete_note(note_id)
+                    else:
+                        kept[n] += 1
+                elif roll < 0.6:
+                    db.search_notes(rng.choice(["reactor", "suit", "repulsor", "worker"]))
+                elif roll < 0.9:
+                    db.add_command_history(f"worker {n} command {i}")
+                    sent[n] += 1
+                else:
+                    db.set_preference(f"pref_{n}", i)
+                    assert db.get_preference(f"pref_{n}") == str(i)
+        except Exception as e:  # reported below, a thread cannot fail the test itself
+            errors.append(f"worker {n}: {e!r}")
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    db.flush()
+
+    assert errors == []
+    assert db.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == sum(kept)
+    assert db.conn.execute("SELECT COUNT(*) FROM command_history").fetchone()[0] == sum(sent)
+    if db.has_fts:
+        assert db.conn.execute("SELECT COUNT(*) FROM notes_fts").fetchone()[0] == sum(kept)
+
+
+def test_each_thread_gets_its_own_connection(db):
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(db.conn))
+    thread.start()
+    thread.join()
+    assert seen[0] is not db.conn
@@ -0,0 +1,64 @@
+import threading
+
+from friday import UIEventBus
+
+
+class Root:
+    def after(self, ms, fn=None, *args):
+        pass
+
+
+def test_coalesced_kind_applies_only_the_latest_event():
+    bus = UIEventBus(Root())
+    applied = []
+    bus.on("status", lambda text: applied.append(("status", text)), coalesce=True)
+    bus.on("reply", lambda text: applied.append(("reply", text)))
+
+    bus.post("status", "listening")
+    bus.post("reply", "first")
+    bus.post("status", "thinking")
+    bus.post("reply", "second")
+    bus.post("status", "ready")
+    assert bus.drain() == 3
+
+    # The status keeps its place in the queue but carries the newest text
+    assert applied == [("status", "ready"), ("reply", "first"), ("reply", "second")]
+    assert bus.stats()["coalesced"] == 2
+    bus.post("status", "idle")
+    bus.drain()
+    assert applied[-1] == ("status", "idle")
+
+
+def test_posts_from_many_threads_arrive_in_order_per_thread():
+    bus = UIEventBus(Root(), budget=10)
+    seen = {}
+    bus.on("reply", lambda thread, n: seen.setdefault(thread, []).append(n))
+    threads = [threading.Thread(target=lambda t=t: [bus.post("reply", t, n) for n in range(500)]) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    while bus.drain():
+        pass
+    assert seen == {t: list(range(500)) for t in range(4)}
+    assert bus.stats()["posted"] == bus.stats()["applied"] == 2000
+
+
+def test_a_failing_handler_does_not_stop_the_drain():
+    bus = UIEventBus(Root())
+    applied = []
+    bus.on("boom", lambda: 1 / 0)
+    bus.on("reply", applied.append)
+    bus.post("boom")
+    bus.post("reply", "still delivered")
+    bus.drain()
+    assert applied == ["still delivered"]
+
+
+def test_drain_stops_at_its_budget():
+    bus = UIEventBus(Root(), budget=0)
+    bus.on("reply", lambda n: None)
+    for n in range(1000):
+        bus.post("reply", n)
+    assert bus.drain(chunk=64) == 64  # one chunk, then the budget is spent
+    assert bus.stats()["depth"] == 936
@@ -0,0 +1,51 @@
+import gzip
+import json
+import logging
+import logging.handlers
+
+import pytest
+
+from friday import setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def root_logger():
+    """Put the root logger back the way pytest configured it"""
+    root, friday_logger = logging.getLogger(), logging.getLogger("friday")
+    handlers, level, friday_level = root.handlers[:], root.level, friday_logger.level
+    friday_logger.setLevel(logging.NOTSET)  # some benchmark helpers quieten it
+    yield root
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    friday_logger.setLevel(friday_level)
+
+
+def test_rotated_logs_are_gzipped_and_pruned(tmp_path, root_logger):
+    path = tmp_path / "friday.log"
+    setup_logging(str(path), json_lines=True, max_bytes=16 * 1024, backups=2, console=False)
+    for i in range(2000):
+        logging.getLogger("friday").info(f"FRIDAY: status update {i} " + "x" * 40)
+    shutdown_logging()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["friday.log", "friday.log.1.gz", "friday.log.2.gz"]
+    with gzip.open(tmp_path / "friday.log.1.gz", "rt") as f:
+        lines = f.read().splitlines()
+    lines += path.read_text().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert records[-1]["message"] == "FRIDAY: status update 1999 " + "x" * 40
+    assert records[-1]["level"] == "INFO" and records[-1]["logger"] == "friday"
+    assert len(records) < 2000  # the oldest rotations were deleted
+
+
+def test_console_only_logging_writes_no_file(tmp_path, monkeypatch, root_logger):
+    monkeypatch.chdir(tmp_path)
+    setup_logging(None, console=False)
+    logging.getLogger("friday").warning("nothing on disk")
+    shutdown_logging()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_importing_friday_does_not_configure_logging():
+    import friday  # noqa: F401  # already imported by the test modules
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in logging.getLogger().handlers)
@@ -0,0 +1,42 @@
+import sqlite3
+
+from friday import MIGRATIONS, Database
+
+
+def rows(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_legacy_history_responses_survive_the_upgrade(legacy_db):
+    commands = rows(legacy_db, "SELECT command FROM command_history ORDER BY id")
+    history = rows(legacy_db, "SELECT input, response FROM history ORDER BY timestamp, id")
+    assert history  # the shipped database has some
+
+    db = Database(legacy_db)
+    try:
+        assert db.conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    finally:
+        db.close()
+
+    assert rows(legacy_db, "SELECT command FROM command_history ORDER BY id") == \
+        commands + [(command,) for command, _ in history]
+    assert rows(legacy_db, "SELECT input, response FROM history_legacy ORDER BY timestamp, id") == history
+
+
+def test_app_launch_counts_are_seeded_from_history(legacy_db):
+    conn = sqlite3.connect(legacy_db)
+    with conn:
+        conn.executemany("INSERT INTO command_history (command, success) VALUES (?, ?)",
+                         [("open chrome", 0), ("Open Chrome ", 1)])
+    conn.close()
+
+    db = Database(legacy_db)
+    try:
+        # "open excel"/"open Excel" in command_history, "open this pc" in the old history table
+        assert db.app_launch_counts(["excel", "chrome", "this pc", "word"]) == {"excel": 6, "chrome": 3, "this pc": 8}
+    finally:
+        db.close()
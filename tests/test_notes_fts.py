@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+from friday import NOTE_COMPRESS_THRESHOLD, Database
+
+
+def body(word):
+    """A note body long and repetitive enough to be stored compressed"""
+    return " ".join([word] + ["filler"] * (NOTE_COMPRESS_THRESHOLD // 6))
+
+
+def found(db, query):
+    return [row[0] for row in db.search_notes(query)]
+
+
+@pytest.fixture
+def path(db):
+    if not db.has_fts:
+        pytest.skip("SQLite built without FTS5")
+    return db.db_path
+
+
+def test_plain_sqlite_client_can_write_notes(db, path):
+    note_id = db.add_note("Suit specs", "arc reactor output")
+    conn = sqlite3.connect(path)  # no friday_inflate here
+    try:
+        with conn:
+            conn.execute("INSERT INTO notes (title, content) VALUES ('Shopping', 'palladium cores')")
+            conn.execute("UPDATE notes SET content = 'repulsor output' WHERE id = ?", (note_id,))
+        with conn:
+            conn.execute("DELETE FROM notes WHERE title = 'Shopping'")
+    finally:
+        conn.close()
+    assert found(db, "repulsor") == [note_id]
+    assert found(db, "reactor") == []
+    assert found(db, "palladium") == []
+
+
+def test_compressed_bodies_are_indexed(db, path):
+    note_id = db.add_note("Long", body("mark"))
+    assert isinstance(db.conn.execute("SELECT content FROM notes WHERE id = ?", (note_id,)).fetchone()[0], bytes)
+    assert found(db, "mark") == [note_id]
+
+    db.update_note(note_id, "Long", body("jarvis"))
+    assert found(db, "mark") == []
+    assert found(db, "jarvis") == [note_id]
+
+    db.update_note(note_id, "Short", "veronica")
+    assert found(db, "jarvis") == []
+    assert found(db, "veronica") == [note_id]
+
+    db.update_note(note_id, "Long again", body("ultron"))
+    db.delete_note(note_id)
+    assert found(db, "ultron") == []
+    assert found(db, "filler") == []
+
+
+def test_import_indexes_compressed_bodies(db, path):
+    records = [(i, f"note {i}", body(f"word{i}") if i % 2 else f"short{i}", None, None) for i in range(6)]
+    db.add_note("before", "existing")
+    assert db.import_notes(records, chunk=4) == 6
+    titles = {row[0]: row[1] for row in db.list_notes(100)}
+    for i in range(6):
+        ids = found(db, f"word{i}" if i % 2 else f"short{i}")
+        assert [titles[note_id] for note_id in ids] == [f"note {i}"]
@@ -0,0 +1,62 @@
+from friday import FRIDAYApp
+from helpers import InlineStorage, headless_app
+
+
+class InlineRoot:
+    def after(self, ms, fn=None, *args):
+        if fn:
+            fn(*args)
+
+    def after_idle(self, fn, *args):
+        fn(*args)
+
+
+class Scrollbar:
+    def set(self, first, last):
+        pass
+
+
+def add_notes(db, count, updated_at="2025-07-18 18:00:00"):
+    with db.conn as conn:
+        conn.executemany("INSERT INTO notes (title, content, updated_at) VALUES (?, '', ?)",
+                         [(f"note {i}", updated_at) for i in range(count)])
+
+
+def all_pages(db, size):
+    pages, after = [], None
+    while True:
+        page = db.list_notes(size, after)
+        if not page:
+            return pages
+        pages.append(page)
+        after = (page[-1][3], page[-1][0])
+
+
+def test_keyset_pages_cover_every_note_once_despite_tied_timestamps(db):
+    add_notes(db, 250)  # one bulk import: every updated_at is equal
+    pages = all_pages(db, 100)
+    assert [len(page) for page in pages] == [100, 100, 50]
+    assert [row[0] for page in pages for row in page] == list(range(250, 0, -1))
+
+
+def test_notes_edited_between_pages_do_not_shift_later_pages(db):
+    add_notes(db, 150)
+    first = db.list_notes(100)
+    db.update_note(first[0][0], "edited", "moves to the top")
+    db.add_note("new", "also on top")
+    second = db.list_notes(100, (first[-1][3], first[-1][0]))
+    assert [row[0] for row in first + second] == list(range(150, 0, -1))
+
+
+def test_scrolling_near_the_end_pages_in_the_rest(db):
+    add_notes(db, FRIDAYApp.NOTES_PAGE_SIZE * 2 + 10)
+    app = headless_app(db, InlineRoot(), InlineStorage())
+    app._load_notes_page()
+    assert len(app.notes_list.rows) == FRIDAYApp.NOTES_PAGE_SIZE
+
+    app._on_notes_scroll(Scrollbar(), "0.0", "0.5")  # not near the end yet
+    assert len(app.notes_list.rows) == FRIDAYApp.NOTES_PAGE_SIZE
+    for _ in range(3):
+        app._on_notes_scroll(Scrollbar(), "0.8", "0.95")
+    assert len(app.notes_list.rows) == FRIDAYApp.NOTES_PAGE_SIZE * 2 + 10
+    assert app._notes_exhausted and not app._notes_page_pending
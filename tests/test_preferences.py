@@ -0,0 +1,61 @@
+import sqlite3
+
+from friday import Database
+
+
+def stored(path, key):
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute("SELECT value FROM preferences WHERE key = ?", (key,)).fetchone()
+    finally:
+        conn.close()
+    return row and row[0]
+
+
+def test_preferences_survive_a_saturated_write_queue(tmp_path):
+    path = str(tmp_path / "friday.db")
+    db = Database(path, write_policy="drop_oldest")
+    try:
+        db.writer.submit = lambda sql, params=(): False  # queue full: every statement dropped
+        db.set_preference("voice_rate", 180)
+        db.preferences.flush()
+        assert stored(path, "voice_rate") == "180"
+    finally:
+        db.close()
+
+
+def test_changes_from_another_process_reach_the_cache(tmp_path):
+    path = str(tmp_path / "friday.db")
+    gui, daemon = Database(path), Database(path)
+    try:
+        gui.preferences.refresh_interval = 0
+        gui.preferences.refresh()
+        seen = []
+        gui.preferences.subscribe(lambda key, value: seen.append((key, value)), "voice_rate")
+        assert gui.get_preference("voice_rate") is None
+
+        daemon.set_preference("voice_rate", 150)
+        daemon.preferences.flush()
+        assert gui.get_preference("voice_rate") == "150"
+        assert seen == [("voice_rate", "150")]
+    finally:
+        daemon.close()
+        gui.close()
+
+
+def test_pending_local_change_wins_over_a_refresh(tmp_path):
+    path = str(tmp_path / "friday.db")
+    gui, daemon = Database(path), Database(path)
+    try:
+        gui.preferences.delay = 60
+        gui.set_preference("theme", "dark")
+        daemon.set_preference("theme", "light")
+        daemon.preferences.flush()
+
+        assert gui.preferences.refresh() == {}
+        assert gui.get_preference("theme") == "dark"
+        gui.preferences.flush()
+        assert stored(path, "theme") == "dark"
+    finally:
+        daemon.close()
+        gui.close()
@@ -0,0 +1,88 @@
+import threading
+
+from friday import RecognitionPipeline
+
+
+class EchoBackend:
+    name = "echo"
+    timeout = 5
+
+    def __init__(self, gate=None):
+        self.gate = gate
+
+    def recognize(self, audio):
+        if self.gate:
+            self.gate.wait(5)
+        return audio
+
+
+def test_submit_after_stop_is_rejected():
+    results = []
+    pipeline = RecognitionPipeline([EchoBackend()], results.append, maxsize=2)
+    pipeline.start()
+    assert pipeline.submit("one")
+    assert pipeline.drain(5)
+    pipeline.stop()
+
+    assert not pipeline.submit("two")
+    assert not pipeline.submit("three")
+    # Nothing but (at most) the shutdown sentinel is left queued
+    assert list(pipeline.queue.queue) in ([], [None])
+    assert results == ["one"]
+
+
+def test_full_queue_never_evicts_the_sentinel():
+    gate = threading.Event()
+    pipeline = RecognitionPipeline([EchoBackend(gate)], lambda text: None, workers=1, maxsize=2)
+    pipeline.start()
+    for i in range(6):  # backs up behind the blocked backend and fills the queue
+        pipeline.submit(f"utterance {i}")
+    pipeline.stop()
+    assert None in pipeline.queue.queue
+
+    for i in range(6):
+        assert not pipeline.submit(f"late {i}")
+    assert None in pipeline.queue.queue
+    gate.set()
+
+
+def test_stop_twice_queues_one_sentinel():
+    pipeline = RecognitionPipeline([EchoBackend()], lambda text: None)
+    pipeline.start()
+    pipeline.stop()
+    pipeline.stop()
+    assert pipeline.queue.qsize() <= 1
+
+
+def test_hung_backend_falls_through_to_the_next():
+    hang = threading.Event()
+    hung = EchoBackend(hang)
+    hung.name, hung.timeout = "hung", 0.2
+    results = []
+    pipeline = RecognitionPipeline([hung, EchoBackend()], results.append)
+    pipeline.start()
+    try:
+        assert pipeline.submit("open chrome")
+        assert pipeline.drain(2)
+        assert results == ["open chrome"]
+        assert pipeline.stats()["latency_p95_ms"] < 1000
+    finally:
+        pipeline.stop()
+        hang.set()
+
+
+def test_every_backend_hung_fails_the_utterance():
+    hang = threading.Event()
+    hung = EchoBackend(hang)
+    hung.timeout = 0.1
+    results = []
+    pipeline = RecognitionPipeline([hung], results.append)
+    pipeline.start()
+    try:
+        pipeline.submit("open chrome")
+        assert pipeline.drain(2)
+        assert results == [] and pipeline.failed == 1
+        assert pipeline.recognize("open word") == (False, "echo: no answer within 0.1 s")
+    finally:
+        pipeline.stop()
+        hang.set()
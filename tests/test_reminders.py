@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from friday import ReminderScheduler
+
+START = 1_800_000_000.0
+
+
+class FakeClock:
+    def __init__(self, now=START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def announced():
+    return []
+
+
+@pytest.fixture
+def scheduler(db, clock, announced):
+    scheduler = ReminderScheduler(db, announced.append, clock=clock, window=600)
+    yield scheduler
+    scheduler.stop()
+
+
+def advance(scheduler, clock, seconds):
+    clock.now += seconds
+    scheduler.wake()
+
+
+def test_reminders_fire_in_due_order_once_the_clock_reaches_them(scheduler, clock, announced):
+    scheduler.add_many([("second", START + 120), ("first", START + 60), ("third", START + 180)])
+    scheduler.start()
+    wait_for(lambda: scheduler.loads >= 1)
+    time.sleep(0.05)
+    assert announced == []
+
+    advance(scheduler, clock, 130)
+    wait_for(lambda: scheduler.announced == 2)
+    assert announced == ["first", "second"]
+
+    advance(scheduler, clock, 60)
+    wait_for(lambda: scheduler.announced == 3)
+    assert announced == ["first", "second", "third"]
+    assert scheduler.db.pending_reminders(clock.now + 3600) == []
+
+
+def test_reminders_beyond_the_window_load_when_it_gets_there(scheduler, clock, announced):
+    scheduler.add_many([("soon", START + 10), ("tomorrow", START + 86400)])
+    scheduler.start()
+    wait_for(lambda: scheduler.loads >= 1)
+    assert scheduler.pending() == 1
+
+    advance(scheduler, clock, 86400)
+    wait_for(lambda: scheduler.announced == 2)
+    assert announced == ["soon", "tomorrow"]
+
+
+def test_reminder_added_while_running_fires(scheduler, clock, announced):
+    scheduler.start()
+    wait_for(lambda: scheduler.loads >= 1)
+    scheduler.add("call pepper", START + 30)
+    assert scheduler.pending() == 1
+
+    advance(scheduler, clock, 30)
+    wait_for(lambda: scheduler.announced == 1)
+    assert announced == ["call pepper"]
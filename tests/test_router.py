@@ -0,0 +1,71 @@
+import pytest
+
+from friday import ApplicationLauncher, IntentRouter
+
+# (utterance, expected intent, expected app)
+INTENT_CORPUS = [
+    ("open chrome", "launch_app", "chrome"),
+    ("open chrome please", "launch_app", "chrome"),
+    ("Hey Friday, open Google Chrome now!", "launch_app", "chrome"),
+    ("launch excel", "launch_app", "excel"),
+    ("open microsoft word", "launch_app", "word"),
+    ("open ms word", "launch_app", "word"),
+    ("start power point", "launch_app", "powerpoint"),
+    ("run the calculator", "launch_app", "calculator"),
+    ("open calc", "launch_app", "calculator"),
+    ("open calculater", "launch_app", "calculator"),
+    ("open my email", "launch_app", "outlook"),
+    ("open outlook for me", "launch_app", "outlook"),
+    ("open the terminal", "launch_app", "terminal"),
+    ("open command prompt", "launch_app", "terminal"),
+    ("open firefox", "launch_app", "firefox"),
+    ("open fire fox", "launch_app", "firefox"),
+    ("open notepad", "launch_app", "notepad"),
+    ("open text editor", "launch_app", "notepad"),
+    ("could you open the browser", "launch_app", "chrome"),
+    ("add note", "add_note", None),
+    ("add a note", "add_note", None),
+    ("new note", "add_note", None),
+    ("take a note about the suit", "add_note", None),
+    ("create a new note", "add_note", None),
+    ("remind me to call pepper in 10 minutes", "add_reminder", None),
+    ("Friday, remind me to check the suit in an hour", "add_reminder", None),
+    ("stop listening", "stop_listening", None),
+    ("start listening", "start_listening", None),
+    ("stop", "quit", None),
+    ("exit", "quit", None),
+    ("quit", "quit", None),
+    ("goodbye friday", "quit", None),
+    ("shut down", "quit", None),
+    ("reopen the file", None, None),
+    ("open note", None, None),
+    ("open notes", None, None),
+    ("please stop the music", None, None),
+    ("don't stop me now", None, None),
+    ("the store is open late", None, None),
+    ("what's the weather", None, None),
+    ("tell me a joke", None, None),
+    ("exit strategy for the meeting", None, None),
+]
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter.default()
+
+
+@pytest.mark.parametrize("text, expected, expected_app", INTENT_CORPUS)
+def test_corpus(router, text, expected, expected_app):
+    intent, slots = router.match(text)
+    assert (intent.name if intent else None) == expected
+    app = ApplicationLauncher().resolve(slots["app"]) if "app" in slots else None
+    assert app == expected_app
+
+
+def test_custom_intent_only_tried_on_its_keyword():
+    router = IntentRouter.default()
+    seen = []
+    router.register("echo", [r"^echo (?P<words>.+)$"], lambda words: seen.append(words), keywords=("echo",))
+    assert router.dispatch("echo hello there").name == "echo"
+    assert seen == ["hello there"]
+    assert router.match("say hello")[0] is None
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+
+from friday import SpeechCache, SpeechWorker
+
+
+class FakeEngine:
+    """pyttsx3 stand-in: runAndWait blocks while `hold` is clear, stop releases it"""
+
+    def __init__(self):
+        self.spoken = []
+        self.stops = 0
+        self.hold = threading.Event()
+        self.hold.set()
+        self.busy = threading.Event()
+        self._pending = None
+
+    def say(self, text):
+        self._pending = text
+
+    def runAndWait(self):
+        self.busy.set()
+        self.hold.wait(5)
+        self.spoken.append(self._pending)
+        self.busy.clear()
+
+    def stop(self):
+        self.stops += 1
+        self.hold.set()
+
+    def setProperty(self, name, value):
+        pass
+
+    def getProperty(self, name):
+        return {"voice": "test", "rate": 150, "volume": 1.0}[name]
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def busy_worker():
+    """A worker whose engine is stuck in a first utterance"""
+    engine = FakeEngine()
+    worker = SpeechWorker(engine)
+    engine.hold.clear()
+    worker.say("first")
+    assert engine.busy.wait(5)
+    return engine, worker
+
+
+def test_priority_order():
+    engine, worker = busy_worker()
+    worker.say("status", SpeechWorker.STATUS)
+    worker.say("normal one", SpeechWorker.NORMAL)
+    worker.say("normal two", SpeechWorker.NORMAL)
+    engine.hold.set()
+    wait_for(lambda: len(engine.spoken) == 4)
+    assert engine.spoken == ["first", "normal one", "normal two", "status"]
+    worker.close()
+
+
+def test_status_messages_coalesce():
+    engine, worker = busy_worker()
+    for n in range(3):
+        worker.say(f"status {n}", SpeechWorker.STATUS, key="status")
+    worker.say("done", SpeechWorker.STATUS)
+    engine.hold.set()
+    wait_for(lambda: engine.spoken[-1:] == ["done"])
+    assert engine.spoken == ["first", "status 2", "done"]
+    assert worker.coalesced == 2
+    worker.close()
+
+
+def test_urgent_interrupts_current_utterance():
+    engine, worker = busy_worker()
+    worker.say("queued")
+    worker.say("alert", SpeechWorker.URGENT)
+    wait_for(lambda: len(engine.spoken) == 3)
+    assert engine.stops == 1 and worker.interrupted == 1
+    assert engine.spoken == ["first", "alert", "queued"]
+    worker.close()
+
+
+def test_normal_message_does_not_interrupt():
+    engine, worker = busy_worker()
+    worker.say("next")
+    time.sleep(0.05)
+    assert engine.stops == 0 and engine.spoken == []
+    engine.hold.set()
+    wait_for(lambda: len(engine.spoken) == 2)
+    worker.close()
+
+
+class RenderingEngine(FakeEngine):
+    """Also renders: runAndWait writes `size` bytes to the save_to_file path"""
+
+    def __init__(self, size=100):
+        super().__init__()
+        self.size = size
+        self.renders = []
+        self._target = None
+
+    def save_to_file(self, text, path):
+        self._target = path
+        self._stops_before = self.stops
+        self.renders.append(text)
+
+    def runAndWait(self):
+        if self._target is None:
+            return super().runAndWait()
+        target, self._target = self._target, None
+        self.busy.set()
+        stopped = not self.hold.wait(5) or self.stops > self._stops_before
+        with open(target, "wb") as f:
+            f.write(b"x" * (self.size // 2 if stopped else self.size))
+        self.busy.clear()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = SpeechCache(str(tmp_path), max_bytes=250)
+    engine = RenderingEngine(size=100)
+    key = ("test", 150, 1.0)
+    a = cache.render(engine, "alpha", *key)
+    b = cache.render(engine, "bravo", *key)
+    os.utime(a, (1000, 1000))
+    os.utime(b, (2000, 2000))
+    assert cache.get("alpha", *key) == a  # a hit makes alpha the most recent
+    c = cache.render(engine, "charlie", *key)
+    assert os.path.exists(a) and os.path.exists(c)
+    assert not os.path.exists(b)
+    assert cache.get("bravo", *key) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_keeps_everything_under_the_cap(tmp_path):
+    cache = SpeechCache(str(tmp_path), max_bytes=10_000)
+    engine = RenderingEngine(size=100)
+    paths = [cache.render(engine, f"phrase {n}", "test", 150, 1.0) for n in range(20)]
+    assert all(os.path.exists(path) for path in paths)
+    assert not any(".part" in name for name in os.listdir(tmp_path))
+
+
+def test_prerender_yields_to_speech(tmp_path):
+    engine = RenderingEngine()
+    engine.hold.clear()
+    worker = SpeechWorker(engine, SpeechCache(str(tmp_path)))
+    worker.player.available = True
+    worker.prerender(["canned phrase"])
+    assert engine.busy.wait(5)  # rendering, and stuck until stopped
+    worker.say("reply", SpeechWorker.URGENT)
+    wait_for(lambda: engine.spoken == ["reply"])
+    assert engine.stops == 1
+    # The stopped render was discarded and retried once the queue was idle
+    wait_for(lambda: engine.renders == ["canned phrase", "canned phrase"])
+    wait_for(lambda: worker.cache.get("canned phrase", "test", 150, 1.0) is not None)
+    path = worker.cache.get("canned phrase", "test", 150, 1.0)
+    assert os.path.getsize(path) == engine.size
+    worker.close()
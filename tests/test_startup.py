@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from friday import SpeechWorker, StartupTimer, VoiceAssistant, sr
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_friday_loads_no_speech_modules():
+    code = "import sys, friday; print(sorted({'speech_recognition', 'pyttsx3'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == "[]"
+
+
+def test_microphone_is_only_enumerated_by_prepare(monkeypatch):
+    calls = []
+    monkeypatch.setattr(sr.Microphone, "list_microphone_names", staticmethod(lambda: calls.append(1) or []))
+    voice = VoiceAssistant(backends=[])
+    assert calls == [] and not voice.ready.is_set()
+
+    preparing = threading.Thread(target=voice.prepare)
+    preparing.start()
+    preparing.join(5)
+    voice.prepare()  # already done: nothing is enumerated again
+    assert voice.ready.is_set() and voice.microphone is None
+    assert calls == [1]
+
+
+class Engine:
+    """pyttsx3 stand-in that records what it said"""
+
+    def __init__(self):
+        self.spoken = []
+        self.said = threading.Event()
+
+    def say(self, text):
+        self.spoken.append(text)
+
+    def runAndWait(self):
+        self.said.set()
+
+    def stop(self):
+        pass
+
+
+def test_slow_speech_engine_starts_on_the_speech_thread():
+    engine = Engine()
+    started, ready = [], []
+
+    def factory():
+        time.sleep(0.2)
+        started.append(threading.current_thread())
+        return engine
+
+    before = time.perf_counter()
+    worker = SpeechWorker(factory=factory, on_ready=ready.append)
+    worker.say("queued before the engine is up")
+    assert time.perf_counter() - before < 0.1  # the caller never waits for the engine
+    try:
+        assert engine.said.wait(5)
+        assert engine.spoken == ["queued before the engine is up"]
+        assert ready == [True]
+        assert started[0] is not threading.current_thread()
+    finally:
+        worker.close()
+
+
+def test_startup_report_orders_overlapping_phases():
+    timer = StartupTimer(t0=100.0)
+    timer.record("speech", 100.1, 100.9)
+    timer.record("database", 100.0, 100.05)
+    timer.record("ui", 100.05, 100.3)
+    lines = timer.report().splitlines()
+    assert [line.split()[0] for line in lines[1:]] == ["database", "ui", "speech", "ready"]
+    assert lines[-1].endswith("+   900.0 ms")
+    assert timer.as_dict()["ui"] == {"start_ms": 50.0, "duration_ms": 250.0}
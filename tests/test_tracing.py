@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from friday import NULL_TRACE, FridayCore, LatencyTracer
+
+
+@pytest.fixture
+def core(tmp_path):
+    core = FridayCore(str(tmp_path / "trace.db"), trace=True, load_apps=False)
+    yield core
+    core.close()
+
+
+def test_finished_trace_is_saved_with_its_history_row(core):
+    trace = core.tracer.begin()
+    trace.stages["recognize"] = 0.25
+    core.handle_command("tell me a joke", trace)
+    trace.finish()
+    trace.finish()  # finishing twice reports once
+    core.db.flush()
+
+    row = core.db.conn.execute("SELECT command, trace_id, latency_ms FROM command_history").fetchone()
+    assert row[:2] == ("tell me a joke", trace.id)
+    stages = json.loads(row[2])
+    assert stages["recognize"] == 250.0 and "dispatch" in stages
+    assert core.db.get_latencies() == [stages]
+    assert core.tracer.traces == 1
+
+
+def test_latency_stats_can_be_rebuilt_from_the_database(core):
+    for ms in (10, 20, 30, 40):
+        trace = core.tracer.begin()
+        trace.stages["recognize"] = ms / 1000
+        core.handle_command("open notes", trace)
+        trace.finish()
+    core.db.flush()
+
+    tracer = LatencyTracer(enabled=True)
+    for stages in core.db.get_latencies():
+        for stage, ms in stages.items():
+            tracer.record(stage, ms / 1000)
+    assert tracer.stats()["recognize"] == {"count": 4, "p50_ms": 30.0, "p95_ms": 40.0, "p99_ms": 40.0}
+
+
+def test_untraced_commands_store_no_latencies(tmp_path):
+    core = FridayCore(str(tmp_path / "untraced.db"), trace=False, load_apps=False)
+    try:
+        assert core.tracer.begin() is NULL_TRACE
+        core.handle_command("tell me a joke", core.tracer.begin())
+        core.db.flush()
+        assert core.db.conn.execute("SELECT trace_id, latency_ms FROM command_history").fetchone() == (None, None)
+        assert core.db.get_latencies() == []
+    finally:
+        core.close()
@@ -0,0 +1,106 @@
+import json
+import os
+
+import pytest
+
+from friday import EXPORT_MARKER, Database, export_notes_to, import_notes_from
+
+
+class Interrupt(Exception):
+    pass
+
+
+def interrupt_after(reports):
+    """Progress callback that aborts after `reports` calls"""
+    calls = []
+
+    def progress(count, fraction):
+        calls.append(count)
+        if len(calls) >= reports:
+            raise Interrupt()
+    return progress
+
+
+@pytest.fixture
+def notes(db):
+    for i in range(50):
+        db.add_note(f"Note {i}", f"line one of {i}\n\nline two, with ünïcode and <!-- markup -->")
+    db.add_note("Big", "reactor " * 2000)  # stored compressed
+    return db
+
+
+@pytest.fixture
+def target(tmp_path):
+    database = Database(str(tmp_path / "target.db"), write_policy="block")
+    yield database
+    database.close()
+
+
+def exported_ids(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+@pytest.mark.parametrize("name", ["notes.jsonl", "notes"])
+def test_round_trip(notes, target, tmp_path, name):
+    path = str(tmp_path / name)
+    assert export_notes_to(notes, path) == 51
+    assert import_notes_from(target, path) == 51
+    assert list(target.iter_notes()) == list(notes.iter_notes())
+    assert not os.path.exists(path + ".part")
+    assert not os.path.exists(os.path.join(path, EXPORT_MARKER))
+
+
+@pytest.mark.parametrize("name", ["notes.jsonl", "notes"])
+def test_exporting_again_replaces_the_old_export(notes, target, tmp_path, name):
+    path = str(tmp_path / name)
+    export_notes_to(notes, path)
+    notes.update_note(1, "Renamed", "edited since the last backup")
+    notes.delete_note(2)
+    notes.add_note("Newest", "added since the last backup")
+
+    assert export_notes_to(notes, path) == 51
+    import_notes_from(target, path)
+    assert [note[1:] for note in target.iter_notes()] == [note[1:] for note in notes.iter_notes()]
+
+
+def test_interrupted_jsonl_export_resumes_only_when_asked(notes, tmp_path):
+    path = str(tmp_path / "notes.jsonl")
+    with pytest.raises(Interrupt):
+        export_notes_to(notes, path, interrupt_after(2), batch=10)
+    assert not os.path.exists(path)
+    with open(path + ".part", "rb+") as f:
+        f.truncate(f.seek(0, os.SEEK_END) - 5)  # torn mid-line, as if the exporter died
+
+    assert export_notes_to(notes, path, resume=True) == 32
+    assert exported_ids(path) == list(range(1, 52))
+    assert not os.path.exists(path + ".part")
+
+    with pytest.raises(Interrupt):
+        export_notes_to(notes, path, interrupt_after(1), batch=10)
+    assert export_notes_to(notes, path) == 51  # not resuming starts over
+    assert exported_ids(path) == list(range(1, 52))
+
+
+def test_interrupted_markdown_export_resumes(notes, target, tmp_path):
+    path = str(tmp_path / "notes")
+    with pytest.raises(Interrupt):
+        export_notes_to(notes, path, interrupt_after(3), batch=10)
+    assert os.path.exists(os.path.join(path, EXPORT_MARKER))
+
+    assert export_notes_to(notes, path, resume=True) == 21
+    assert sorted(os.listdir(path))[0].startswith("00000001-")
+    import_notes_from(target, path)
+    assert list(target.iter_notes()) == list(notes.iter_notes())
+
+
+def test_interrupted_import_resumes_without_duplicates(notes, target, tmp_path):
+    path = str(tmp_path / "notes.jsonl")
+    export_notes_to(notes, path)
+    with pytest.raises(Interrupt):
+        import_notes_from(target, path, interrupt_after(2), chunk=10)
+    assert target.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 20
+
+    assert import_notes_from(target, path) == 51  # counts the notes of both runs
+    assert list(target.iter_notes()) == list(notes.iter_notes())
+    assert target.import_checkpoint(os.path.realpath(path)) is None
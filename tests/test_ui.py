@@ -0,0 +1,124 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from friday import FRIDAYApp, FridayCore, StartupTimer, StorageExecutor
+from helpers import InlineStorage, SlowDisk, TickRoot, headless_app
+
+LATENCY = 0.05
+
+
+class ManualPost:
+    """Collects what StorageExecutor hands to the UI thread; run() plays the UI thread"""
+
+    def __init__(self):
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def __call__(self, deliver):
+        with self.lock:
+            self.pending.append(deliver)
+
+    def run(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+        for deliver in pending:
+            deliver()
+
+
+def test_storage_runs_in_order_and_drops_superseded_results():
+    post = ManualPost()
+    executor = StorageExecutor(post)
+    gate = threading.Event()
+    delivered = []
+    try:
+        executor.submit(gate.wait, 5)
+        for page in range(3):
+            executor.submit(lambda page=page: page, on_done=delivered.append, key="page")
+        executor.submit(lambda: "saved", on_done=delivered.append)
+        gate.set()
+        executor.join()
+        post.run()
+    finally:
+        executor.close()
+    assert delivered == [2, "saved"]
+    assert executor.cancelled == 2
+
+
+class FakeButton:
+    def __init__(self, app, cells):
+        self.app, self.cells = app, cells
+
+    def grid(self, row, column, **kwargs):
+        self.cells[row * 4 + column] = self.app
+
+
+def test_app_index_and_quick_launch_load_on_the_storage_thread(tmp_path):
+    core = FridayCore(str(tmp_path / "apps.db"), load_apps=False)
+    for _ in range(3):
+        core.db.record_app_launch("terminal")
+    core.db.record_app_launch("word")
+    core.db.flush()
+    threads = []
+    load = core.app_index.load
+    core.app_index.load = lambda: threads.append(threading.current_thread().name) or load()
+    core.app_index.refresh_async = lambda: threads.append("refresh")
+
+    post, posted, cells = ManualPost(), [], {}
+    app = FRIDAYApp.__new__(FRIDAYApp)
+    app.core, app.db, app.startup = core, core.db, StartupTimer()
+    app.events = type("Events", (), {"post": lambda self, *event: posted.append(event)})()
+    app.storage = StorageExecutor(post)
+    app._quick_launch = {name: FakeButton(name, cells) for name in ("excel", "word", "chrome", "terminal")}
+    try:
+        app._init_apps()
+        app.storage.join()
+        assert threads == ["friday-storage_0", "refresh"]
+        assert cells == {}  # nothing touches the widgets until the UI thread delivers
+        post.run()
+    finally:
+        app.storage.close()
+        core.close()
+    assert [cells[i] for i in range(4)] == ["terminal", "word", "excel", "chrome"]
+    assert posted == [("readiness", "apps", True)]
+
+
+def notes_session(db, executor):
+    """Page, add, edit and delete notes through a TickRoot; returns its per-callback stalls"""
+    root = TickRoot()
+    storage = StorageExecutor(post=lambda deliver: app.events.post("storage", deliver)) if executor else None
+    app = headless_app(db, root, storage or InlineStorage())
+    app.events.start()
+
+    def select(index):
+        app.notes_list.selected = (list(app.notes_list.rows)[index],)
+
+    # Edit the first row paged in, delete the one just added (appended last)
+    steps = [app._load_notes_page, app.add_note, lambda: select(0), app.edit_note, lambda: select(-1),
+             app.delete_note]
+    finished = threading.Event()
+    steps.append(lambda: app.storage.submit(lambda: None, on_done=lambda _: finished.set()))
+    for i, step in enumerate(steps):
+        root.after(i * 150, step)  # each step's storage work is done before the next
+    with mock.patch("friday.simpledialog.askstring", lambda *a, **k: "arc reactor"), \
+            mock.patch("friday.messagebox.askyesno", lambda *a, **k: True):
+        root.run(finished.is_set)
+    app.events.stop()
+    app.storage.close()
+    assert finished.is_set()
+    return root.stalls, app
+
+
+@pytest.mark.parametrize("executor", [True, False])
+def test_slow_disk_stalls_the_ui_only_without_the_executor(db, executor):
+    for i in range(3):
+        db.add_note(f"note {i}", "body")
+    stalls, app = notes_session(SlowDisk(db, LATENCY), executor)
+
+    assert len(app.notes_list.rows) == 3  # 3 paged in, one added, one deleted
+    assert db.conn.execute("SELECT COUNT(*) FROM notes WHERE content = 'arc reactor'").fetchone()[0] == 1
+    if executor:
+        assert max(stalls) < LATENCY
+    else:
+        assert max(stalls) >= LATENCY
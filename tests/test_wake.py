@@ -0,0 +1,144 @@
+import importlib.machinery
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+import friday
+from friday import (SphinxSpotter, TemplateSpotter, VoiceAssistant, WakeWordGate, WavFileSource,
+                    default_wake_gate, enroll_wake_word, sr)
+from helpers import FRIDAY_WORD, CountingBackend, Voice
+
+
+@pytest.fixture(scope="module")
+def voice():
+    return Voice(41)
+
+
+def audio(data):
+    return sr.AudioData(data, Voice.RATE, 2)
+
+
+class FakeDecoder:
+    """The parts of pocketsphinx.Decoder that SphinxSpotter uses"""
+
+    def __init__(self, config):
+        self.config = config
+        self.keyphrases = None
+        self.search = None
+        self.raw = b""
+        self.heard = True
+
+    def add_kws(self, name, path):
+        with open(path) as f:
+            self.keyphrases = f.read()
+
+    def activate_search(self, name):
+        self.search = name
+
+    def start_utt(self):
+        self.raw = b""
+
+    def process_raw(self, data, no_search, full_utt):
+        self.raw += data
+
+    def end_utt(self):
+        pass
+
+    def hyp(self):
+        return types.SimpleNamespace(hypstr="friday") if self.heard else None
+
+    def seg(self):
+        return [types.SimpleNamespace(word="<sil>", end_frame=19), types.SimpleNamespace(word="friday", end_frame=59)]
+
+
+@pytest.fixture
+def fake_pocketsphinx(monkeypatch):
+    decoders = []
+
+    class Config(dict):
+        def set_string(self, key, value):
+            self[key] = value
+
+    def decoder(config):
+        decoders.append(FakeDecoder(config))
+        return decoders[-1]
+
+    module = types.ModuleType("pocketsphinx")
+    module.__spec__ = importlib.machinery.ModuleSpec("pocketsphinx", None)
+    module.pocketsphinx = types.SimpleNamespace(Config=Config, Decoder=decoder)
+    monkeypatch.setitem(sys.modules, "pocketsphinx", module)
+    return decoders
+
+
+def test_default_gate_uses_sphinx_when_installed(tmp_path, voice, fake_pocketsphinx):
+    gate = default_wake_gate(directory=str(tmp_path))  # no templates needed
+    assert isinstance(gate.spotter, SphinxSpotter)
+
+    said = audio(voice.utterance([FRIDAY_WORD, voice.babble_word()], 30))
+    assert gate.spotter.spot(said) == (True, 0.6)
+    decoder, = fake_pocketsphinx
+    assert decoder.search == "wake"
+    assert decoder.keyphrases == "friday /1e-30.0/\n"
+    assert decoder.config["-logfn"] == os.devnull
+    assert len(decoder.raw) == len(said.get_raw_data(convert_rate=16000, convert_width=2))
+
+    decoder.heard = False
+    assert gate.spotter.spot(said) == (False, None)
+    assert len(fake_pocketsphinx) == 1  # the model is loaded once
+
+
+def test_gate_runs_on_the_dispatch_thread(tmp_path, voice):
+    threads = []
+
+    class RecordingSpotter:
+        name = "recording"
+
+        def spot(self, audio):
+            threads.append(threading.current_thread().name)
+            return True, None
+
+    path = str(tmp_path / "session.wav")
+    voice.write(path, b"".join(voice.utterance([voice.babble_word()], 30) for _ in range(3)))
+    backend = CountingBackend()
+    assistant = VoiceAssistant(source=WavFileSource(path), continuous=True, backends=[backend],
+                               wake_gate=WakeWordGate(RecordingSpotter()), queue_size=16)
+    assistant.start_listening(lambda text: None)
+    assistant._capture.wait()
+    assert assistant.pipeline.drain(10)
+    assistant.stop_listening()
+
+    assert threads and set(threads) == {"friday-dispatch"}
+    assert backend.calls == len(threads)
+
+
+def test_enrollment_records_takes_for_the_template_spotter(tmp_path, voice, monkeypatch):
+    monkeypatch.setattr(SphinxSpotter, "available", staticmethod(lambda: False))
+    directory = tmp_path / "wake_word"
+    directory.mkdir()
+    (directory / "old.wav").write_bytes(b"")
+    takes = [None, audio(voice.noise(1.0, 30))]  # a timeout, then silence: both asked again
+    takes += [audio(voice.utterance([FRIDAY_WORD], 35)) for _ in range(3)]
+    prompts = []
+
+    paths = enroll_wake_word(lambda: takes.pop(0), count=3, directory=str(directory),
+                             prompt=lambda take, count: prompts.append(take))
+    assert prompts == [1, 1, 1, 2, 3]
+    assert sorted(os.listdir(directory)) == ["take_1.wav", "take_2.wav", "take_3.wav"]
+    assert [os.path.basename(p) for p in paths] == ["take_1.wav", "take_2.wav", "take_3.wav"]
+
+    gate = default_wake_gate(directory=str(directory))
+    assert isinstance(gate.spotter, TemplateSpotter)
+    said = audio(voice.utterance([FRIDAY_WORD, voice.babble_word()], 30))
+    assert gate.spotter.spot(said)[0]
+
+
+def test_enrollment_gives_up_without_touching_earlier_takes(tmp_path, voice):
+    directory = tmp_path / "wake_word"
+    directory.mkdir()
+    (directory / "take_1.wav").write_bytes(b"kept")
+    with pytest.raises(RuntimeError):
+        enroll_wake_word(lambda: None, count=2, directory=str(directory), attempts=2)
+    assert (directory / "take_1.wav").read_bytes() == b"kept"
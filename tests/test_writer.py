@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from friday import WriteBehindQueue
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "writer.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE log (n INTEGER)")
+    conn.close()
+    return path
+
+
+class GatedConnection:
+    """sqlite3 connection whose writer thread waits for `gate` before its first batch"""
+
+    def __init__(self, path, gate):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.gate = gate
+
+    def __enter__(self):
+        self.gate.wait(5)
+        return self.conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self.conn.__exit__(*exc)
+
+    def execute(self, *args):
+        return self.conn.execute(*args)
+
+    def close(self):
+        self.conn.close()
+
+
+def logged(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [n for (n,) in conn.execute("SELECT n FROM log ORDER BY rowid")]
+    finally:
+        conn.close()
+
+
+def backed_up_writer(path, policy, maxsize=3):
+    """A writer stuck on its first statement (0) with a queue of `maxsize` behind it"""
+    gate = threading.Event()
+    writer = WriteBehindQueue(lambda: GatedConnection(path, gate), max_batch=1, max_delay=0,
+                              maxsize=maxsize, policy=policy)
+    writer.submit("INSERT INTO log VALUES (?)", (0,))
+    while not writer.queue.empty():  # the writer has taken statement 0 and waits on the gate
+        time.sleep(0.001)
+    return writer, gate
+
+
+def test_drop_newest_keeps_what_was_queued_first(path):
+    writer, gate = backed_up_writer(path, "drop_newest")
+    accepted = [writer.submit("INSERT INTO log VALUES (?)", (n,)) for n in range(1, 6)]
+    gate.set()
+    writer.close()
+    assert accepted == [True, True, True, False, False]
+    assert writer.dropped == 2
+    assert logged(path) == [0, 1, 2, 3]
+
+
+def test_drop_oldest_keeps_the_latest(path):
+    writer, gate = backed_up_writer(path, "drop_oldest")
+    accepted = [writer.submit("INSERT INTO log VALUES (?)", (n,)) for n in range(1, 6)]
+    gate.set()
+    writer.close()
+    assert all(accepted)
+    assert writer.dropped == 2
+    assert logged(path) == [0, 3, 4, 5]
+
+
+def test_block_waits_for_room_and_loses_nothing(path):
+    writer, gate = backed_up_writer(path, "block")
+    for n in range(1, 4):
+        writer.submit("INSERT INTO log VALUES (?)", (n,))
+    submitter = threading.Thread(target=writer.submit, args=("INSERT INTO log VALUES (?)", (4,)))
+    submitter.start()
+    submitter.join(0.1)
+    assert submitter.is_alive()  # the queue is full: the caller waits
+    gate.set()
+    submitter.join(5)
+    writer.close()
+    assert writer.dropped == 0
+    assert logged(path) == [0, 1, 2, 3, 4]
+
+
+def test_close_commits_everything_pending(path):
+    writer = WriteBehindQueue(lambda: sqlite3.connect(path, check_same_thread=False), max_batch=1000, max_delay=60)
+    for n in range(250):
+        writer.submit("INSERT INTO log VALUES (?)", (n,))
+    assert logged(path) == []  # still batching: neither max_batch nor max_delay reached
+    writer.close()
+    assert logged(path) == list(range(250))
+    assert writer.written == 250
+
+
+def test_flush_waits_for_the_commit(path):
+    writer = WriteBehindQueue(lambda: sqlite3.connect(path, check_same_thread=False), max_delay=60)
+    writer.submit("INSERT INTO log VALUES (?)", (1,))
+    assert writer.flush(5)
+    assert logged(path) == [1]
+    writer.close()
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        WriteBehindQueue(lambda: None, policy="drop_everything")